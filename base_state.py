@@ -0,0 +1,130 @@
+import numpy as np
+from profile_codec import IN_PLAY_OUTCOMES
+
+# Plate appearance results, coded as indices into this tuple
+PA_RESULTS = ('walk', 'strikeout') + IN_PLAY_OUTCOMES
+PA_RESULT_INDEX = {result: code for code, result in enumerate(PA_RESULTS)}
+WALK, STRIKEOUT, FIELD_OUT = range(3)
+OUTS = np.array([result in ('strikeout', 'field_out') for result in PA_RESULTS], dtype=np.int64)
+
+# The bases are a 3-bit state: bit 0 is first base, bit 1 second and bit 2
+# third. Who is on them is kept in a side array of 3 runners, indexed the same.
+BASE_STATES = 8
+
+# Label of the batter in a play's runner sources, after the three bases
+BATTER = 3
+
+
+def _transition(state, result):
+    """Play a result from a base state.
+
+    Keeps the advancement games have always been played with, quirks
+    included: on a double the runner from second both scores and stays on
+    third while the runner from first is dropped, and a bases-loaded walk
+    tells of a run without counting it.
+
+    Returns:
+        Tuple (sources, runs, scored, advanced): for each base after the
+        play, the base its runner came from (BATTER for the batter, None when
+        empty); the runs counted; the bases whose runners are told to score,
+        from third down; and the bases whose runners are told to advance
+    """
+    first, second, third = (base if state >> base & 1 else None for base in range(3))
+    runs = 0
+    scored, advanced = [], []
+    if result == 'walk':
+        if first is None:
+            first = BATTER
+        elif second is None:
+            advanced = [0]
+            first, second = BATTER, first
+        elif third is None:
+            advanced = [0, 1]
+            first, second, third = BATTER, first, second
+        else:
+            advanced, scored = [0, 1], [2]
+            first, second, third = BATTER, first, second
+    elif result == 'single':
+        if third is not None:
+            scored = [2]
+        first, second, third = BATTER, first, second
+    elif result == 'double':
+        scored = [base for base in (third, second) if base is not None]
+        first, second, third = None, BATTER, second
+    elif result == 'triple':
+        scored = [base for base in (third, second, first) if base is not None]
+        first, second, third = None, None, BATTER
+    elif result == 'home_run':
+        scored = [base for base in (third, second, first) if base is not None]
+        runs = 1
+        first = second = third = None
+    if result != 'walk':
+        runs += len(scored)
+    return (first, second, third), runs, tuple(scored), tuple(advanced)
+
+
+def _transition_tables():
+    """Tabulate _transition over every base state and plate appearance result."""
+    transitions = [[_transition(state, result) for result in PA_RESULTS] for state in range(BASE_STATES)]
+    next_state = np.array([[sum(1 << base for base, source in enumerate(sources) if source is not None)
+                            for sources, _, _, _ in row] for row in transitions], dtype=np.int64)
+    runs = np.array([[runs for _, runs, _, _ in row] for row in transitions], dtype=np.int64)
+    return next_state, runs, transitions
+
+
+# Next base state and runs scored, indexed [state, result code]. Shared by the
+# scalar, vectorized and Markov engines so they all score runs alike.
+NEXT_STATE, RUNS, _TRANSITIONS = _transition_tables()
+NEXT_STATE.flags.writeable = False
+RUNS.flags.writeable = False
+
+# The same tables with OUTS as nested tuples of (next state, runs, outs), for
+# the scalar game loop where indexing numpy arrays costs more than the lookup
+TRANSITIONS = tuple(tuple(zip(next_states, runs, OUTS.tolist()))
+                    for next_states, runs in zip(NEXT_STATE.tolist(), RUNS.tolist()))
+
+
+def advance_runners(runners, state, code, batter):
+    """Move the runners of the side array through a play.
+
+    Args:
+        runners: Runners on first, second and third before the play, as
+            anything identifying them, e.g. MLB IDs, 0 where a base is empty
+        state: Base state before the play
+        code: Plate appearance result code, an index into PA_RESULTS
+        batter: The batter, identified like the runners
+
+    Returns:
+        list: Runners on first, second and third after the play
+    """
+    sources = _TRANSITIONS[state][code][0]
+    players = (runners[0], runners[1], runners[2], batter)  # Indexed by source, BATTER last
+    return [0 if source is None else players[source] for source in sources]
+
+
+def base_state(runners):
+    """Base state of a side array of runners, 0 marking an empty base."""
+    return sum(1 << base for base, runner in enumerate(runners) if runner)
+
+
+def narrate(state, code, names):
+    """Describe how the runners moved on a play.
+
+    Only called when rendering a log, so games never build these strings.
+
+    Args:
+        state: Base state before the play
+        code: Plate appearance result code, an index into PA_RESULTS
+        names: Names of the runners on first, second and third before the play
+
+    Returns:
+        str: e.g. 'Smith and Jones advance. Brown scores.', '' when nothing
+            worth telling happened
+    """
+    _, _, scored, advanced = _TRANSITIONS[state][code]
+    sentences = []
+    if advanced:
+        sentences.append(' and '.join(names[base] for base in advanced)
+                         + (' advance.' if len(advanced) > 1 else ' advances.'))
+    sentences.extend(names[base] + ' scores.' for base in scored)
+    return ' '.join(sentences)
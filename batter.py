@@ -1,8 +1,11 @@
 from numpy import random
 import numpy as np
 import pandas as pd
-from pybaseball import playerid_reverse_lookup
-from db_manager import DatabaseManager
+from db_manager import DatabaseManager, training_fingerprint, player_rows
+from name_resolver import default_resolver, display_name
+from sampling import Distribution
+from profile_codec import BALLS, STRIKES
+from player_model import BatterModel
 
 # League average probabilities (nerfed) for basic outcomes - define at module level
 LEAGUE_AVG_PROBS = {
@@ -17,65 +20,61 @@ LEAGUE_AVG_PROBS = {
 LEAGUE_AVG_OUTCOMES = ['field_out', 'single', 'double', 'triple', 'home_run']
 LEAGUE_AVG_HIT_PROBS = [0.69, 0.15, 0.09, 0.02, 0.05]
 
+LEAGUE_AVG_PITCH_RESULTS = Distribution.from_dict(LEAGUE_AVG_PROBS)
+LEAGUE_AVG_HITS = Distribution(LEAGUE_AVG_OUTCOMES, LEAGUE_AVG_HIT_PROBS)
+
+# Probability tiers of a batter, in the order DatabaseManager stores them
+TIERS = ('in_play', 'basic', 'global', 'count_based')
+
 class Batter:
-    _db = DatabaseManager()  # Class-level database manager
-    
-    def __init__(self, id, statcast):
+    def __init__(self, id, statcast, profile=None, name=None, store=True, fingerprint=None, db=None, tiers=None):
         """Initialize a batter with their ID and statcast data.
         
         Args:
             id: MLB ID of the batter
             statcast: DataFrame containing statcast data
+            profile: Optional cached tiers from DatabaseManager.get_batter_profiles.
+                When given, the database is not queried for probabilities.
+            name: Optional cached (first_name, last_name) tuple. Resolved
+                through name_resolver.default_resolver when not given.
+            store: Whether to write freshly computed probabilities to the cache
+            fingerprint: Training window of statcast, see training_fingerprint().
+                Computed from statcast when needed and not given.
+            db: Optional DatabaseManager to read and write the cache through,
+                e.g. a write-behind manager shared by a whole run
+            tiers: Tiers to build now, e.g. PitchSimulator.required_tiers().
+                Defaults to every tier. Any other tier is loaded or computed
+                on first access.
         """
         self.id = int(id)  # Convert numpy.int64 to int
-        self._db = DatabaseManager()
+        self._db = db if db is not None else DatabaseManager.shared()
         
         # Check all caches first
-        in_play_probs = self._db.get_batter_probs_in_play(self.id)
-        basic_probs = self._db.get_batter_probs_basic(self.id)
-        global_probs = self._db.get_batter_probs_global(self.id)
-        count_based_probs = self._db.get_batter_probs_count_based(self.id)
-        name = self._db.get_player_name(self.id)
-        
-        # Only filter statcast data if we need to calculate any probabilities
-        if not all([in_play_probs, basic_probs, global_probs, count_based_probs]):
-            filtered_stats = statcast.loc[statcast.batter == id]
-            
-            if not in_play_probs:
-                in_play_probs = self.__init_in_play_stats(filtered_stats)
-                self._db.set_batter_probs_in_play(self.id, in_play_probs)
-            
-            if not basic_probs:
-                basic_probs = self.__init_batter_outcome_probs_basic(filtered_stats)
-                self._db.set_batter_probs_basic(self.id, basic_probs)
-            
-            if not global_probs:
-                global_probs = self.__init_batter_outcome_probs_global(filtered_stats)
-                self._db.set_batter_probs_global(self.id, global_probs)
-            
-            if not count_based_probs:
-                count_based_probs = self.__init_batter_outcome_probs_count_based(filtered_stats)
-                self._db.set_batter_probs_count_based(self.id, count_based_probs)
-        
-        # Set all probabilities
-        self.in_play_probs = in_play_probs
-        self.basic_probs = basic_probs
-        self.global_outcome_probs = global_probs
-        self.count_based_outcome_probs = count_based_probs
+        if fingerprint is None and (profile is None or store):
+            fingerprint = training_fingerprint(statcast)
+        if profile is None:
+            profile, name = self._db.get_player_profile(self.id, 'batter', fingerprint)
+            profile = profile or {}
+        self._stats = None  # This batter's rows, kept only while some tier is unbuilt
+        self._store = store
+        self._fingerprint = fingerprint
+        self._tiers = {tier: profile.get(tier) for tier in TIERS}
+        self._built = set()
+        self._compiled = {}
+        self._tables = {}  # Lookup tables of result_table(), by whether they're by count
+        self._model = None
+
+        # Build the requested tiers now and the rest only if they are used
+        for tier in TIERS if tiers is None else tiers:
+            self._tier(tier, statcast)
+        # Later tiers only need this batter's rows, so the training frame isn't kept alive
+        if not self._complete() and self._stats is None:
+            self._stats = player_rows(statcast, 'batter', self.id)
         
         # Handle player name
         if not name:
-            lookup = playerid_reverse_lookup([self.id])
-            if len(lookup):
-                first_name = lookup.name_first[0]
-                last_name = lookup.name_last[0]
-                self._db.set_player_name(self.id, first_name, last_name)
-                self.name = f"{first_name} {last_name}"
-            else:
-                self.name = "Unknown Player"
-        else:
-            first_name, last_name = name
-            self.name = f"{first_name} {last_name}"
+            name = default_resolver.resolve([self.id], self._db).get(self.id)
+        self.name = display_name(name)
 
     def __init_in_play_stats(self, stats):
         """Initialize in-play probabilities and outcomes for a batter."""
@@ -104,6 +103,89 @@ class Batter:
         """Get in-play probabilities."""
         return self.in_play_probs
 
+    def profile(self, tiers=None):
+        """Get probability tiers in the form stored by DatabaseManager.set_batter_profiles.
+
+        Args:
+            tiers: Optional tiers to include, building any not built yet.
+                Defaults to every tier.
+        """
+        return {tier: self._tier(tier) for tier in (TIERS if tiers is None else tiers)}
+
+    @property
+    def in_play_probs(self):
+        return self._tier('in_play')
+
+    @in_play_probs.setter
+    def in_play_probs(self, probs):
+        self._replace_tier('in_play', probs)
+
+    @property
+    def basic_probs(self):
+        return self._tier('basic')
+
+    @basic_probs.setter
+    def basic_probs(self, probs):
+        self._replace_tier('basic', probs)
+
+    @property
+    def global_outcome_probs(self):
+        return self._tier('global')
+
+    @global_outcome_probs.setter
+    def global_outcome_probs(self, probs):
+        self._replace_tier('global', probs)
+
+    @property
+    def count_based_outcome_probs(self):
+        return self._tier('count_based')
+
+    @count_based_outcome_probs.setter
+    def count_based_outcome_probs(self, probs):
+        self._replace_tier('count_based', probs)
+
+    def _tier(self, tier, statcast=None):
+        """Get one tier, computing it from statcast the first time it's missing.
+
+        Args:
+            tier: Name of the tier
+            statcast: Training frame, only passed while constructing. Later
+                tiers are built from the rows kept in self._stats.
+        """
+        probs = self._tiers[tier]
+        if not probs and tier not in self._built:
+            if self._stats is None:
+                self._stats = player_rows(statcast, 'batter', self.id)
+            probs = self._build_tier(tier, self._stats)
+            self._tiers[tier] = probs
+            self._built.add(tier)
+            if self._store:
+                self._db.set_batter_profiles({self.id: {tier: probs}}, self._fingerprint)
+            if self._complete():
+                self._stats = None
+        return probs
+
+    def _complete(self):
+        """Whether every tier has been loaded or built."""
+        return all(self._tiers[tier] or tier in self._built for tier in TIERS)
+
+    def _build_tier(self, tier, stats):
+        if tier == 'in_play':
+            return self.__init_in_play_stats(stats)
+        if tier == 'basic':
+            return self.__init_batter_outcome_probs_basic(stats)
+        if tier == 'global':
+            return self.__init_batter_outcome_probs_global(stats)
+        if tier == 'count_based':
+            return self.__init_batter_outcome_probs_count_based(stats)
+        raise ValueError(f"Unknown tier: {tier}")
+
+    def _replace_tier(self, tier, probs):
+        self._tiers[tier] = probs
+        self._compiled.pop(tier, None)
+        self._tables.clear()
+        self._model = None
+
     def __init_batter_outcome_probs_global(self, batter_data: pd.DataFrame):
         """
         Computes overall probabilities for all outcomes, regardless of pitch type or count.
@@ -139,36 +221,108 @@ class Batter:
         return count_based_outcome_probs
 
 
-    def simulate_hit(self):
-        try:
-            outcomes = list(self.in_play_probs.keys())
-            probs = list(self.in_play_probs.values())
-            result = random.multinomial(1, probs).argmax()
-            return outcomes[result]
-        except:
-            # Fallback if anything goes wrong
-            return LEAGUE_AVG_OUTCOMES[random.multinomial(1, LEAGUE_AVG_HIT_PROBS).argmax()]
+    def model(self):
+        """Get the dense BatterModel of this batter, built on first use."""
+        if self._model is None:
+            self._model = BatterModel.from_profile(self.id, self.profile())
+        return self._model
+
+    def compile(self, tiers=None):
+        """Precompile tiers for sampling, e.g. before forking workers that share this player.
+
+        Args:
+            tiers: Tier names to compile. Defaults to all of them.
+        """
+        for tier in TIERS if tiers is None else tiers:
+            self._distributions(tier)
+
+    def _distributions(self, tier):
+        """Get one tier precompiled for sampling, compiling it on first use.
+
+        Empty or invalid probabilities compile to the league averages.
+        """
+        compiled = self._compiled.get(tier)
+        if compiled is not None:
+            return compiled
+        probs = self._tier(tier) or {}
+        if tier == 'in_play':
+            compiled = Distribution.from_dict(probs, LEAGUE_AVG_HITS)
+        elif tier == 'global':
+            compiled = Distribution.from_dict(probs, LEAGUE_AVG_PITCH_RESULTS)
+        elif tier == 'basic':
+            compiled = {
+                pitch_type: Distribution.from_dict(outcome_probs, LEAGUE_AVG_PITCH_RESULTS)
+                for pitch_type, outcome_probs in probs.items()
+            }
+        else:
+            compiled = {}
+            for pitch_type, counts in probs.items():
+                for count_key, outcome_probs in counts.items():
+                    balls, strikes = (int(x) for x in count_key.split('-'))
+                    compiled[(pitch_type, balls, strikes)] = Distribution.from_dict(outcome_probs, LEAGUE_AVG_PITCH_RESULTS)
+        self._compiled[tier] = compiled
+        return compiled
+
+    def simulate_hit(self, rng=None):
+        """Simulate the outcome of a ball in play.
+
+        Args:
+            rng: Optional SimulationRandom to draw from instead of numpy's global state
+        """
+        return self._distributions('in_play').sample(rng.random() if rng is not None else random.random_sample())
 
 
-    def get_pitch_result(self, pitch_type: str, balls: int = None, strikes: int = None) -> str:
+    def get_pitch_result(self, pitch_type: str, balls: int = None, strikes: int = None, rng=None) -> str:
         """
         Predicts the outcome of a pitch based on type and optionally count.
         :param pitch_type: The type of pitch thrown.
         :param balls: (Optional) Current number of balls.
         :param strikes: (Optional) Current number of strikes.
+        :param rng: (Optional) SimulationRandom to draw from instead of numpy's global state.
         :return: The predicted pitch outcome.
         """
-        if pitch_type and balls is not None and strikes is not None and (pitch_type in self.count_based_outcome_probs and f"{balls}-{strikes}" in self.count_based_outcome_probs[pitch_type]):
-            outcome_probs = self.count_based_outcome_probs[pitch_type][f"{balls}-{strikes}"]
-        elif pitch_type and pitch_type in self.basic_probs:
-            outcome_probs = self.basic_probs[pitch_type]
+        dist = self._result_distribution(pitch_type, balls, strikes)
+        return dist.sample(rng.random() if rng is not None else random.random_sample())
+
+    def result_table(self, by_count=True):
+        """Get the distributions get_pitch_result() samples from, arranged for drawing many pitches.
+
+        Args:
+            by_count: Whether results depend on the count, as when
+                get_pitch_result() is given one
+
+        Returns:
+            dict: Maps a pitch type to a list of Distributions indexed by
+                balls * 3 + strikes. Pitch types are added on first lookup.
+        """
+        table = self._tables.get(by_count)
+        if table is None:
+            table = self._tables[by_count] = _ResultTable(self, by_count)
+        return table
+
+    def _result_distribution(self, pitch_type, balls=None, strikes=None):
+        """Get the distribution of a pitch's results, falling back from count to pitch type to global."""
+        dist = None
+        if balls is not None and strikes is not None:
+            dist = self._distributions('count_based').get((pitch_type, balls, strikes))
+        if dist is None:
+            dist = self._distributions('basic').get(pitch_type) or self._distributions('global')
+        return dist
+
+
+class _ResultTable(dict):
+    """Pitch type -> per-count result distributions of a batter, filled in on first lookup."""
+
+    def __init__(self, batter, by_count):
+        super().__init__()
+        self.batter = batter
+        self.by_count = by_count
+
+    def __missing__(self, pitch_type):
+        if self.by_count:
+            dists = [self.batter._result_distribution(pitch_type, balls, strikes)
+                     for balls in range(BALLS) for strikes in range(STRIKES)]
         else:
-            outcome_probs = self.global_outcome_probs 
-        
-        # Ensure we have valid probabilities
-        if not outcome_probs or len(outcome_probs) == 0:
-            outcome_probs = LEAGUE_AVG_PROBS
-        
-        outcomes, probabilities = zip(*outcome_probs.items())
-        outcome_index = np.random.multinomial(1, probabilities).argmax()
-        return outcomes[outcome_index]
\ No newline at end of file
+            dists = [self.batter._result_distribution(pitch_type)] * (BALLS * STRIKES)
+        self[pitch_type] = dists
+        return dists
@@ -1,274 +1,437 @@
 import sqlite3
 import json
+import os
+import threading
+import hashlib
+import time
+import atexit
+import multiprocessing
+import weakref
 import numpy as np
+import pandas as pd
 from pathlib import Path
+import profile_codec
+from profile_snapshot import ProfileSnapshot, write_snapshot
+
+# Pragmas applied to every pooled connection. WAL lets readers proceed while a
+# writer holds the lock; NORMAL sync is durable enough for a rebuildable cache.
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-16000",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA busy_timeout=5000",
+)
+
+# Size of sqlite3's per-connection prepared statement cache
+STATEMENT_CACHE_SIZE = 256
+
+# Bound on IDs bound into a single IN (...) query, below SQLite's variable limit
+MAX_QUERY_PARAMS = 500
+
+# Current layout of the cache database. Bump and add a migration when it changes.
+SCHEMA_VERSION = 3
+
+# Version of the probability model stored in player_profiles. Bump when the
+# way profiles are computed changes so stale rows are no longer read.
+MODEL_VERSION = 1
+
+# Fingerprint of profiles stored before training windows were tracked, and the
+# default for callers that don't know which window their profiles came from
+LEGACY_FINGERPRINT = ''
+
+# Statcast columns that profiles are computed from, hashed into fingerprints
+FINGERPRINT_COLUMNS = ('batter', 'pitcher', 'pitch_type', 'balls', 'strikes', 'events', 'description')
+
+# Probability tiers stored for each player role, in player_profiles column order
+ROLE_TIERS = {
+    'batter': ('in_play', 'basic', 'global', 'count_based'),
+    'pitcher': ('basic', 'count_based', 'in_play'),
+}
+PROFILE_TIERS = ('in_play', 'basic', 'global', 'count_based')
+
+# Storage encodings for profile tiers
+ENCODINGS = ('binary', 'json')
+
+# Default write-behind thresholds: buffered profiles, and seconds since the
+# oldest buffered write, that trigger a flush
+DEFAULT_FLUSH_SIZE = 500
+DEFAULT_FLUSH_INTERVAL = 5.0
+
+# Current layout of player_profiles: one row per player, role, model version
+# and training window holding every tier
+PLAYER_PROFILES_DDL = """
+    CREATE TABLE IF NOT EXISTS {table} (
+        player_id INTEGER NOT NULL,
+        role TEXT NOT NULL,
+        model_version INTEGER NOT NULL,
+        fingerprint TEXT NOT NULL,
+        in_play_probs TEXT,
+        basic_probs TEXT,
+        global_probs TEXT,
+        count_based_probs TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (player_id, role, model_version, fingerprint)
+    ) WITHOUT ROWID
+"""
+
+# Per-tier tables used before schema version 2, keyed by role and tier
+LEGACY_TABLES = {
+    'batter': {
+        'in_play': ('batter_probs_in_play', 'batter_id'),
+        'basic': ('batter_probs_basic', 'batter_id'),
+        'global': ('batter_probs_global', 'batter_id'),
+        'count_based': ('batter_probs_count_based', 'batter_id'),
+    },
+    'pitcher': {
+        'basic': ('pitcher_basic_probs', 'pitcher_id'),
+        'count_based': ('pitcher_count_based_probs', 'pitcher_id'),
+        'in_play': ('pitcher_in_play_probs', 'pitcher_id'),
+    },
+}
+
+
+class ConnectionPool:
+    """Thread-safe pool of long-lived SQLite connections, one per thread.
+
+    Pools are shared by every DatabaseManager pointing at the same file, so
+    creating managers is cheap and connections outlive any single manager.
+    Connections of threads that have exited are closed when another thread
+    opens its own.
+    """
+    _pools = {}
+    _pools_lock = threading.Lock()
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = []  # (weak reference to the owning thread, connection)
+        self._pid = os.getpid()
+        self.schema_lock = threading.Lock()
+        self.schema_ready = False  # Set once a manager has created the schema
+
+    @classmethod
+    def for_path(cls, db_path):
+        """Get the shared pool for a database file, creating it on first use."""
+        key = os.path.abspath(db_path)
+        with cls._pools_lock:
+            pool = cls._pools.get(key)
+            if pool is None:
+                pool = cls._pools[key] = cls(db_path)
+            return pool
+
+    def connection(self):
+        """Get this thread's connection, opening it on first use.
+
+        Returns:
+            sqlite3.Connection owned by the calling thread
+        """
+        if self._pid != os.getpid():
+            # Connections must never cross a fork; start afresh in the child
+            self._reset_after_fork()
+
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(
+                self.db_path,
+                check_same_thread=False,
+                cached_statements=STATEMENT_CACHE_SIZE
+            )
+            for pragma in CONNECTION_PRAGMAS:
+                conn.execute(pragma)
+            self._local.conn = conn
+            with self._lock:
+                # Reclaim the connections of threads that have exited
+                dead = [stale for owner, stale in self._connections if not _alive(owner)]
+                self._connections = [(owner, live) for owner, live in self._connections if _alive(owner)]
+                self._connections.append((weakref.ref(threading.current_thread()), conn))
+            for stale in dead:
+                stale.close()
+        return conn
+
+    def close(self):
+        """Close every connection in the pool. They reopen lazily on next use."""
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for _, conn in connections:
+            conn.close()
+        self._local = threading.local()
+        self.schema_ready = False
+
+    def _reset_after_fork(self):
+        # Locks may have been held by parent threads that don't exist here
+        self._lock = threading.Lock()
+        self.schema_lock = threading.Lock()
+        self._connections = []
+        self._local = threading.local()
+        self._pid = os.getpid()
+
+
+def _alive(thread_ref):
+    thread = thread_ref()
+    return thread is not None and thread.is_alive()
+
 
 class DatabaseManager:
-    def __init__(self, db_path="baseball_stats.db"):
-        """Initialize database connection and create tables if they don't exist.
+    _shared = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, db_path="baseball_stats.db", encoding="binary", write_behind=False,
+                 flush_size=DEFAULT_FLUSH_SIZE, flush_interval=DEFAULT_FLUSH_INTERVAL, write_queue=None,
+                 snapshot=None):
+        """Initialize a manager. The database file is opened, and its tables
+        created, on first use rather than here.
         
         Args:
             db_path: Path to SQLite database file
+            encoding: How new profiles are written: "binary" for compact float32
+                blobs, or "json" for human-readable text when debugging. Rows in
+                either encoding are always readable.
+            write_behind: Buffer profile and name writes and flush them in one
+                transaction per batch, instead of committing every write.
+                Buffered writes are visible to this manager's reads right away.
+            flush_size: Number of buffered profiles and names that triggers a flush
+            flush_interval: Age in seconds of the oldest buffered write that
+                triggers a flush on the next write
+            write_queue: Queue of a CacheWriter process. Flushed batches are sent
+                there instead of being written here, so many processes can share
+                one database without contending for its write lock. Implies
+                write_behind.
+            snapshot: Optional path to a snapshot from export_snapshot(), or an
+                open ProfileSnapshot. Profile and name reads for its training
+                window are served from the memory-mapped snapshot, falling back
+                to SQLite for players it doesn't hold.
         """
+        if encoding not in ENCODINGS:
+            raise ValueError(f"Unknown encoding: {encoding}")
         self.db_path = db_path
-        self._init_db()
+        self.encoding = encoding
+        self.write_behind = write_behind or write_queue is not None
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self._write_queue = write_queue
+        self._pending_profiles = {}  # (role, fingerprint) -> {player_id: profile}
+        self._pending_names = {}
+        self._pending_count = 0
+        self._oldest_pending = None
+        self._pending_lock = threading.RLock()
+        if snapshot is not None and not isinstance(snapshot, ProfileSnapshot):
+            snapshot = ProfileSnapshot(snapshot)
+        self.snapshot = snapshot
+        self._pool = ConnectionPool.for_path(db_path)
+        if self.write_behind:
+            atexit.register(self.flush)
+
+    @classmethod
+    def shared(cls, db_path="baseball_stats.db"):
+        """Get the default manager for a database file, creating it on first use.
+
+        Players created without an explicit manager share this one instead of
+        each building their own.
+        """
+        key = os.path.abspath(db_path)
+        with cls._shared_lock:
+            db = cls._shared.get(key)
+            if db is None:
+                db = cls._shared[key] = cls(db_path)
+            return db
+
+    def __deepcopy__(self, memo):
+        # A manager is a handle on a shared cache, so copies of the players and
+        # teams holding it keep using the same one
+        return self
+
+    def __getstate__(self):
+        # Locks, pooled connections and unflushed writes belong to this
+        # process, so a manager sent to another one reopens the cache by path
+        state = self.__dict__.copy()
+        del state['_pending_lock'], state['_pool']
+        state.update(_pending_profiles={}, _pending_names={}, _pending_count=0, _oldest_pending=None)
+        if self.snapshot is not None:
+            state['snapshot'] = self.snapshot.path
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._pending_lock = threading.RLock()
+        if self.snapshot is not None:
+            self.snapshot = ProfileSnapshot(self.snapshot)
+        self._pool = ConnectionPool.for_path(self.db_path)
+        if self.write_behind:
+            atexit.register(self.flush)
+
+    def _connection(self):
+        """Get the pooled connection for the calling thread, creating the schema once per file."""
+        pool = self._pool
+        # Connect first, so a forked child resets the pool's locks before taking one
+        conn = pool.connection()
+        if not pool.schema_ready:
+            with pool.schema_lock:
+                if not pool.schema_ready:
+                    self._init_db(conn)
+                    pool.schema_ready = True
+        return conn
+
+    def close(self):
+        """Flush buffered writes and close all pooled connections to this database."""
+        self.flush()
+        self._pool.close()
+
+    def flush(self):
+        """Write every buffered profile and name in one transaction.
+
+        In single-writer mode the batch is sent to the CacheWriter instead.
+        Does nothing unless write-behind is enabled and writes are pending.
+        """
+        with self._pending_lock:
+            if not self._pending_count:
+                return
+            ops = [
+                ('profiles', role, fingerprint, profiles)
+                for (role, fingerprint), profiles in self._pending_profiles.items()
+            ]
+            if self._pending_names:
+                ops.append(('names', self._pending_names))
+            self._pending_profiles = {}
+            self._pending_names = {}
+            self._pending_count = 0
+            self._oldest_pending = None
+
+            if self._write_queue is not None:
+                self._write_queue.put(ops)
+            else:
+                self._write(ops)
     
-    def _init_db(self):
-        """Initialize database tables if they don't exist."""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            
-            # Create batter_probs_basic table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS batter_probs_basic (
-                    batter_id INTEGER PRIMARY KEY,
-                    probs_json TEXT NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            
-            # Create batter_probs_global table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS batter_probs_global (
-                    batter_id INTEGER PRIMARY KEY,
-                    probs_json TEXT NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            
-            # Create batter_probs_count_based table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS batter_probs_count_based (
-                    batter_id INTEGER PRIMARY KEY,
-                    probs_json TEXT NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            
-            # Create batter_probs_in_play table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS batter_probs_in_play (
-                    batter_id INTEGER PRIMARY KEY,
-                    probs_json TEXT NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            
-            # Create pitcher tables
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS pitcher_basic_probs (
-                    pitcher_id INTEGER PRIMARY KEY,
-                    probs_json TEXT NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    def _init_db(self, conn):
+        """Create the schema, migrating older cache files to the current layout."""
+        with conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS schema_version (
+                    version INTEGER NOT NULL
                 )
             """)
-            
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS pitcher_count_based_probs (
-                    pitcher_id INTEGER PRIMARY KEY,
-                    probs_json TEXT NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS pitcher_in_play_probs (
-                    pitcher_id INTEGER PRIMARY KEY,
-                    probs_json TEXT NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            
-            # Create player_names table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS player_names (
-                    player_id INTEGER PRIMARY KEY,
-                    first_name TEXT NOT NULL,
-                    last_name TEXT NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            
-            conn.commit()
+            row = conn.execute("SELECT version FROM schema_version").fetchone()
+            if row is None:
+                # Cache files from before versioning still have the per-tier tables
+                legacy = conn.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'batter_probs_basic'"
+                ).fetchone()
+                version = 1 if legacy else SCHEMA_VERSION
+                conn.execute("INSERT INTO schema_version (version) VALUES (?)", (version,))
+            else:
+                version = row[0]
+
+            while version < SCHEMA_VERSION:
+                MIGRATIONS[version](conn)
+                version += 1
+                conn.execute("UPDATE schema_version SET version = ?", (version,))
+
+            self._create_tables(conn)
+
+    def _create_tables(self, conn):
+        """Create the current tables if they don't exist."""
+        # One row per player, role, model version and training window holding every tier
+        conn.execute(PLAYER_PROFILES_DDL.format(table='player_profiles'))
+
+        # Create player_names table
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS player_names (
+                player_id INTEGER PRIMARY KEY,
+                first_name TEXT NOT NULL,
+                last_name TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
     
-    def get_batter_probs_basic(self, batter_id):
+    def get_batter_probs_basic(self, batter_id, fingerprint=LEGACY_FINGERPRINT):
         """Get basic probabilities for a batter.
         
         Args:
             batter_id: MLB ID of the batter
+            fingerprint: Training window, see training_fingerprint()
             
         Returns:
             dict: Dictionary of basic probabilities or None if not found
         """
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            
-            cursor.execute(
-                "SELECT probs_json FROM batter_probs_basic WHERE batter_id = ?",
-                (batter_id,)
-            )
-            
-            result = cursor.fetchone()
-            if result:
-                return json.loads(result[0])
-            return None
+        return self._get_tier(batter_id, 'batter', 'basic', fingerprint)
     
-    def set_batter_probs_basic(self, batter_id, probs_dict):
+    def set_batter_probs_basic(self, batter_id, probs_dict, fingerprint=LEGACY_FINGERPRINT):
         """Store basic probabilities for a batter.
         
         Args:
             batter_id: MLB ID of the batter
             probs_dict: Dictionary of probabilities
+            fingerprint: Training window the probabilities were computed from
         """
-        # Convert numpy values to Python native types for JSON serialization
-        cleaned_probs = {}
-        for k, v in probs_dict.items():
-            if isinstance(v, np.floating):
-                cleaned_probs[k] = float(v)
-            elif isinstance(v, np.integer):
-                cleaned_probs[k] = int(v)
-            else:
-                cleaned_probs[k] = v
-        
-        # Convert batter_id to regular int if it's numpy integer
-        if isinstance(batter_id, np.integer):
-            batter_id = int(batter_id)
-        
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                INSERT OR REPLACE INTO batter_probs_basic (batter_id, probs_json)
-                VALUES (?, ?)
-            """, (batter_id, json.dumps(cleaned_probs)))
-            
-            conn.commit()
+        self._set_tier(batter_id, 'batter', 'basic', probs_dict, fingerprint)
     
-    def get_batter_probs_global(self, batter_id):
+    def get_batter_probs_global(self, batter_id, fingerprint=LEGACY_FINGERPRINT):
         """Get global probabilities for a batter.
         
         Args:
             batter_id: MLB ID of the batter
+            fingerprint: Training window, see training_fingerprint()
             
         Returns:
             dict: Dictionary of global probabilities or None if not found
         """
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
+        return self._get_tier(batter_id, 'batter', 'global', fingerprint)
             
-            cursor.execute(
-                "SELECT probs_json FROM batter_probs_global WHERE batter_id = ?",
-                (batter_id,)
-            )
-            
-            result = cursor.fetchone()
-            if result:
-                return json.loads(result[0])
-            return None
-            
-    def set_batter_probs_global(self, batter_id, probs):
+    def set_batter_probs_global(self, batter_id, probs, fingerprint=LEGACY_FINGERPRINT):
         """Set global probabilities for a batter.
         
         Args:
             batter_id: MLB ID of the batter
             probs: Dictionary of probabilities to store
+            fingerprint: Training window the probabilities were computed from
         """
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            
-            cursor.execute(
-                """
-                INSERT OR REPLACE INTO batter_probs_global (batter_id, probs_json)
-                VALUES (?, ?)
-                """,
-                (batter_id, json.dumps(probs))
-            )
+        self._set_tier(batter_id, 'batter', 'global', probs, fingerprint)
             
-            conn.commit()
-            
-    def get_batter_probs_count_based(self, batter_id):
+    def get_batter_probs_count_based(self, batter_id, fingerprint=LEGACY_FINGERPRINT):
         """Get count-based probabilities for a batter.
         
         Args:
             batter_id: MLB ID of the batter
+            fingerprint: Training window, see training_fingerprint()
             
         Returns:
             dict: Dictionary of count-based probabilities or None if not found
         """
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            
-            cursor.execute(
-                "SELECT probs_json FROM batter_probs_count_based WHERE batter_id = ?",
-                (batter_id,)
-            )
-            
-            result = cursor.fetchone()
-            if result:
-                return json.loads(result[0])
-            return None
+        return self._get_tier(batter_id, 'batter', 'count_based', fingerprint)
             
-    def set_batter_probs_count_based(self, batter_id, probs):
+    def set_batter_probs_count_based(self, batter_id, probs, fingerprint=LEGACY_FINGERPRINT):
         """Set count-based probabilities for a batter.
         
         Args:
             batter_id: MLB ID of the batter
             probs: Dictionary of probabilities to store
+            fingerprint: Training window the probabilities were computed from
         """
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            
-            cursor.execute(
-                """
-                INSERT OR REPLACE INTO batter_probs_count_based (batter_id, probs_json)
-                VALUES (?, ?)
-                """,
-                (batter_id, json.dumps(probs))
-            )
-            
-            conn.commit()
+        self._set_tier(batter_id, 'batter', 'count_based', probs, fingerprint)
             
-    def get_batter_probs_in_play(self, batter_id):
+    def get_batter_probs_in_play(self, batter_id, fingerprint=LEGACY_FINGERPRINT):
         """Get in-play probabilities for a batter.
         
         Args:
             batter_id: MLB ID of the batter
+            fingerprint: Training window, see training_fingerprint()
             
         Returns:
             dict: Dictionary of in-play probabilities or None if not found
         """
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            
-            cursor.execute(
-                "SELECT probs_json FROM batter_probs_in_play WHERE batter_id = ?",
-                (batter_id,)
-            )
+        return self._get_tier(batter_id, 'batter', 'in_play', fingerprint)
             
-            result = cursor.fetchone()
-            if result:
-                return json.loads(result[0])
-            return None
-            
-    def set_batter_probs_in_play(self, batter_id, probs):
+    def set_batter_probs_in_play(self, batter_id, probs, fingerprint=LEGACY_FINGERPRINT):
         """Set in-play probabilities for a batter.
         
         Args:
             batter_id: MLB ID of the batter
             probs: Dictionary of probabilities to store
+            fingerprint: Training window the probabilities were computed from
         """
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            
-            cursor.execute(
-                """
-                INSERT OR REPLACE INTO batter_probs_in_play (batter_id, probs_json)
-                VALUES (?, ?)
-                """,
-                (batter_id, json.dumps(probs))
-            )
-            
-            conn.commit()
+        self._set_tier(batter_id, 'batter', 'in_play', probs, fingerprint)
             
     def get_player_name(self, player_id):
         """Get player name from database.
@@ -279,17 +442,18 @@ class DatabaseManager:
         Returns:
             Tuple of (first_name, last_name) if found, None if not found
         """
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                """
-                SELECT first_name, last_name FROM player_names
-                WHERE player_id = ?
-                """,
-                (player_id,)
-            )
-            result = cursor.fetchone()
-            return result if result else None
+        pending = self._pending_names.get(int(player_id))
+        if pending is not None:
+            return pending
+        conn = self._connection()
+        result = conn.execute(
+            """
+            SELECT first_name, last_name FROM player_names
+            WHERE player_id = ?
+            """,
+            (int(player_id),)
+        ).fetchone()
+        return result if result else None
     
     def set_player_name(self, player_id, first_name, last_name):
         """Set player name in database.
@@ -299,116 +463,688 @@ class DatabaseManager:
             first_name: Player's first name
             last_name: Player's last name
         """
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                """
-                INSERT OR REPLACE INTO player_names (player_id, first_name, last_name)
-                VALUES (?, ?, ?)
-                """,
-                (player_id, first_name, last_name)
-            )
-            
-            conn.commit()
+        self.set_player_names({player_id: (first_name, last_name)})
+
+    def get_player_profile(self, player_id, role, fingerprint=LEGACY_FINGERPRINT):
+        """Get every cached tier and the name of one player in a single point read.
+
+        Args:
+            player_id: MLB ID of the player
+            role: 'batter' or 'pitcher'
+            fingerprint: Training window, see training_fingerprint()
+
+        Returns:
+            Tuple of (profile, name). profile maps tier name -> probabilities
+            (None for tiers that are not cached) or is None if the player has
+            no cached profile; name is (first_name, last_name) or None.
+        """
+        tiers = ROLE_TIERS[role]
+        snapshot = self._snapshot_for(fingerprint)
+        if snapshot is not None and (player_id, role) in snapshot:
+            profile = snapshot.get_profile(player_id, role)
+            name = snapshot.get_player_name(player_id) or self.get_player_name(player_id)
+        else:
+            profile, name = self._read_player_profile(player_id, role, fingerprint)
+
+        pending = self._pending_profiles.get((role, fingerprint), {}).get(int(player_id))
+        if pending is not None:
+            profile = _overlay(profile or dict.fromkeys(tiers), pending)
+        return profile, self._pending_names.get(int(player_id), name)
+
+    def _read_player_profile(self, player_id, role, fingerprint):
+        tiers = ROLE_TIERS[role]
+        conn = self._connection()
+        row = conn.execute(
+            """
+            SELECT p.player_id, {}, n.first_name, n.last_name
+            FROM (SELECT ? AS player_id) AS key
+            LEFT JOIN player_profiles AS p
+                ON p.player_id = key.player_id AND p.role = ? AND p.model_version = ? AND p.fingerprint = ?
+            LEFT JOIN player_names AS n ON n.player_id = key.player_id
+            """.format(', '.join('p.{}_probs'.format(tier) for tier in tiers)),
+            (int(player_id), role, MODEL_VERSION, fingerprint)
+        ).fetchone()
+
+        profile = None
+        if row[0] is not None:
+            profile = {tier: _decode(role, tier, value) for tier, value in zip(tiers, row[1:-2])}
+        name = tuple(row[-2:]) if row[-2] is not None else None
+        return profile, name
             
     def clear_batter_probs_basic(self):
         """Clear all entries from the batter_probs_basic table."""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM batter_probs_basic")
-            conn.commit()
+        self._clear_tier('batter', 'basic')
 
     def clear_all_batter_probs_basic(self):
         """Clear all entries from the batter_probs_basic table."""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM batter_probs_basic")
-            conn.commit()
+        self._clear_tier('batter', 'basic')
 
     def clear_all_tables(self):
         """Clear all tables in the database."""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM batter_probs_basic")
-            cursor.execute("DELETE FROM batter_probs_global")
-            cursor.execute("DELETE FROM batter_probs_count_based")
-            cursor.execute("DELETE FROM batter_probs_in_play")
-            cursor.execute("DELETE FROM player_names")
-            cursor.execute("DELETE FROM pitcher_basic_probs")
-            cursor.execute("DELETE FROM pitcher_count_based_probs")
-            cursor.execute("DELETE FROM pitcher_in_play_probs")
+        self.flush()
+        conn = self._connection()
+        with conn:
+            conn.execute("DELETE FROM player_profiles")
+            conn.execute("DELETE FROM player_names")
             
         # Then VACUUM outside the transaction
-        with sqlite3.connect(self.db_path) as conn:
-            conn.isolation_level = None
-            cursor = conn.cursor()
-            cursor.execute("VACUUM")
+        conn.execute("VACUUM")
 
-    def get_pitcher_basic_probs(self, pitcher_id):
+    def get_pitcher_basic_probs(self, pitcher_id, fingerprint=LEGACY_FINGERPRINT):
         """Get basic probabilities for a pitcher."""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                "SELECT probs_json FROM pitcher_basic_probs WHERE pitcher_id = ?",
-                (pitcher_id,)
-            )
-            result = cursor.fetchone()
-            return json.loads(result[0]) if result else None
+        return self._get_tier(pitcher_id, 'pitcher', 'basic', fingerprint)
 
-    def set_pitcher_basic_probs(self, pitcher_id, probs):
+    def set_pitcher_basic_probs(self, pitcher_id, probs, fingerprint=LEGACY_FINGERPRINT):
         """Store basic probabilities for a pitcher."""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                "INSERT OR REPLACE INTO pitcher_basic_probs (pitcher_id, probs_json) VALUES (?, ?)",
-                (pitcher_id, json.dumps(probs))
-            )
-            conn.commit()
+        self._set_tier(pitcher_id, 'pitcher', 'basic', probs, fingerprint)
 
-    def get_pitcher_count_based_probs(self, pitcher_id):
+    def get_pitcher_count_based_probs(self, pitcher_id, fingerprint=LEGACY_FINGERPRINT):
         """Get count-based probabilities for a pitcher."""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                "SELECT probs_json FROM pitcher_count_based_probs WHERE pitcher_id = ?",
-                (pitcher_id,)
-            )
-            result = cursor.fetchone()
-            if result:
-                # Convert string tuple keys back to actual tuples
-                probs = json.loads(result[0])
-                return {eval(k): v for k, v in probs.items()}
-            return None
-
-    def set_pitcher_count_based_probs(self, pitcher_id, probs):
+        return self._get_tier(pitcher_id, 'pitcher', 'count_based', fingerprint)
+
+    def set_pitcher_count_based_probs(self, pitcher_id, probs, fingerprint=LEGACY_FINGERPRINT):
         """Store count-based probabilities for a pitcher."""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            # Convert tuple keys to strings for JSON serialization
-            probs_json = {str(k): v for k, v in probs.items()}
-            cursor.execute(
-                "INSERT OR REPLACE INTO pitcher_count_based_probs (pitcher_id, probs_json) VALUES (?, ?)",
-                (pitcher_id, json.dumps(probs_json))
-            )
-            conn.commit()
+        self._set_tier(pitcher_id, 'pitcher', 'count_based', probs, fingerprint)
 
-    def get_pitcher_in_play_probs(self, pitcher_id):
+    def get_pitcher_in_play_probs(self, pitcher_id, fingerprint=LEGACY_FINGERPRINT):
         """Get in-play probabilities for a pitcher."""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                "SELECT probs_json FROM pitcher_in_play_probs WHERE pitcher_id = ?",
-                (pitcher_id,)
-            )
-            result = cursor.fetchone()
-            return json.loads(result[0]) if result else None
+        return self._get_tier(pitcher_id, 'pitcher', 'in_play', fingerprint)
 
-    def set_pitcher_in_play_probs(self, pitcher_id, probs):
+    def set_pitcher_in_play_probs(self, pitcher_id, probs, fingerprint=LEGACY_FINGERPRINT):
         """Store in-play probabilities for a pitcher."""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                "INSERT OR REPLACE INTO pitcher_in_play_probs (pitcher_id, probs_json) VALUES (?, ?)",
-                (pitcher_id, json.dumps(probs))
+        self._set_tier(pitcher_id, 'pitcher', 'in_play', probs, fingerprint)
+
+    def get_batter_profiles(self, batter_ids, fingerprint=LEGACY_FINGERPRINT):
+        """Get every cached probability tier for several batters at once.
+
+        Args:
+            batter_ids: Iterable of batter MLB IDs
+            fingerprint: Training window, see training_fingerprint()
+
+        Returns:
+            dict: Maps each batter ID to a dict of tier name -> probabilities,
+            with None for tiers that are not cached
+        """
+        return self._get_profiles(batter_ids, 'batter', fingerprint)
+
+    def get_pitcher_profiles(self, pitcher_ids, fingerprint=LEGACY_FINGERPRINT):
+        """Get every cached probability tier for several pitchers at once.
+
+        Args:
+            pitcher_ids: Iterable of pitcher MLB IDs
+            fingerprint: Training window, see training_fingerprint()
+
+        Returns:
+            dict: Maps each pitcher ID to a dict of tier name -> probabilities,
+            with None for tiers that are not cached
+        """
+        return self._get_profiles(pitcher_ids, 'pitcher', fingerprint)
+
+    def get_player_names(self, player_ids):
+        """Get cached names for several players at once.
+
+        Args:
+            player_ids: Iterable of player MLB IDs
+
+        Returns:
+            dict: Maps each found player ID to a (first_name, last_name) tuple
+        """
+        player_ids = [int(player_id) for player_id in player_ids]
+        names = {}
+        if self.snapshot is not None:
+            for player_id in player_ids:
+                name = self.snapshot.get_player_name(player_id)
+                if name is not None:
+                    names[player_id] = name
+        conn = self._connection()
+        for chunk in _chunks([player_id for player_id in player_ids if player_id not in names]):
+            rows = conn.execute(
+                "SELECT player_id, first_name, last_name FROM player_names WHERE player_id IN ({})".format(
+                    ','.join('?' * len(chunk))),
+                chunk
+            )
+            for player_id, first_name, last_name in rows:
+                names[player_id] = (first_name, last_name)
+        for player_id in player_ids:
+            if player_id in self._pending_names:
+                names[player_id] = self._pending_names[player_id]
+        return names
+
+    def set_batter_profiles(self, profiles, fingerprint=LEGACY_FINGERPRINT):
+        """Store probability tiers for several batters in one transaction.
+
+        Args:
+            profiles: Dict mapping batter ID to a dict of tier name -> probabilities.
+                Tiers that are missing or None are left untouched.
+            fingerprint: Training window the profiles were computed from
+        """
+        self._set_profiles(profiles, 'batter', fingerprint)
+
+    def set_pitcher_profiles(self, profiles, fingerprint=LEGACY_FINGERPRINT):
+        """Store probability tiers for several pitchers in one transaction.
+
+        Args:
+            profiles: Dict mapping pitcher ID to a dict of tier name -> probabilities.
+                Tiers that are missing or None are left untouched.
+            fingerprint: Training window the profiles were computed from
+        """
+        self._set_profiles(profiles, 'pitcher', fingerprint)
+
+    def set_player_names(self, names):
+        """Store names for several players in one transaction.
+
+        Args:
+            names: Dict mapping player ID to a (first_name, last_name) tuple
+        """
+        names = {int(player_id): tuple(name) for player_id, name in names.items()}
+        if not self.write_behind:
+            self._write([('names', names)])
+            return
+        with self._pending_lock:
+            self._pending_names.update(names)
+            self._buffered(len(names))
+
+    def convert_encoding(self, encoding=None):
+        """Rewrite every cached profile in the given encoding.
+
+        Converts existing cache files between JSON text and binary blobs.
+
+        Args:
+            encoding: Target encoding, defaults to this manager's encoding
+
+        Returns:
+            int: Number of profile rows rewritten
+        """
+        encoding = encoding or self.encoding
+        if encoding not in ENCODINGS:
+            raise ValueError(f"Unknown encoding: {encoding}")
+        self.flush()
+        columns = ', '.join('{}_probs'.format(tier) for tier in PROFILE_TIERS)
+        conn = self._connection()
+        with conn:
+            rows = conn.execute(
+                "SELECT player_id, role, model_version, fingerprint, {} FROM player_profiles".format(columns)
+            ).fetchall()
+            conn.executemany(
+                """
+                UPDATE player_profiles SET {}
+                WHERE player_id = ? AND role = ? AND model_version = ? AND fingerprint = ?
+                """.format(', '.join('{}_probs = ?'.format(tier) for tier in PROFILE_TIERS)),
+                [
+                    tuple(
+                        _encode(role, tier, _decode(role, tier, value), encoding)
+                        for tier, value in zip(PROFILE_TIERS, values)
+                    ) + (player_id, role, model_version, fingerprint)
+                    for player_id, role, model_version, fingerprint, *values in rows
+                ]
+            )
+        conn.execute("VACUUM")
+        return len(rows)
+
+    def get_fingerprints(self):
+        """Get the training windows that have cached profiles.
+
+        Returns:
+            dict: Maps each fingerprint to its number of cached profiles
+        """
+        self.flush()
+        conn = self._connection()
+        rows = conn.execute(
+            "SELECT fingerprint, COUNT(*) FROM player_profiles WHERE model_version = ? GROUP BY fingerprint",
+            (MODEL_VERSION,)
+        )
+        return dict(rows)
+
+    def clear_fingerprint(self, fingerprint):
+        """Delete every cached profile computed from one training window.
+
+        Args:
+            fingerprint: Training window to drop, see training_fingerprint()
+        """
+        self.flush()
+        conn = self._connection()
+        with conn:
+            conn.execute("DELETE FROM player_profiles WHERE fingerprint = ?", (fingerprint,))
+
+    def export_snapshot(self, path, fingerprint=LEGACY_FINGERPRINT):
+        """Export every cached profile of one training window as a snapshot file.
+
+        The snapshot holds dense float32 tensors and names for every player,
+        and can be opened read-only and memory-mapped by any number of
+        processes, see ProfileSnapshot and the snapshot argument.
+
+        Args:
+            path: Snapshot file to write
+            fingerprint: Training window to export, see training_fingerprint()
+
+        Returns:
+            int: Number of player profiles exported
+        """
+        self.flush()
+        conn = self._connection()
+        profiles = {}
+        for role, tiers in ROLE_TIERS.items():
+            rows = conn.execute(
+                """
+                SELECT player_id, {} FROM player_profiles
+                WHERE role = ? AND model_version = ? AND fingerprint = ?
+                """.format(', '.join('{}_probs'.format(tier) for tier in tiers)),
+                (role, MODEL_VERSION, fingerprint)
+            )
+            profiles[role] = {
+                row[0]: {tier: _decode_array(role, tier, value) for tier, value in zip(tiers, row[1:])}
+                for row in rows
+            }
+        player_ids = set(profiles['batter']) | set(profiles['pitcher'])
+        write_snapshot(path, fingerprint, profiles, self.get_player_names(player_ids), MODEL_VERSION)
+        return len(profiles['batter']) + len(profiles['pitcher'])
+
+    def _snapshot_for(self, fingerprint):
+        """Get the attached snapshot if it holds this training window."""
+        if self.snapshot is not None and self.snapshot.fingerprint == fingerprint \
+                and self.snapshot.model_version == MODEL_VERSION:
+            return self.snapshot
+        return None
+
+    def _get_tier(self, player_id, role, tier, fingerprint):
+        pending = self._pending_profiles.get((role, fingerprint), {}).get(int(player_id), {}).get(tier)
+        if pending is not None:
+            return pending
+        snapshot = self._snapshot_for(fingerprint)
+        if snapshot is not None and (player_id, role) in snapshot:
+            dense = snapshot.get_array(player_id, role, tier)
+            return None if dense is None else profile_codec.to_dict(role, tier, dense)
+        conn = self._connection()
+        result = conn.execute(
+            """
+            SELECT {}_probs FROM player_profiles
+            WHERE player_id = ? AND role = ? AND model_version = ? AND fingerprint = ?
+            """.format(tier),
+            (int(player_id), role, MODEL_VERSION, fingerprint)
+        ).fetchone()
+        return _decode(role, tier, result[0]) if result else None
+
+    def _set_tier(self, player_id, role, tier, probs, fingerprint):
+        self._set_profiles({player_id: {tier: probs}}, role, fingerprint)
+
+    def _clear_tier(self, role, tier):
+        self.flush()
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                "UPDATE player_profiles SET {}_probs = NULL WHERE role = ?".format(tier),
+                (role,)
+            )
+
+    def _get_profiles(self, player_ids, role, fingerprint):
+        tiers = ROLE_TIERS[role]
+        player_ids = [int(player_id) for player_id in player_ids]
+        profiles = {}
+        snapshot = self._snapshot_for(fingerprint)
+        if snapshot is not None:
+            profiles.update(snapshot.get_profiles(player_ids, role))
+        conn = self._connection()
+        for chunk in _chunks([player_id for player_id in player_ids if player_id not in profiles]):
+            rows = conn.execute(
+                """
+                SELECT player_id, {} FROM player_profiles
+                WHERE role = ? AND model_version = ? AND fingerprint = ? AND player_id IN ({})
+                """.format(', '.join('{}_probs'.format(tier) for tier in tiers), ','.join('?' * len(chunk))),
+                [role, MODEL_VERSION, fingerprint] + chunk
+            )
+            for row in rows:
+                profiles[row[0]] = {tier: _decode(role, tier, value) for tier, value in zip(tiers, row[1:])}
+
+        pending = self._pending_profiles.get((role, fingerprint), {})
+        for player_id in player_ids:
+            if player_id in pending:
+                profiles[player_id] = _overlay(profiles.get(player_id) or dict.fromkeys(tiers), pending[player_id])
+        return profiles
+
+    def _set_profiles(self, profiles, role, fingerprint):
+        profiles = {int(player_id): profile for player_id, profile in profiles.items()}
+        if not self.write_behind:
+            self._write([('profiles', role, fingerprint, profiles)])
+            return
+        with self._pending_lock:
+            pending = self._pending_profiles.setdefault((role, fingerprint), {})
+            for player_id, profile in profiles.items():
+                if player_id in pending:
+                    pending[player_id] = _overlay(pending[player_id], profile)
+                else:
+                    pending[player_id] = dict(profile)
+                    self._pending_count += 1
+            self._buffered(0)
+
+    def _buffered(self, count):
+        """Account for newly buffered writes and flush if a threshold is reached."""
+        self._pending_count += count
+        if self._oldest_pending is None:
+            self._oldest_pending = time.monotonic()
+        if (self._pending_count >= self.flush_size or
+                time.monotonic() - self._oldest_pending >= self.flush_interval):
+            self.flush()
+
+    def _write(self, ops):
+        """Apply a batch of profile and name writes in one transaction.
+
+        Args:
+            ops: List of ('profiles', role, fingerprint, {player_id: profile})
+                and ('names', {player_id: (first_name, last_name)}) tuples
+        """
+        columns = ', '.join('{}_probs'.format(tier) for tier in PROFILE_TIERS)
+        # Tiers that are None keep whatever the row already holds
+        updates = ', '.join(
+            '{0}_probs = COALESCE(excluded.{0}_probs, {0}_probs)'.format(tier) for tier in PROFILE_TIERS
+        )
+        conn = self._connection()
+        with conn:
+            for op in ops:
+                if op[0] == 'names':
+                    conn.executemany(
+                        """
+                        INSERT OR REPLACE INTO player_names (player_id, first_name, last_name)
+                        VALUES (?, ?, ?)
+                        """,
+                        [(player_id, first, last) for player_id, (first, last) in op[1].items()]
+                    )
+                    continue
+
+                _, role, fingerprint, profiles = op
+                conn.executemany(
+                    """
+                    INSERT INTO player_profiles (player_id, role, model_version, fingerprint, {})
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (player_id, role, model_version, fingerprint) DO UPDATE SET {}
+                    """.format(columns, updates),
+                    [
+                        (player_id, role, MODEL_VERSION, fingerprint) + tuple(
+                            _encode(role, tier, profile.get(tier), self.encoding) for tier in PROFILE_TIERS
+                        )
+                        for player_id, profile in profiles.items()
+                    ]
+                )
+
+
+class CacheWriter:
+    """Single writer process that owns all writes to a profile cache.
+
+    Worker processes create their DatabaseManager with
+    write_queue=writer.queue. Their flushed batches are applied here, with
+    everything waiting on the queue folded into one transaction, so parallel
+    runs never fail with 'database is locked'.
+    """
+
+    def __init__(self, db_path="baseball_stats.db", encoding="binary"):
+        """Initialize the writer. Call start() before handing out the queue.
+
+        Args:
+            db_path: Path to SQLite database file
+            encoding: Encoding used for profiles written by this process
+        """
+        self.db_path = db_path
+        self.encoding = encoding
+        self.queue = multiprocessing.Queue()
+        self._process = None
+
+    def start(self):
+        """Start the writer process."""
+        self._process = multiprocessing.Process(
+            target=_run_cache_writer, args=(self.queue, self.db_path, self.encoding), daemon=True
+        )
+        self._process.start()
+        return self
+
+    def stop(self):
+        """Apply every batch sent so far and stop the writer process."""
+        self.queue.put(None)
+        self._process.join()
+        self._process = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def _run_cache_writer(queue, db_path, encoding):
+    """Apply batches from the queue until a None sentinel arrives."""
+    db = DatabaseManager(db_path, encoding=encoding)
+    running = True
+    while running:
+        batch = queue.get()
+        if batch is None:
+            break
+        ops = list(batch)
+        # Fold whatever else is already waiting into the same transaction
+        while True:
+            try:
+                batch = queue.get_nowait()
+            except Exception:
+                break
+            if batch is None:
+                running = False
+                break
+            ops.extend(batch)
+        db._write(ops)
+    db.close()
+
+
+def _migrate_v1_to_v2(conn):
+    """Fold the per-tier tables into player_profiles and drop them."""
+    conn.execute("""
+        CREATE TABLE player_profiles (
+            player_id INTEGER NOT NULL,
+            role TEXT NOT NULL,
+            model_version INTEGER NOT NULL,
+            in_play_probs TEXT,
+            basic_probs TEXT,
+            global_probs TEXT,
+            count_based_probs TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (player_id, role, model_version)
+        ) WITHOUT ROWID
+    """)
+    for role, tables in LEGACY_TABLES.items():
+        for tier, (table, id_column) in tables.items():
+            exists = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+            ).fetchone()
+            if not exists:
+                continue
+            # The WHERE clause keeps SQLite from parsing ON CONFLICT as a join constraint
+            conn.execute(
+                """
+                INSERT INTO player_profiles (player_id, role, model_version, {0}_probs)
+                SELECT {1}, ?, ?, probs_json FROM {2} WHERE true
+                ON CONFLICT (player_id, role, model_version) DO UPDATE SET {0}_probs = excluded.{0}_probs
+                """.format(tier, id_column, table),
+                (role, MODEL_VERSION)
             )
-            conn.commit()
+            conn.execute("DROP TABLE {}".format(table))
+
+
+def _migrate_v2_to_v3(conn):
+    """Add the training window fingerprint to the player_profiles key.
+
+    Existing rows were computed from an unknown window and keep the legacy
+    fingerprint, so fingerprinted lookups treat them as misses.
+    """
+    conn.execute(PLAYER_PROFILES_DDL.format(table='player_profiles_v3'))
+    conn.execute("""
+        INSERT INTO player_profiles_v3 (player_id, role, model_version, fingerprint,
+            in_play_probs, basic_probs, global_probs, count_based_probs, created_at)
+        SELECT player_id, role, model_version, ?,
+            in_play_probs, basic_probs, global_probs, count_based_probs, created_at
+        FROM player_profiles
+    """, (LEGACY_FINGERPRINT,))
+    conn.execute("DROP TABLE player_profiles")
+    conn.execute("ALTER TABLE player_profiles_v3 RENAME TO player_profiles")
+
+
+# Migration that upgrades a database from each schema version to the next
+MIGRATIONS = {
+    1: _migrate_v1_to_v2,
+    2: _migrate_v2_to_v3,
+}
+
+
+def player_rows(statcast, role, player_id):
+    """Select one player's rows of the columns the models read.
+
+    The result doesn't reference statcast, so players can keep it for tiers
+    built later without keeping the whole training window alive.
+
+    Args:
+        statcast: DataFrame of statcast data
+        role: 'batter' or 'pitcher'
+        player_id: MLB ID of the player
+    """
+    columns = [column for column in FINGERPRINT_COLUMNS if column in statcast.columns]
+    return statcast.loc[statcast[role] == player_id, columns]
+
+
+def training_fingerprint(statcast, exclude_date=None):
+    """Fingerprint the training data that profiles are computed from.
+
+    Combines the game date range, the row count and a hash of the columns the
+    models read, so profiles from different training windows get distinct
+    cache keys. Rows are hashed as a multiset per game date, so the same rows
+    in any order give the same fingerprint, and leaving out a date only drops
+    its digest. Per-date digests are memoized per DataFrame object, which is
+    therefore treated as immutable once used for training.
+
+    Args:
+        statcast: DataFrame of statcast data
+        exclude_date: Optional game date to leave out. Gives the fingerprint
+            of statcast.loc[statcast.game_date != exclude_date] without
+            hashing that frame again.
+
+    Returns:
+        str: Fingerprint like '2024-03-29:2024-04-30:51234:9f86d081884c7d65'
+    """
+    columns, dates, rows, digests = _date_digests(statcast)
+    keep = np.ones(len(rows), dtype=bool)
+    if exclude_date is not None and dates is not None:
+        keep = np.asarray(dates != exclude_date)
+
+    start = end = ''
+    if dates is not None and keep.any():
+        start, end = str(dates[keep].min())[:10], str(dates[keep].max())[:10]
+    digest = hashlib.sha1(','.join(columns).encode())
+    for index in np.flatnonzero(keep):
+        digest.update(digests[index])
+    return f"{start}:{end}:{int(rows[keep].sum())}:{digest.hexdigest()[:16]}"
+
+
+def _date_digests(statcast):
+    """Hash the rows of each game date of statcast, memoized per DataFrame object.
+
+    Returns:
+        Tuple (columns, dates, rows, digests): the columns hashed, the sorted
+        distinct game dates (None without a game_date column, then all rows
+        count as one date), and each date's row count and digest
+    """
+    key = id(statcast)
+    cached = _fingerprints.get(key)
+    if cached is not None and cached[0]() is statcast:
+        return cached[1]
+
+    columns = [column for column in FINGERPRINT_COLUMNS if column in statcast.columns]
+    hashes = pd.util.hash_pandas_object(statcast[columns], index=False).to_numpy()
+    if 'game_date' in statcast.columns:
+        codes, dates = pd.factorize(statcast['game_date'], sort=True, use_na_sentinel=False)
+        labels = [str(date)[:10].encode() for date in dates]
+    else:
+        codes, dates, labels = np.zeros(len(statcast), dtype=np.int64), None, [b'']
+    # Sorted within each date so the digests don't depend on the order rows
+    # were fetched in
+    hashes = hashes[np.lexsort((hashes, codes))]
+    rows = np.bincount(codes, minlength=len(labels))
+    digests = [hashlib.sha1(label + date_hashes.tobytes()).digest()
+               for label, date_hashes in zip(labels, np.split(hashes, np.cumsum(rows)[:-1]))]
+    if not len(statcast):
+        digests, rows = [], rows[:0]
+    result = (columns, dates, rows, digests)
+
+    _fingerprints[key] = (weakref.ref(statcast, lambda _, key=key: _fingerprints.pop(key, None)), result)
+    return result
+
+
+# Memoized _date_digests() keyed by id() of the DataFrame, with a weak reference to it
+_fingerprints = {}
+
+
+def _encode(role, tier, probs, encoding):
+    """Serialize one tier of probabilities for storage.
+
+    Binary encoding falls back to JSON for dicts the fixed vocabularies in
+    profile_codec can't represent exactly.
+    """
+    if probs is None:
+        return None
+    if encoding == 'binary':
+        blob = profile_codec.encode(role, tier, probs)
+        if blob is not None:
+            return blob
+    if role == 'pitcher' and tier == 'count_based':
+        # Convert tuple keys to strings for JSON serialization
+        probs = {str(k): v for k, v in probs.items()}
+    return json.dumps(probs, default=_json_default)
+
+
+def _decode(role, tier, value):
+    """Deserialize one stored tier of probabilities, whichever its encoding."""
+    if value is None:
+        return None
+    if isinstance(value, bytes):
+        return profile_codec.decode(role, tier, value)
+    probs = json.loads(value)
+    if role == 'pitcher' and tier == 'count_based':
+        # Convert string tuple keys like "(3, 2)" back to actual tuples
+        probs = {tuple(int(x) for x in k.strip('()').split(',')): v for k, v in probs.items()}
+    return probs
+
+
+def _decode_array(role, tier, value):
+    """Deserialize one stored tier straight to its dense array, whichever its encoding."""
+    if value is None:
+        return None
+    if isinstance(value, bytes):
+        return profile_codec.decode_array(role, tier, value)
+    return profile_codec.to_array(role, tier, _decode(role, tier, value))
+
+
+def _chunks(ids, size=MAX_QUERY_PARAMS):
+    """Split IDs into lists small enough for one parameterized IN (...) query."""
+    ids = list(ids)
+    for start in range(0, len(ids), size):
+        yield ids[start:start + size]
+
+
+def _overlay(profile, pending):
+    """Merge buffered tiers over a stored profile, keeping stored tiers the buffer lacks."""
+    merged = dict(profile)
+    merged.update({tier: probs for tier, probs in pending.items() if probs is not None})
+    return merged
+
+
+def _json_default(value):
+    """Convert numpy scalars to Python native types for JSON serialization."""
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Convert a profile cache between binary and JSON encodings.")
+    parser.add_argument('--db', default="baseball_stats.db", help="Path to the SQLite cache file")
+    parser.add_argument('--encoding', choices=ENCODINGS, default='binary', help="Target encoding")
+    args = parser.parse_args()
+
+    db = DatabaseManager(args.db, encoding=args.encoding)
+    print(f"Converted {db.convert_encoding()} profiles in {args.db} to {args.encoding}")
+    db.close()
@@ -0,0 +1,196 @@
+import numpy as np
+from base_state import PA_RESULT_INDEX, narrate
+
+# Types of recorded events
+EVENT_TYPES = ('inning', 'pitch', 'plate_appearance', 'game_end', 'message')
+INNING, PITCH, PLATE_APPEARANCE, GAME_END, MESSAGE = range(len(EVENT_TYPES))
+
+# Log level of each kind of event, as SimulationInfo's logLevel counts them:
+# 1 for innings, scoring plays and the result, 2 for every plate appearance
+# and 3 for every pitch
+INNING_LEVEL = 1
+SCORING_LEVEL = 1
+PLATE_APPEARANCE_LEVEL = 2
+PITCH_LEVEL = 3
+
+# Columns of the log. IDs are MLB IDs, 0 where there's no player; pitch and
+# result are codes into EventLog.strings, result holding the text of free-form
+# messages; bases is the base state before a
+# plate appearance and first, second and third the runners on it.
+COLUMNS = (
+    ('type', np.int8), ('level', np.int8), ('inning', np.int16), ('top', np.bool_),
+    ('batter', np.int64), ('pitcher', np.int64), ('pitch_num', np.int16), ('pitch', np.int16),
+    ('result', np.int16), ('balls', np.int8), ('strikes', np.int8), ('runs', np.int16),
+    ('bases', np.int8), ('first', np.int64), ('second', np.int64), ('third', np.int64),
+    ('away_score', np.int16), ('home_score', np.int16),
+)
+
+# Rows allocated up front, doubled whenever they run out
+DEFAULT_CAPACITY = 1024
+
+
+class EventLog:
+    """Structured play-by-play of a game, stored in columnar arrays.
+
+    The game engine only builds events when SimulationInfo.logs() says a
+    listener wants their level, so a game without a log pays nothing. Events
+    are appended to preallocated NumPy columns, which keeps recording linear
+    in the length of the game, and text is only rendered by render().
+    """
+
+    def __init__(self, level=PITCH_LEVEL, capacity=DEFAULT_CAPACITY):
+        """Initialize an empty log.
+
+        Args:
+            level: Most detailed level of events recorded, see the *_LEVEL constants
+            capacity: Rows allocated up front
+        """
+        self.level = level
+        self.columns = {name: np.zeros(capacity, dtype=dtype) for name, dtype in COLUMNS}
+        self.strings = ['']  # Pitch types and results by code, 0 for none
+        self._codes = {'': 0}
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def clear(self):
+        """Forget every event, keeping the allocated columns."""
+        for column in self.columns.values():
+            column[:self._size] = 0
+        self._size = 0
+
+    def inning(self, inning, top, away_score, home_score):
+        """Record the start of a half inning."""
+        self._append(INNING, INNING_LEVEL, inning=inning, top=top, away_score=away_score, home_score=home_score)
+
+    def pitch(self, inning, top, batter, pitcher, pitch_num, pitch, result, balls, strikes):
+        """Record a pitch and the count after it.
+
+        Args:
+            batter: MLB ID of the batter
+            pitcher: MLB ID of the pitcher
+            pitch_num: Number of the pitch in the plate appearance, from 1
+            pitch: Pitch type
+            result: Pitch result, e.g. 'ball' or 'hit_into_play'
+        """
+        self._append(PITCH, PITCH_LEVEL, inning=inning, top=top, batter=batter, pitcher=pitcher,
+                     pitch_num=pitch_num, pitch=self._code(pitch), result=self._code(result),
+                     balls=balls, strikes=strikes)
+
+    def plate_appearance(self, inning, top, batter, pitcher, result, runs, bases, runners, away_score, home_score):
+        """Record the result of a plate appearance, at the scoring level when runs came in.
+
+        Args:
+            result: Plate appearance result, e.g. 'walk' or 'double'
+            runs: Runs scored on the play
+            bases: Base state before the play, see base_state
+            runners: MLB IDs of the runners on first, second and third before
+                the play, 0 for empty bases
+            away_score, home_score: Score after the play
+        """
+        first, second, third = runners
+        self._append(PLATE_APPEARANCE, SCORING_LEVEL if runs > 0 else PLATE_APPEARANCE_LEVEL,
+                     inning=inning, top=top, batter=batter, pitcher=pitcher, result=self._code(result),
+                     runs=runs, bases=bases, first=first, second=second, third=third,
+                     away_score=away_score, home_score=home_score)
+
+    def game_end(self, inning, away_score, home_score):
+        """Record the final score."""
+        self._append(GAME_END, INNING_LEVEL, inning=inning, away_score=away_score, home_score=home_score)
+
+    def message(self, message, level):
+        """Record a free-form line of text at a log level."""
+        self._append(MESSAGE, level, result=self._code(message))
+
+    def _append(self, event_type, level, **values):
+        row = self._size
+        if row == len(self.columns['type']):
+            # Doubling keeps appends amortized constant time
+            for name, column in self.columns.items():
+                grown = np.zeros(2 * len(column), dtype=column.dtype)
+                grown[:row] = column
+                self.columns[name] = grown
+        columns = self.columns
+        columns['type'][row] = event_type
+        columns['level'][row] = level
+        for name, value in values.items():
+            columns[name][row] = value
+        self._size = row + 1
+
+    def _code(self, string):
+        code = self._codes.get(string)
+        if code is None:
+            code = self._codes[string] = len(self.strings)
+            self.strings.append(string)
+        return code
+
+    def to_frame(self):
+        """Get the events as a DataFrame, with event types, pitch types and results as strings."""
+        import pandas as pd
+        frame = pd.DataFrame({name: column[:self._size] for name, column in self.columns.items()})
+        frame['type'] = [EVENT_TYPES[code] for code in frame['type']]
+        for name in ('pitch', 'result'):
+            frame[name] = [self.strings[code] for code in frame[name]]
+        return frame
+
+    def render(self, names=None, teams=('Away', 'Home'), level=None):
+        """Render the events as the play-by-play text log.
+
+        Args:
+            names: Optional dict of MLB ID -> display name of the players
+            teams: Names of the away and home teams
+            level: Most detailed level to render. Defaults to the recorded level.
+
+        Returns:
+            str: One line per message, indented by its level
+        """
+        names = names or {}
+        level = self.level if level is None else level
+        columns = {name: column[:self._size].tolist() for name, column in self.columns.items()}
+        lines = []
+
+        def emit(message, message_level):
+            if message_level <= level:
+                lines.append('\t' * (message_level - 1) + message)
+
+        def name(player_id):
+            return names.get(player_id, str(player_id))
+
+        for row in range(self._size):
+            event_type = columns['type'][row]
+            score = '{} - {}'.format(columns['home_score'][row], columns['away_score'][row])
+            if event_type == INNING:
+                if row > 0:
+                    emit(score + '\n', INNING_LEVEL)
+                emit('{} {}\n'.format('Top' if columns['top'][row] else 'Bottom', columns['inning'][row]), INNING_LEVEL)
+            elif event_type == PITCH:
+                pitch_num = columns['pitch_num'][row]
+                if pitch_num == 1:
+                    emit('{} up to bat.\n'.format(name(columns['batter'][row])), PITCH_LEVEL)
+                pitch, result = self.strings[columns['pitch'][row]], self.strings[columns['result'][row]]
+                if result == 'hit_into_play':
+                    emit('{}. {}, {}'.format(pitch_num, pitch, result), PITCH_LEVEL)
+                else:
+                    emit('{}. {}, {}\t{} - {}'.format(pitch_num, pitch, result, columns['balls'][row],
+                                                      columns['strikes'][row]), PITCH_LEVEL)
+            elif event_type == PLATE_APPEARANCE:
+                message_level = columns['level'][row]
+                result = self.strings[columns['result'][row]]
+                emit('{} {}.'.format(name(columns['batter'][row]), result), message_level)
+                narration = narrate(columns['bases'][row], PA_RESULT_INDEX[result],
+                                    [name(columns[base][row]) for base in ('first', 'second', 'third')])
+                if narration:
+                    emit(narration, message_level)
+                if columns['runs'][row] > 0:
+                    emit(score, SCORING_LEVEL)
+            elif event_type == GAME_END:
+                emit(score + '\n', INNING_LEVEL)
+                away, home = columns['away_score'][row], columns['home_score'][row]
+                if home > away:
+                    emit('{} wins {} to {}'.format(teams[1], home, away), INNING_LEVEL)
+                else:
+                    emit('{} wins {} to {}'.format(teams[0], away, home), INNING_LEVEL)
+            elif event_type == MESSAGE:
+                emit(self.strings[columns['result'][row]], columns['level'][row])
+        return '\n'.join(lines) + '\n' if lines else ''
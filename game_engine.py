@@ -1,59 +1,156 @@
-from simulation_info import SimulationInfo
+from simulation_info import SimulationInfo, Granularity
 from pitch_simulator import PitchSimulator
+from event_log import INNING_LEVEL, PLATE_APPEARANCE_LEVEL, PITCH_LEVEL
+from base_state import PA_RESULT_INDEX, TRANSITIONS, advance_runners
 import numpy as np
 from numpy import random
-import copy
-from collections import defaultdict
+from sim_random import SimulationRandom
+from concurrent.futures import ProcessPoolExecutor
+from functools import reduce
+from bisect import bisect_right
+import multiprocessing
 
 
 
+# Matchup played by this process's bootstrap workers, set once per worker
+_worker_matchup = None
+
+
+def _init_worker(simulationInfo):
+    """Hand a pool worker the matchup it plays, once instead of with every task."""
+    global _worker_matchup
+    _worker_matchup = simulationInfo
+
+
+def _play_games(simulationInfo, seeds, block_size):
+    """Play one game per seed and sum up the results.
+
+    Args:
+        simulationInfo: Matchup to replay. Its game state is reset before each game.
+        seeds: SeedSequence of each game's random stream
+        block_size: Block size of the games' SimulationRandom streams
+
+    Returns:
+        dict: Partial totals, combined with merge_totals()
+    """
+    home_team = simulationInfo.home_team
+    away_team = simulationInfo.away_team
+    totals = {'home_wins': 0, 'away_wins': 0, 'home_score': 0, 'away_score': 0,
+              'home_stats': home_team.stat_accumulator.empty(), 'away_stats': away_team.stat_accumulator.empty()}
+    for seed in seeds:
+        # Replay the same matchup from a fresh game state
+        simulationInfo.reset()
+        simulationInfo.rng = SimulationRandom(seed, block_size)
+        GameSimulator(simulationInfo).run()
+
+        totals['home_score'] += home_team.score
+        totals['away_score'] += away_team.score
+        totals['home_stats'] += home_team.stat_accumulator
+        totals['away_stats'] += away_team.stat_accumulator
+        if home_team.score > away_team.score:
+            totals['home_wins'] += 1
+        else:
+            totals['away_wins'] += 1
+    return totals
+
+
+def _play_worker_games(seeds, block_size):
+    return _play_games(_worker_matchup, seeds, block_size)
+
+
+def merge_totals(totals1, totals2):
+    """Combine the partial totals of two sets of games, stats included, by adding them up."""
+    return {key: value + totals2[key] for key, value in totals1.items()}
+
+
 class BootstrapGame:
-    def __init__(self, simulationInfo: SimulationInfo):
-        self.simulationInfo = simulationInfo
+    # Tasks handed to each worker, so uneven game lengths even out
+    TASKS_PER_WORKER = 4
+
+    def __init__(self, simulationInfo: SimulationInfo, start_method=None):
+        """Initialize a bootstrap of one matchup.
 
-    def run(self, games: int):
-        home_wins = 0
-        away_wins = 0
-        homeScore = 0
-        awayScore = 0
-        homeStats = {}
-        awayStats = {}
-        for i in range(games):
-            game = GameSimulator(copy.deepcopy(self.simulationInfo))
-            game.run()
-
-            homeScore += game.simulationInfo.home_team.score
-            awayScore += game.simulationInfo.away_team.score
-            homeStats = self.merge_stats(homeStats, game.simulationInfo.home_team.stats)
-            awayStats = self.merge_stats(awayStats, game.simulationInfo.away_team.stats)
-
-            if game.simulationInfo.home_team.score > game.simulationInfo.away_team.score:
-                home_wins += 1
-            else:
-                away_wins += 1
+        Args:
+            simulationInfo: Matchup to replay
+            start_method: multiprocessing start method of parallel runs.
+                Defaults to 'fork' where available, and 'spawn' elsewhere.
+        """
+        self.simulationInfo = simulationInfo
+        self.start_method = start_method
+
+    def run(self, games: int, workers: int = 1):
+        """Play the matchup repeatedly and print the totals.
+
+        Args:
+            games: Number of games
+            workers: Number of processes to spread the games over. Every game
+                has its own random stream derived from the matchup's seed, so
+                the results are the same for any number of workers.
+
+        Returns:
+            dict: Totals of home_wins, away_wins, home_score and away_score,
+                and the summed home_stats and away_stats in the form of Team.stats
+        """
+        # Independent random stream per game, reproducible from the original seed
+        rng = self.simulationInfo.rng
+        seeds = rng.seed_sequence.spawn(games)
+        if workers > 1 and games > 1:
+            totals = self._run_parallel(seeds, rng.block_size, workers)
+        else:
+            totals = _play_games(self.simulationInfo, seeds, rng.block_size)
+        # Stats are summed as arrays and only become dicts for reporting
+        totals['home_stats'] = totals['home_stats'].to_dict()
+        totals['away_stats'] = totals['away_stats'].to_dict()
+        self.simulationInfo.reset()
+        self.simulationInfo.rng = rng
         
         print('In {} simulations {} won {} and {} won {} with an average score of {} - {}'.format(
-            games, self.simulationInfo.home_team.name, home_wins, 
-            self.simulationInfo.away_team.name, away_wins, homeScore/games, awayScore/games
+            games, self.simulationInfo.home_team.name, totals['home_wins'], 
+            self.simulationInfo.away_team.name, totals['away_wins'],
+            totals['home_score']/games, totals['away_score']/games
         ))
-        print(homeStats)
-        print(awayStats)
-
-    def merge_stats(self, dict1, dict2):
-        merged = defaultdict(dict)  # Using defaultdict to simplify merging
-
-        # Get all unique keys from both dictionaries
-        all_keys = set(dict1.keys()) | set(dict2.keys())
-
-        for key in all_keys:
-            # Merge inner dictionaries
-            sub_keys = set(dict1.get(key, {}).keys()) | set(dict2.get(key, {}).keys())
-            merged[key] = {
-                sub_key: dict1.get(key, {}).get(sub_key, 0) + dict2.get(key, {}).get(sub_key, 0)
-                for sub_key in sub_keys
-            }
+        print(totals['home_stats'])
+        print(totals['away_stats'])
+        return totals
+
+    def _run_parallel(self, seeds, block_size, workers):
+        """Play games in a process pool and merge the workers' partial totals.
+
+        Where processes can be forked, workers inherit the matchup, sharing its
+        compiled models copy-on-write. Elsewhere each worker unpickles it once;
+        players only carry their own rows of the training data, and the
+        database manager reopens the cache by path.
+        """
+        self._compile()
+        chunks = np.array_split(np.arange(len(seeds)), min(len(seeds), workers * self.TASKS_PER_WORKER))
+        tasks = [[seeds[i] for i in chunk] for chunk in chunks]
+
+        start_method = self.start_method
+        if start_method is None:
+            start_method = 'fork' if 'fork' in multiprocessing.get_all_start_methods() else 'spawn'
+        context = multiprocessing.get_context(start_method)
+
+        global _worker_matchup
+        if start_method == 'fork':
+            _worker_matchup = self.simulationInfo
+            executor = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+        else:
+            executor = ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker,
+                                           initargs=(self.simulationInfo,))
+        try:
+            with executor:
+                partials = list(executor.map(_play_worker_games, tasks, [block_size] * len(tasks)))
+        finally:
+            _worker_matchup = None
+        return reduce(merge_totals, partials)
 
-        return dict(merged)  # Convert back to a regular dictionary
+    def _compile(self):
+        """Compile the models the pitch simulator samples from, so workers don't each redo it."""
+        tiers = PitchSimulator.required_tiers(self.simulationInfo.pitchSimulator)
+        for team in (self.simulationInfo.away_team, self.simulationInfo.home_team):
+            for batter in team.roster:
+                batter.compile(tiers['batter'])
+            team.pitcher().compile(tiers['pitcher'])
 
 
 
@@ -61,180 +158,118 @@ class BootstrapGame:
 class GameSimulator:
     def __init__(self, simulationInfo: SimulationInfo):
         self.simulationInfo = simulationInfo
+        # Resolved once per game rather than for every pitch
+        self.pitchSimulator = PitchSimulator.init(simulationInfo)
+        self.by_plate_appearance = simulationInfo.granularity == Granularity.PLATE_APPEARANCE
+        # Events are only built for the levels a log is listening to
+        self.events = simulationInfo.events
+        self.log_innings = simulationInfo.logs(INNING_LEVEL)
+        self.log_plate_appearances = simulationInfo.logs(PLATE_APPEARANCE_LEVEL)
+        self.log_pitches = simulationInfo.logs(PITCH_LEVEL)
+        self._tables = {}  # Pitch simulator tables of each (batter, pitcher) this game
 
     def run(self):
         home_team = self.simulationInfo.home_team
         away_team = self.simulationInfo.away_team
 
-        game_log = ''
-        self.simulationInfo.log('Home team: \n' + home_team.get_lineup(), logLevel=1)
-        self.simulationInfo.log('Away team: \n' + away_team.get_lineup(), logLevel=1)
-
         while self.simulationInfo.inning <= 9 or home_team.score == away_team.score:
             self.simulate_inning()
             self.simulationInfo.incrementInning()
-        
-        if home_team.score > away_team.score:
-            self.simulationInfo.log('{} wins {} to {}'.format(home_team.name, home_team.score, away_team.score), logLevel=1)
-        else:
-            self.simulationInfo.log('{} wins {} to {}'.format(away_team.name, away_team.score, home_team.score), logLevel=1)
+
+        if self.log_innings:
+            self.events.game_end(self.simulationInfo.inning, away_team.score, home_team.score)
 
 
     def simulate_inning(self):
 
-        FrameSimulator(self.simulationInfo).run()
+        self.simulate_frame()
         self.simulationInfo.incrementFrame()
 
-        FrameSimulator(self.simulationInfo).run()
+        self.simulate_frame()
         self.simulationInfo.incrementFrame()
 
-
-class FrameSimulator:
-    def __init__(self, simulationInfo: SimulationInfo, top=True):
-        self.simulationInfo = simulationInfo
-        self.top = top
-        
-    def run(self):
+    def simulate_frame(self):
+        """Play the current half inning until three outs or a walk-off."""
+        info = self.simulationInfo
+        offense, defense = info.offense(), info.defense()
+        stats = offense.stat_accumulator
+        pitcher = defense.pitcher()
+        # Only the bottom of the ninth and later can end early, see SimulationInfo.walk_off
+        walk_off = not info.top and info.inning >= 9
         outs = 0
-        bases = Bases()
-        self.simulationInfo.log('{} {}\n'.format('Top' if self.simulationInfo.top else 'Bottom', self.simulationInfo.inning), logLevel=1)
-
-        while outs != 3 and not self.simulationInfo.walk_off():
-
-            result = AtBatSimulator(self.simulationInfo).run()
-            score, baseText = bases.advance_runners(result, self.simulationInfo.offense().batter())
-            self.simulationInfo.offense().increment_score(score)
-            self.simulationInfo.offense().recordStat(self.simulationInfo.offense().batter().name, result)
-
-            if (score > 0):
-                self.simulationInfo.log('{} {}.'.format(self.simulationInfo.offense().batter().name, result), logLevel=1)
-            else:
-                self.simulationInfo.log('{} {}.'.format(self.simulationInfo.offense().batter().name, result), logLevel=2)
-                
-
-            if result == 'field_out' or result == 'strikeout':
-                outs += 1
-            elif baseText != '':
-                if score > 0:
-                    self.simulationInfo.log( baseText, logLevel=1)
-                    self.simulationInfo.log('{} - {}'.format(self.simulationInfo.home_team.score, self.simulationInfo.away_team.score), logLevel=1)
-                else:
-                    self.simulationInfo.log( baseText, logLevel=2)
-
-            self.simulationInfo.offense().next_idx()
-        self.simulationInfo.log('{} - {}\n'.format(self.simulationInfo.home_team.score, self.simulationInfo.away_team.score), logLevel=1)
-
-class AtBatSimulator:
-    def __init__(self, simulationInfo: SimulationInfo):
-        self.simulationInfo = simulationInfo
-
-    def run(self):
-        batter = self.simulationInfo.offense().batter()
-        count = self.simulationInfo.count
-        count.reset()
+        bases = 0  # Base state, see base_state
+        runners = [0, 0, 0]  # IDs of the runners on base, only tracked for the log
+        events, log_innings, log_plate_appearances = self.events, self.log_innings, self.log_plate_appearances
+        if log_innings:
+            events.inning(info.inning, info.top, info.away_team.score, info.home_team.score)
+
+        while outs != 3 and not (walk_off and offense.score > defense.score):
+            batter = offense.batter()
+            result = self.simulate_at_bat(batter, pitcher)
+            code = PA_RESULT_INDEX[result]
+            next_bases, score, out = TRANSITIONS[bases][code]
+            offense.increment_score(score)
+            stats.add(offense.idx, code)
+
+            # Plays that score are logged at a more important level
+            if log_innings:
+                if log_plate_appearances or score > 0:
+                    events.plate_appearance(info.inning, info.top, batter.id, pitcher.id, result, score, bases, runners,
+                                            info.away_team.score, info.home_team.score)
+                runners = advance_runners(runners, bases, code, batter.id)
+
+            bases = next_bases
+            outs += out
+            offense.next_idx()
+
+    def simulate_at_bat(self, batter, pitcher):
+        """Play one plate appearance.
+
+        Pitches are drawn straight from the pitch simulator's tables for this
+        matchup, with the same draws as running the simulator pitch by pitch.
+
+        Returns:
+            str: 'walk', 'strikeout' or the outcome of the ball in play
+        """
+        info = self.simulationInfo
+        rng = info.rng
+        if self.by_plate_appearance:
+            info.count.reset()
+            return info.plate_appearance(batter, pitcher).sample(rng.random())
+
+        tables = self._tables.get((batter, pitcher))
+        if tables is None:
+            tables = self._tables[batter, pitcher] = self.pitchSimulator.tables(batter, pitcher)
+        pitches, results = tables
+        random = rng.random
+        log_pitches = self.log_pitches
+        balls = strikes = 0
         pitch_num = 1
-        self.simulationInfo.log('{} up to bat.\n'.format(batter.name), logLevel=3)
-
-        while count.strikes < 3 and count.balls < 4:
-            pitch, result = PitchSimulator.init(self.simulationInfo).run()
+        while strikes < 3 and balls < 4:
+            # Distribution.sample() inlined, as this runs for every pitch
+            index = balls * 3 + strikes
+            dist = pitches[index]
+            pitch = dist.outcomes[bisect_right(dist.boundaries, random() * dist.total)]
+            dist = results[pitch][index]
+            result = dist.outcomes[bisect_right(dist.boundaries, random() * dist.total)]
 
             if result == 'ball':
-                count.ball()
+                balls += 1
             elif result == 'called_strike' or result == 'swinging_strike':
-                count.strike()
-            elif result == 'foul' and count.strikes < 2:
-                count.strike()
+                strikes += 1
+            elif result == 'foul' and strikes < 2:
+                strikes += 1
             elif result == 'hit_into_play':
-                self.simulationInfo.log("{}. {}, {}".format(pitch_num, pitch, result), logLevel=3)
-                return batter.simulate_hit()
+                info.count.balls, info.count.strikes = balls, strikes
+                if log_pitches:
+                    self.events.pitch(info.inning, info.top, batter.id, pitcher.id, pitch_num, pitch, result, balls, strikes)
+                return batter.simulate_hit(rng=rng)
             
-            self.simulationInfo.log("{}. {}, {}\t{} - {}".format(pitch_num, pitch, result, count.balls, count.strikes), logLevel=3)
+            if log_pitches:
+                self.events.pitch(info.inning, info.top, batter.id, pitcher.id, pitch_num, pitch, result, balls, strikes)
             pitch_num += 1
-    
-        if count.strikes == 3:
-            return 'strikeout'
-        elif count.balls == 4:
-            return 'walk'
-
-
-
-class Bases:
-    def __init__(self, extra_runner=None):
-        self.first = None
-        self.second = extra_runner
-        self.third = None
-
-    def advance_runners(self, result, runner):
-        extra_text = ""
-        score = 0
-        if result == 'walk':
-            if self.first is None:
-                self.first = runner
-            elif self.second is None:
-                extra_text = self.first.name + ' advances.'
-                self.second = self.first
-                self.first = runner
-            elif self.third is None:
-                extra_text = self.first.name + ' and ' + self.second.name + ' advance.'
-                self.third = self.second
-                self.second = self.first
-                self.first = runner
-            else:
-                extra_text = self.first.name + ' and ' + self.second.name + ' advance. ' + self.third.name + ' scores.\n '
-                self.third = self.second
-                self.second = self.first
-                self.first = runner
-
-        elif result == 'single':
-            score = 0
-            if self.third:
-                score += 1
-                extra_text = self.third.name + ' scores.'
-
-            self.third = self.second
-            self.second = self.first
-            self.first = runner
-
-        elif result == 'double':
-            if self.third:
-                score += 1
-                extra_text = self.third.name + ' scores. '
-            if self.second:
-                score += 1
-                extra_text = extra_text + self.second.name + ' scores.'
-            self.third = self.second
-            self.second = runner
-            self.first = None
-
-
-        elif result == 'triple':
-            if self.third:
-                score += 1
-                extra_text = extra_text + self.third.name + ' scores. '
-            if self.second:
-                score += 1
-                extra_text = extra_text + self.second.name + ' scores. '
-            if self.first:
-                score += 1
-                extra_text = extra_text + self.first.name + ' scores.'
-            self.third = runner
-            self.second = None
-            self.first = None
-
-        elif result == 'home_run':
-            score += 1
-            if self.third:
-                score += 1
-                extra_text = extra_text + self.third.name + ' scores. '
-            if self.second:
-                score += 1
-                extra_text = extra_text + self.second.name + ' scores. '
-            if self.first:
-                score += 1
-                extra_text = extra_text + self.first.name + ' scores.'
-            self.third = None
-            self.second = None
-            self.first = None
-
-        return score, extra_text
 
+        info.count.balls, info.count.strikes = balls, strikes
+        if strikes == 3:
+            return 'strikeout'
+        return 'walk'
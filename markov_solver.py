@@ -0,0 +1,321 @@
+import numpy as np
+from simulation_info import SimulationInfo
+from pitch_simulator import PitchSimulator
+from player_model import BatterModel, PitcherModel, matchup_events, BALL, STRIKE, FOUL, IN_PLAY
+from profile_codec import BALLS, STRIKES
+from base_state import PA_RESULTS, WALK, STRIKEOUT, FIELD_OUT, OUTS, NEXT_STATE, RUNS
+
+# Runs a team can score in a game, or in a half inning, before they're
+# counted as this many. The probability of getting there is negligible.
+MAX_RUNS = 40
+
+# Probability of a half inning or game still going on that is small enough to
+# stop following it
+TOLERANCE = 1e-12
+
+_COUNTS = BALLS * STRIKES
+# Most runs one plate appearance scores
+_MAX_SCORED = int(RUNS.max())
+
+
+def pa_distribution(events, hits):
+    """Solve the ball-strike count chain of plate appearances.
+
+    A plate appearance starts at 0-0 and moves between the 12 counts until it
+    ends in a walk, a strikeout or a ball in play, exactly as
+    game_engine.GameSimulator.simulate_at_bat plays it.
+
+    Args:
+        events: [..., balls, strikes, event] probabilities of PITCH_EVENTS,
+            e.g. from player_model.matchup_events(). Leading axes are solved
+            independently.
+        hits: [..., in-play outcome] probabilities of
+            profile_codec.IN_PLAY_OUTCOMES
+
+    Returns:
+        np.ndarray: [..., result] probabilities of PA_RESULTS
+    """
+    events = np.asarray(events, dtype=np.float64)
+    hits = np.asarray(hits, dtype=np.float64)
+    batch = events.shape[:-3]
+    events = events.reshape(-1, _COUNTS, events.shape[-1])
+
+    # Transient counts move to transient counts (Q) or end the plate
+    # appearance in a walk, a strikeout or a ball in play (R)
+    states = np.arange(_COUNTS)
+    balls, strikes = np.divmod(states, STRIKES)
+    foul_strike = np.where(strikes < 2, events[:, :, FOUL], 0)
+    stay = 1 - events[:, :, BALL] - events[:, :, STRIKE] - foul_strike - events[:, :, IN_PLAY]
+    q = np.zeros((len(events), _COUNTS, _COUNTS))
+    r = np.zeros((len(events), _COUNTS, 3))
+    q[:, states, states] = stay
+    walks = balls == BALLS - 1
+    q[:, states[~walks], states[~walks] + STRIKES] = events[:, ~walks, BALL]
+    r[:, walks, 0] = events[:, walks, BALL]
+    strikeouts = strikes == STRIKES - 1
+    q[:, states[~strikeouts], states[~strikeouts] + 1] = (events[:, :, STRIKE] + foul_strike)[:, ~strikeouts]
+    r[:, strikeouts, 1] = events[:, strikeouts, STRIKE]
+    r[:, :, 2] = events[:, :, IN_PLAY]
+
+    # Absorption probabilities from 0-0, the first row of (I - Q)^-1 R
+    ends = np.linalg.solve(np.eye(_COUNTS) - q, r)[:, 0]
+    results = np.zeros((len(events), len(PA_RESULTS)))
+    results[:, WALK] = ends[:, 0]
+    results[:, STRIKEOUT] = ends[:, 1]
+    results[:, FIELD_OUT:] = ends[:, 2:] * hits.reshape(-1, hits.shape[-1]) / hits.sum(axis=-1).reshape(-1, 1)
+    return results.reshape(batch + (len(PA_RESULTS),))
+
+
+def plate_appearance_probs(batters, pitcher, pitchSimulator='basic'):
+    """Solve the plate appearances of batters facing a pitcher.
+
+    Args:
+        batters: Batter objects
+        pitcher: Pitcher they face
+        pitchSimulator: Name of the pitch simulator whose probabilities are used
+
+    Returns:
+        np.ndarray: [batter, result] probabilities of PA_RESULTS
+    """
+    tiers = PitchSimulator.required_tiers(pitchSimulator)
+    by_count = 'count_based' in tiers['pitcher']
+    pitcher_model = PitcherModel.from_profile(pitcher.id, pitcher.profile(tiers['pitcher']))
+    models = [BatterModel.from_profile(batter.id, batter.profile(tiers['batter'])) for batter in batters]
+    events = np.stack([matchup_events(model, pitcher_model, by_count) for model in models])
+    return pa_distribution(events, np.stack([model.hits for model in models]))
+
+
+def half_inning(pa, max_runs=MAX_RUNS, tolerance=TOLERANCE):
+    """Compute how half innings end from every lineup position.
+
+    Follows the probability of every (outs, bases, lineup slot, runs) state
+    one plate appearance at a time until less than the tolerance is left.
+
+    Args:
+        pa: [slot, result] probabilities of PA_RESULTS of each lineup slot
+        max_runs: Runs counted as max_runs when more are scored
+        tolerance: Probability of unfinished half innings at which to stop
+
+    Returns:
+        Tuple of (ended, walk_off):
+        ended: [first slot, runs, next slot] probabilities of how a half
+            inning ends after three outs
+        walk_off: [deficit, first slot, runs, next slot] probabilities when the
+            half inning also ends as soon as more than deficit runs are in,
+            as the bottom of the ninth and later does
+    """
+    pa = np.asarray(pa, dtype=np.float64)
+    slots = len(pa)
+    runs = max_runs + 1
+    # live[first slot, outs, bases, slot up, runs]
+    live = np.zeros((slots, 3, 8, slots, runs))
+    live[np.arange(slots), 0, 0, np.arange(slots), 0] = 1
+    ended = np.zeros((slots, slots, runs))
+    # Plate appearances raising the runs from a count by 1-4, which tell
+    # where the half inning stops for any deficit
+    crossed = np.zeros((slots, slots, runs, _MAX_SCORED))
+
+    while live.sum() > tolerance:
+        following = np.zeros_like(live)
+        for code in range(len(PA_RESULTS)):
+            weighted = live * pa[:, code][:, None]
+            for bases in range(8):
+                moved = weighted[:, :, bases]
+                scored = RUNS[bases, code]
+                if OUTS[code]:
+                    ended += moved[:, 2]
+                    following[:, 1:, NEXT_STATE[bases, code]] += moved[:, :2]
+                    continue
+                _add_runs(following[:, :, NEXT_STATE[bases, code]], moved, scored)
+                if scored:
+                    crossed[..., scored - 1] += moved.sum(axis=1)
+        # Every plate appearance brings up the next batter
+        live = np.roll(following, 1, axis=3)
+    ended = np.roll(ended, 1, axis=1).transpose(0, 2, 1)
+    crossed = np.roll(crossed, 1, axis=1)
+
+    walk_off = np.zeros((runs, slots, runs, slots))
+    for deficit in range(runs):
+        walk_off[deficit, :, :deficit + 1] = ended[:, :deficit + 1]
+    for before in range(runs):
+        for scored in range(1, crossed.shape[-1] + 1):
+            after = min(before + scored, max_runs)
+            # Stops the half inning for every deficit this run count overcomes
+            walk_off[before:after, :, after] += crossed[:, :, before, scored - 1]
+    return ended, walk_off
+
+
+def _add_runs(target, values, scored):
+    """Add probabilities to the states scoring more runs, along the last axis, capped at its end."""
+    if not scored:
+        target += values
+        return
+    target[..., scored:] += values[..., :-scored]
+    target[..., -1] += values[..., -scored:].sum(axis=-1)
+
+
+class MarkovSolver:
+    """Computes the exact distribution of game outcomes of a matchup.
+
+    Replaces sampling thousands of games with BootstrapGame when only the
+    distributions are needed. Each batter/pitcher pair's plate appearances are
+    solved over the ball-strike counts, half innings over the 24 base-out
+    states and the lineup position, and games by dynamic programming over
+    innings, including extra innings and walk-offs. The rules and quirks of
+    game_engine are followed exactly.
+    """
+
+    def __init__(self, simulationInfo: SimulationInfo, max_runs=MAX_RUNS, tolerance=TOLERANCE):
+        """Solve the plate appearances and half innings of a matchup.
+
+        Args:
+            simulationInfo: Matchup to solve, as for BootstrapGame
+            max_runs: Runs counted as max_runs when a team scores more
+            tolerance: Probability of unfinished half innings or games at
+                which to stop following them
+        """
+        self.simulationInfo = simulationInfo
+        self.max_runs = max_runs
+        self.tolerance = tolerance
+
+        # Team 0 bats in the top half, team 1 in the bottom
+        self.teams = (simulationInfo.away_team, simulationInfo.home_team)
+        self.pa = [
+            plate_appearance_probs(team.roster, self.teams[1 - team_index].pitcher(), simulationInfo.pitchSimulator)
+            for team_index, team in enumerate(self.teams)
+        ]
+        self.half_innings = [half_inning(pa, max_runs, tolerance) for pa in self.pa]
+
+    def run(self):
+        """Solve the game and print a summary like BootstrapGame.run.
+
+        Returns:
+            dict: See solve()
+        """
+        results = self.solve()
+        print('{} wins with probability {:.4f} and {} with probability {:.4f}, with an expected score of {:.3f} - {:.3f}'.format(
+            self.simulationInfo.home_team.name, results['home_win_prob'],
+            self.simulationInfo.away_team.name, results['away_win_prob'],
+            results['expected_home_runs'], results['expected_away_runs']
+        ))
+        return results
+
+    def solve(self):
+        """Compute the distribution of final scores.
+
+        Returns:
+            dict: scores, the [away runs, home runs] probabilities of final
+                scores; away_runs and home_runs, each team's run distribution;
+                home_win_prob, away_win_prob, expected_away_runs and
+                expected_home_runs
+        """
+        (away_half, _), (home_half, home_walk_off) = self.half_innings
+        runs = self.max_runs + 1
+
+        # The teams' halves don't affect each other until the bottom of the
+        # ninth can end the game early: [runs, slot up]
+        away = self._first_batter(len(self.pa[0]))
+        for _ in range(9):
+            away = self._play_half(away, away_half)
+        home = self._first_batter(len(self.pa[1]))
+        for _ in range(8):
+            home = self._play_half(home, home_half)
+
+        # [away runs, home runs, away slot, home slot]
+        game = self._bottom_of_ninth(np.einsum('ax,hy->ahxy', away, home), home_walk_off)
+        scores = game.sum(axis=(2, 3))
+        tied = np.arange(runs)
+        scores[tied, tied] = 0
+
+        # Tied games go on an inning at a time. How extra innings end only
+        # depends on the tied score, the lead the top half gives the away
+        # team and the runs of the bottom half: [tied runs, lead, runs]
+        extra = game[tied, tied]
+        ends = np.zeros((runs, runs, runs))
+        while extra.sum() > self.tolerance:
+            extra = self._extra_inning(extra, away_half, home_walk_off, ends)
+        for lead in range(runs):
+            for scored in range(min(lead + _MAX_SCORED + 1, runs)):
+                np.add.at(scores, (np.minimum(tied + lead, self.max_runs), np.minimum(tied + scored, self.max_runs)),
+                          ends[:, lead, scored])
+
+        away_runs = scores.sum(axis=1)
+        home_runs = scores.sum(axis=0)
+        home_win_prob = float(np.triu(scores, 1).sum())
+        away_win_prob = float(np.tril(scores, -1).sum())
+        return {
+            'scores': scores,
+            'away_runs': away_runs,
+            'home_runs': home_runs,
+            'home_win_prob': home_win_prob,
+            'away_win_prob': away_win_prob,
+            'expected_away_runs': float(away_runs @ np.arange(runs)),
+            'expected_home_runs': float(home_runs @ np.arange(runs)),
+        }
+
+    def _first_batter(self, slots):
+        state = np.zeros((self.max_runs + 1, slots))
+        state[0, 0] = 1
+        return state
+
+    def _play_half(self, state, half):
+        """Add one half inning's runs to a team's [runs, slot up] probabilities."""
+        following = np.zeros_like(state)
+        for scored, moved in enumerate(np.einsum('ax,xrz->raz', state, half)):
+            _add_runs(following.T, moved.T, scored)
+        return following
+
+    def _bottom_of_ninth(self, game, walk_off):
+        """Play the bottom of the ninth.
+
+        The home team doesn't bat when it's ahead, and stops batting as soon
+        as it takes the lead.
+
+        Args:
+            game: [away runs, home runs, away slot, home slot] probabilities
+            walk_off: Walk-off tables of the home team, see half_inning()
+
+        Returns:
+            np.ndarray: Probabilities after the half inning, in the same form
+        """
+        runs = self.max_runs + 1
+        following = np.zeros_like(game)
+        home_ahead = np.triu(np.ones((runs, runs), dtype=bool), 1)
+        following[home_ahead] = game[home_ahead]
+        for deficit in range(runs):
+            home_runs = np.arange(runs - deficit)
+            away_runs = home_runs + deficit
+            # Runs beyond the deficit come in a single plate appearance
+            table = walk_off[deficit][:, :deficit + _MAX_SCORED + 1]
+            moved = np.tensordot(game[away_runs, home_runs], table, axes=(2, 0))
+            for scored in range(table.shape[1]):
+                # Each game state lands on a different final state
+                following[away_runs, np.minimum(home_runs + scored, self.max_runs)] += moved[:, :, scored]
+        return following
+
+    def _extra_inning(self, tied, away_half, walk_off, ends):
+        """Play an extra inning of tied games.
+
+        Args:
+            tied: [runs, away slot, home slot] probabilities of games tied at each score
+            away_half: Half inning table of the away team, see half_inning()
+            walk_off: Walk-off tables of the home team
+            ends: [tied runs, lead, runs] probabilities of games ended by the
+                top half's lead and the bottom half's runs, added to in place
+
+        Returns:
+            np.ndarray: Probabilities of games still tied, in the same form as tied
+        """
+        still_tied = np.zeros_like(tied)
+        # [lead, tied runs, away slot, home slot]
+        top = np.tensordot(away_half, tied, axes=(0, 1)).transpose(0, 2, 1, 3)
+        # Slots only matter for the games that stay tied
+        totals = walk_off.sum(axis=3)
+        for lead, state in enumerate(top):
+            ended = state.sum(axis=1) @ totals[lead, :, :lead + _MAX_SCORED + 1]
+            ended[:, lead] = 0
+            ends[:, lead, :ended.shape[1]] += ended
+            # [tied runs, away slot, home slot]
+            bottom = np.tensordot(state, walk_off[lead][:, lead], axes=(2, 0))
+            _add_runs(np.moveaxis(still_tied, 0, -1), np.moveaxis(bottom, 0, -1), lead)
+        return still_tied
@@ -0,0 +1,176 @@
+import threading
+import pandas as pd
+from db_manager import DatabaseManager
+
+# Display name of players whose name couldn't be resolved
+UNKNOWN_PLAYER = "Unknown Player"
+
+# Columns of a player register, as in the Chadwick register returned by
+# pybaseball.chadwick_register()
+REGISTER_COLUMNS = ('key_mlbam', 'name_first', 'name_last')
+
+
+def load_register(path):
+    """Read player names from a local player register.
+
+    Args:
+        path: .parquet or .csv file with key_mlbam, name_first and name_last
+            columns, e.g. pybaseball.chadwick_register() saved with to_parquet()
+
+    Returns:
+        dict: Maps player MLB ID to a (first_name, last_name) tuple
+    """
+    path = str(path)
+    if path.endswith('.parquet'):
+        register = pd.read_parquet(path, columns=list(REGISTER_COLUMNS))
+    else:
+        register = pd.read_csv(path, usecols=list(REGISTER_COLUMNS))
+    return _names(register)
+
+
+def lookup_names(player_ids):
+    """Look up names online in a single pybaseball request.
+
+    Args:
+        player_ids: MLB IDs to look up
+
+    Returns:
+        dict: Maps each found player ID to a (first_name, last_name) tuple
+
+    Raises:
+        Exception: Whatever pybaseball raises when the lookup fails, e.g.
+            without network access
+    """
+    from pybaseball import playerid_reverse_lookup
+    return _names(playerid_reverse_lookup(sorted(int(id) for id in player_ids), key_type='mlbam'))
+
+
+def _names(frame):
+    """Convert rows with REGISTER_COLUMNS to a dict of ID -> (first_name, last_name)."""
+    frame = frame.dropna(subset=['key_mlbam', 'name_last'])
+    frame = frame.loc[frame.key_mlbam.astype(int) > 0]
+    return {
+        int(row.key_mlbam): ('' if pd.isna(row.name_first) else str(row.name_first), str(row.name_last))
+        for row in frame.itertuples()
+    }
+
+
+def display_name(name):
+    """Format a (first_name, last_name) tuple, or None, for display."""
+    if not name:
+        return UNKNOWN_PLAYER
+    first_name, last_name = name
+    return f"{first_name} {last_name}".strip()
+
+
+class NameResolver:
+    """Resolves player names in batches: cache, then register, then network.
+
+    Names found in an offline register or online are written to the cache in
+    one batch. Each ID is looked up online at most once per resolver, and a
+    failed lookup turns online lookups off, so simulations never wait on the
+    network for names.
+    """
+
+    def __init__(self, register=None, online=True):
+        """Initialize a resolver.
+
+        Args:
+            register: Optional path to a local player register, see
+                load_register(), or a dict of ID -> (first_name, last_name).
+                Files are read on first use.
+            online: Whether names missing from the cache and register are
+                looked up with pybaseball
+        """
+        self.online = online
+        self._register_source = register
+        self._register = None
+        self._unresolved = set()
+        self._lock = threading.Lock()
+        self.lookups = 0
+
+    @property
+    def register(self):
+        """Names from the offline register, keyed by player ID."""
+        with self._lock:
+            if self._register is None:
+                source = self._register_source
+                if source is None:
+                    self._register = {}
+                elif isinstance(source, dict):
+                    self._register = {int(id): tuple(name) for id, name in source.items()}
+                else:
+                    self._register = load_register(source)
+            return self._register
+
+    def use_register(self, register, db=None):
+        """Switch to a player register and bulk-load all of its names into the cache.
+
+        Args:
+            register: Path to a register file, or a dict of ID -> (first_name, last_name)
+            db: DatabaseManager to fill. Defaults to the shared default manager.
+
+        Returns:
+            int: Number of names stored
+        """
+        with self._lock:
+            self._register_source = register
+            self._register = None
+            self._unresolved.clear()
+        names = self.register
+        if names:
+            (db if db is not None else DatabaseManager.shared()).set_player_names(names)
+        return len(names)
+
+    def resolve(self, player_ids, db=None):
+        """Get names for several players, resolving those missing from the cache at once.
+
+        Args:
+            player_ids: Iterable of player MLB IDs, e.g. a roster or every
+                player of a season
+            db: DatabaseManager holding the name cache. Defaults to the shared
+                default manager.
+
+        Returns:
+            dict: Maps each resolved player ID to a (first_name, last_name)
+                tuple. Unresolved players are left out; see display_name().
+        """
+        db = db if db is not None else DatabaseManager.shared()
+        player_ids = {int(id) for id in player_ids}
+        names = db.get_player_names(player_ids)
+        with self._lock:
+            missing = player_ids - names.keys() - self._unresolved
+        if not missing:
+            return names
+
+        register = self.register
+        found = {id: register[id] for id in missing if id in register}
+        remaining = missing - found.keys()
+        if remaining and self.online:
+            found.update(self._lookup(remaining))
+
+        with self._lock:
+            self._unresolved |= missing - found.keys()
+        if found:
+            db.set_player_names(found)
+            names.update(found)
+        return names
+
+    def _lookup(self, player_ids):
+        """Look names up online, turning online lookups off if that fails."""
+        self.lookups += 1
+        try:
+            return lookup_names(player_ids)
+        except Exception as e:
+            print(f"Warning: Could not look up player names, continuing offline: {str(e)}")
+            self.online = False
+            return {}
+
+    def clear(self):
+        """Forget which players couldn't be resolved, so they are tried again."""
+        with self._lock:
+            self._unresolved.clear()
+
+
+# Resolver used by Team, Batter and Pitcher unless told otherwise
+default_resolver = NameResolver()
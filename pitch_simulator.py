@@ -1,26 +1,60 @@
-from simulation_info import SimulationInfo
+from __future__ import annotations
+from typing import TYPE_CHECKING
 from numpy import random
 from abc import ABC, abstractmethod
 
+if TYPE_CHECKING:
+    from simulation_info import SimulationInfo
+
 class PitchSimulator(ABC):
+    # Probability tiers each role's models must provide to this simulator
+    TIERS = {'batter': (), 'pitcher': ()}
+    # Whether pitch types and results depend on the count
+    BY_COUNT = False
     
     @abstractmethod
     def run(self):
         pass
 
+    def tables(self, batter, pitcher):
+        """Get the distributions run() samples from when this batter faces this pitcher.
+
+        Lets the game engine draw a plate appearance's pitches in a tight
+        loop, with the same draws as calling run() for each pitch.
+
+        Returns:
+            Tuple of (pitch types, results): see Pitcher.pitch_table() and
+            Batter.result_table()
+        """
+        return pitcher.pitch_table(self.BY_COUNT), batter.result_table(self.BY_COUNT)
+
+    @staticmethod
+    def get(name: str):
+        """Get the simulator class registered under a name.
+
+        Raises:
+            ValueError: If no simulator has that name
+        """
+        if name not in SIMULATIONS:
+            raise ValueError(f"Unknown simulation type: {name}")
+        return SIMULATIONS[name]
+
     @staticmethod
     def init(simulationInfo: SimulationInfo):
-        simulations = {
-            "basic": BasicPitchSimulator,
-            "count": CountBasedPitchSimulator
-        }
+        return PitchSimulator.get(simulationInfo.pitchSimulator)(simulationInfo)
 
-        if simulationInfo.pitchSimulator not in simulations:
-            raise ValueError(f"Unknown simulation type: {simulationInfo.pitchSimulator}")
-        
-        return simulations[simulationInfo.pitchSimulator](simulationInfo) 
+    @staticmethod
+    def required_tiers(name: str):
+        """Get the tiers a simulator reads, so other tiers can be built lazily.
+
+        Returns:
+            dict: Maps 'batter' and 'pitcher' to tuples of tier names
+        """
+        return PitchSimulator.get(name).TIERS
 
 class BasicPitchSimulator(PitchSimulator):
+    TIERS = {'batter': ('in_play', 'basic', 'global'), 'pitcher': ('basic',)}
+
     def __init__(self, simulationInfo: SimulationInfo):
         self.simulationInfo = simulationInfo
 
@@ -28,11 +62,14 @@ class BasicPitchSimulator(PitchSimulator):
         batter = self.simulationInfo.offense().batter()
         pitcher = self.simulationInfo.defense().pitcher()
 
-        pitch = pitcher.simulate_pitch()
-        result = batter.get_pitch_result(pitch)
+        pitch = pitcher.simulate_pitch(rng=self.simulationInfo.rng)
+        result = batter.get_pitch_result(pitch, rng=self.simulationInfo.rng)
         return pitch, result
 
 class CountBasedPitchSimulator(PitchSimulator):
+    TIERS = {'batter': ('in_play', 'basic', 'global', 'count_based'), 'pitcher': ('basic', 'count_based')}
+    BY_COUNT = True
+
     def __init__(self, simulationInfo: SimulationInfo):
         self.simulationInfo = simulationInfo
 
@@ -40,6 +77,15 @@ class CountBasedPitchSimulator(PitchSimulator):
         batter = self.simulationInfo.offense().batter()
         pitcher = self.simulationInfo.defense().pitcher()
 
-        pitch = pitcher.simulate_pitch(self.simulationInfo.count.balls, self.simulationInfo.count.strikes)
-        result = batter.get_pitch_result(pitch, self.simulationInfo.count.balls, self.simulationInfo.count.strikes)
-        return pitch, result
\ No newline at end of file
+        pitch = pitcher.simulate_pitch(self.simulationInfo.count.balls, self.simulationInfo.count.strikes,
+                                       rng=self.simulationInfo.rng)
+        result = batter.get_pitch_result(pitch, self.simulationInfo.count.balls, self.simulationInfo.count.strikes,
+                                         rng=self.simulationInfo.rng)
+        return pitch, result
+
+
+# Pitch simulators by the name SimulationInfo refers to them with
+SIMULATIONS = {
+    "basic": BasicPitchSimulator,
+    "count": CountBasedPitchSimulator
+}
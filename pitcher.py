@@ -1,60 +1,70 @@
 from numpy import random
 import numpy as np
 import pandas as pd
-from pybaseball import playerid_reverse_lookup
-from db_manager import DatabaseManager
+from db_manager import DatabaseManager, training_fingerprint, player_rows
+from name_resolver import default_resolver, display_name
+from sampling import Distribution
+from profile_codec import BALLS, STRIKES
+from player_model import PitcherModel
 
 # League average pitch type distribution
 LEAGUE_AVG_PITCH_TYPES = ['FF', 'SL', 'CH', 'CU', 'SI', 'FC']
 LEAGUE_AVG_PITCH_PROBS = [0.35, 0.20, 0.15, 0.15, 0.10, 0.05]  # Matches order of types above
+LEAGUE_AVG_PITCHES = Distribution(LEAGUE_AVG_PITCH_TYPES, LEAGUE_AVG_PITCH_PROBS)
+
+# Probability tiers of a pitcher, in the order DatabaseManager stores them
+TIERS = ('basic', 'count_based', 'in_play')
 
 class Pitcher:
-    _db = DatabaseManager()  # Class-level database manager
-    
-    def __init__(self, id, statcast: pd.DataFrame):
+    def __init__(self, id, statcast: pd.DataFrame, profile=None, name=None, store=True, fingerprint=None, db=None,
+                 tiers=None):
+        """Initialize a pitcher with their ID and statcast data.
+
+        Args:
+            id: MLB ID of the pitcher
+            statcast: DataFrame containing statcast data
+            profile: Optional cached tiers from DatabaseManager.get_pitcher_profiles.
+                When given, the database is not queried for probabilities.
+            name: Optional cached (first_name, last_name) tuple. Resolved
+                through name_resolver.default_resolver when not given.
+            store: Whether to write freshly computed probabilities to the cache
+            fingerprint: Training window of statcast, see training_fingerprint().
+                Computed from statcast when needed and not given.
+            db: Optional DatabaseManager to read and write the cache through,
+                e.g. a write-behind manager shared by a whole run
+            tiers: Tiers to build now, e.g. PitchSimulator.required_tiers().
+                Defaults to every tier. Any other tier is loaded or computed
+                on first access.
+        """
         self.id = int(id)  # Convert numpy.int64 to int
+        self._db = db if db is not None else DatabaseManager.shared()
         
         # Check all caches first
-        basic_probs = self._db.get_pitcher_basic_probs(self.id)
-        count_based_probs = self._db.get_pitcher_count_based_probs(self.id)
-        in_play_probs = self._db.get_pitcher_in_play_probs(self.id)
-        name = self._db.get_player_name(self.id)
-        
-        # Only filter statcast data if we need to calculate any probabilities
-        filtered_stats = None
-        if not all([basic_probs, count_based_probs, in_play_probs]):
-            filtered_stats = statcast.loc[statcast.pitcher == id]
-            
-            if not basic_probs:
-                basic_probs = self.__init_pitch_stats_basic(filtered_stats)
-                self._db.set_pitcher_basic_probs(self.id, basic_probs)
-            
-            if not count_based_probs:
-                count_based_probs = self.__init_pitch_probs_count_based(filtered_stats)
-                self._db.set_pitcher_count_based_probs(self.id, count_based_probs)
-            
-            if not in_play_probs:
-                in_play_probs = self.init_in_play_stats(filtered_stats)
-                self._db.set_pitcher_in_play_probs(self.id, in_play_probs)
-        
-        # Set all probabilities
-        self.basic_probs = basic_probs
-        self.count_based_probs = count_based_probs
-        self.in_play_probs = in_play_probs
+        if fingerprint is None and (profile is None or store):
+            fingerprint = training_fingerprint(statcast)
+        if profile is None:
+            profile, name = self._db.get_player_profile(self.id, 'pitcher', fingerprint)
+            profile = profile or {}
+        self._stats = None  # This pitcher's rows, kept only while some tier is unbuilt
+        self._store = store
+        self._fingerprint = fingerprint
+        self._tiers = {tier: profile.get(tier) for tier in TIERS}
+        self._built = set()
+        self._compiled = {}
+        self._tables = {}  # Lookup tables of pitch_table(), by whether they're by count
+        self._model = None
+
+        # Build the requested tiers now and the rest only if they are used
+        for tier in TIERS if tiers is None else tiers:
+            self._tier(tier, statcast)
+        # Later tiers only need this pitcher's rows, so the training frame isn't kept alive
+        if not self._complete() and self._stats is None:
+            self._stats = player_rows(statcast, 'pitcher', self.id)
         
         # Handle player name
         if not name:
-            lookup = playerid_reverse_lookup([self.id])
-            if len(lookup):
-                first_name = lookup.name_first[0]
-                last_name = lookup.name_last[0]
-                self._db.set_player_name(self.id, first_name, last_name)
-                self.name = f"{first_name} {last_name}"
-            else:
-                self.name = "Unknown Player"
-        else:
-            first_name, last_name = name
-            self.name = f"{first_name} {last_name}"
+            name = default_resolver.resolve([self.id], self._db).get(self.id)
+        self.name = display_name(name)
 
     def init_in_play_stats(self, stats):
         """Initialize in-play statistics with proper normalization.
@@ -100,6 +110,79 @@ class Pitcher:
         """
         return self.in_play_probs
 
+    def profile(self, tiers=None):
+        """Get probability tiers in the form stored by DatabaseManager.set_pitcher_profiles.
+
+        Args:
+            tiers: Optional tiers to include, building any not built yet.
+                Defaults to every tier.
+        """
+        return {tier: self._tier(tier) for tier in (TIERS if tiers is None else tiers)}
+
+    @property
+    def basic_probs(self):
+        return self._tier('basic')
+
+    @basic_probs.setter
+    def basic_probs(self, probs):
+        self._replace_tier('basic', probs)
+
+    @property
+    def count_based_probs(self):
+        return self._tier('count_based')
+
+    @count_based_probs.setter
+    def count_based_probs(self, probs):
+        self._replace_tier('count_based', probs)
+
+    @property
+    def in_play_probs(self):
+        return self._tier('in_play')
+
+    @in_play_probs.setter
+    def in_play_probs(self, probs):
+        self._replace_tier('in_play', probs)
+
+    def _tier(self, tier, statcast=None):
+        """Get one tier, computing it from statcast the first time it's missing.
+
+        Args:
+            tier: Name of the tier
+            statcast: Training frame, only passed while constructing. Later
+                tiers are built from the rows kept in self._stats.
+        """
+        probs = self._tiers[tier]
+        if not probs and tier not in self._built:
+            if self._stats is None:
+                self._stats = player_rows(statcast, 'pitcher', self.id)
+            probs = self._build_tier(tier, self._stats)
+            self._tiers[tier] = probs
+            self._built.add(tier)
+            if self._store:
+                self._db.set_pitcher_profiles({self.id: {tier: probs}}, self._fingerprint)
+            if self._complete():
+                self._stats = None
+        return probs
+
+    def _complete(self):
+        """Whether every tier has been loaded or built."""
+        return all(self._tiers[tier] or tier in self._built for tier in TIERS)
+
+    def _build_tier(self, tier, stats):
+        if tier == 'basic':
+            return self.__init_pitch_stats_basic(stats)
+        if tier == 'count_based':
+            return self.__init_pitch_probs_count_based(stats)
+        if tier == 'in_play':
+            return self.init_in_play_stats(stats)
+        raise ValueError(f"Unknown tier: {tier}")
+
+    def _replace_tier(self, tier, probs):
+        self._tiers[tier] = probs
+        self._compiled.pop(tier, None)
+        self._tables.clear()
+        self._model = None
+
     def __init_pitch_stats_basic(self, pitcher_data: pd.DataFrame):
         """
         Computes overall pitch probabilities from the DataFrame.
@@ -136,23 +219,77 @@ class Pitcher:
         
         return count_probs
 
-    def simulate_pitch(self, balls: int = None, strikes: int = None): 
+    def model(self):
+        """Get the dense PitcherModel of this pitcher, built on first use."""
+        if self._model is None:
+            self._model = PitcherModel.from_profile(self.id, self.profile())
+        return self._model
+
+    def compile(self, tiers=None):
+        """Precompile tiers for sampling, e.g. before forking workers that share this player.
+
+        Args:
+            tiers: Tier names to compile. Defaults to the tiers pitches are
+                sampled from; in_play isn't sampled from.
+        """
+        for tier in ('basic', 'count_based') if tiers is None else tiers:
+            if tier != 'in_play':
+                self._distributions(tier)
+
+    def _distributions(self, tier):
+        """Get one tier precompiled for sampling, compiling it on first use.
+
+        Empty or invalid probabilities compile to the league average.
+        """
+        compiled = self._compiled.get(tier)
+        if compiled is not None:
+            return compiled
+        probs = self._tier(tier) or {}
+        if tier == 'basic':
+            compiled = Distribution.from_dict(probs, LEAGUE_AVG_PITCHES)
+        else:
+            compiled = {
+                (balls, strikes): Distribution.from_dict(pitch_probs, LEAGUE_AVG_PITCHES)
+                for (balls, strikes), pitch_probs in probs.items()
+            }
+        self._compiled[tier] = compiled
+        return compiled
+
+    def simulate_pitch(self, balls: int = None, strikes: int = None, rng=None):
         """
         Predicts the next pitch. If count is provided, uses count-based probabilities.
         :param balls: (Optional) Current number of balls.
         :param strikes: (Optional) Current number of strikes.
+        :param rng: (Optional) SimulationRandom to draw from instead of numpy's global state.
         :return: The predicted pitch type.
         """
-        try:
-            if balls is not None and strikes is not None and (balls, strikes) in self.count_based_probs:
-                probs = self.count_based_probs[(balls, strikes)]
+        dist = self._pitch_distribution(balls, strikes)
+        return dist.sample(rng.random() if rng is not None else random.random_sample())
+
+    def pitch_table(self, by_count=True):
+        """Get the distributions simulate_pitch() samples from, arranged for drawing many pitches.
+
+        Args:
+            by_count: Whether pitch types depend on the count, as when
+                simulate_pitch() is given one
+
+        Returns:
+            list: Distributions indexed by balls * 3 + strikes
+        """
+        table = self._tables.get(by_count)
+        if table is None:
+            if by_count:
+                table = [self._pitch_distribution(balls, strikes) for balls in range(BALLS) for strikes in range(STRIKES)]
             else:
-                probs = self.basic_probs
-
-            pitch_types, probabilities = zip(*probs.items())
-            pitch_index = np.random.multinomial(1, probabilities).argmax()
-            return pitch_types[pitch_index]
-            
-        except:
-            # Fallback to league average if anything goes wrong
-            return LEAGUE_AVG_PITCH_TYPES[np.random.multinomial(1, LEAGUE_AVG_PITCH_PROBS).argmax()]
\ No newline at end of file
+                table = [self._pitch_distribution()] * (BALLS * STRIKES)
+            self._tables[by_count] = table
+        return table
+
+    def _pitch_distribution(self, balls=None, strikes=None):
+        """Get the distribution of pitch types, by count when there's one for it."""
+        dist = None
+        if balls is not None and strikes is not None:
+            dist = self._distributions('count_based').get((balls, strikes))
+        if dist is None:
+            dist = self._distributions('basic')
+        return dist
@@ -0,0 +1,199 @@
+import numpy as np
+import profile_codec
+from profile_codec import PITCH_TYPES, PITCH_TYPE_INDEX, PITCH_OUTCOMES, BALLS, STRIKES
+
+# Pitch outcomes as the game engine treats them: a ball, a strike, a foul
+# (a strike unless there are already two), a ball in play, or anything else,
+# which leaves the count alone
+PITCH_EVENTS = ('ball', 'strike', 'foul', 'in_play', 'other')
+BALL, STRIKE, FOUL, IN_PLAY, OTHER = range(len(PITCH_EVENTS))
+DESCRIPTION_EVENTS = {
+    'ball': BALL,
+    'called_strike': STRIKE,
+    'swinging_strike': STRIKE,
+    'foul': FOUL,
+    'hit_into_play': IN_PLAY,
+}
+
+# Maps the codec's outcome axis onto PITCH_EVENTS
+_EVENT_MATRIX = np.zeros((len(PITCH_OUTCOMES), len(PITCH_EVENTS)), dtype=np.float32)
+for _i, _outcome in enumerate(PITCH_OUTCOMES):
+    _EVENT_MATRIX[_i, DESCRIPTION_EVENTS.get(_outcome, OTHER)] = 1
+
+# Same values as batter.LEAGUE_AVG_PROBS, LEAGUE_AVG_HIT_PROBS and
+# pitcher.LEAGUE_AVG_PITCH_TYPES/PROBS, which can't be imported from here
+# without a cycle
+LEAGUE_AVG_EVENTS = np.array([0.35, 0.27, 0.13, 0.25, 0.0], dtype=np.float32)
+LEAGUE_AVG_HITS = np.array([0.69, 0.15, 0.09, 0.02, 0.05], dtype=np.float32)
+LEAGUE_AVG_PITCHES = np.zeros(len(PITCH_TYPES), dtype=np.float32)
+for _pitch_type, _p in zip(['FF', 'SL', 'CH', 'CU', 'SI', 'FC'], [0.35, 0.20, 0.15, 0.15, 0.10, 0.05]):
+    LEAGUE_AVG_PITCHES[PITCH_TYPE_INDEX[_pitch_type]] = _p
+
+
+class BatterModel:
+    """Dense, integer-coded probabilities of one batter.
+
+    Pitch types are indexed as in profile_codec.PITCH_TYPES and pitch
+    outcomes as in PITCH_EVENTS. The count -> basic -> global -> league
+    average fallback chain is resolved when the model is built, so every
+    lookup is a single array index. About 5 KB per batter.
+    """
+
+    __slots__ = ('id', 'count_events', 'basic_events', 'hits')
+
+    def __init__(self, id, count_events, basic_events, hits):
+        """Initialize a model from already resolved arrays.
+
+        Args:
+            id: MLB ID of the batter
+            count_events: float32 [pitch_type, balls, strikes, event] probabilities
+            basic_events: float32 [pitch_type, event] probabilities, used without a count
+            hits: float32 probabilities of profile_codec.IN_PLAY_OUTCOMES
+        """
+        self.id = id
+        self.count_events = count_events
+        self.basic_events = basic_events
+        self.hits = hits
+
+    @classmethod
+    def from_arrays(cls, id, in_play=None, basic=None, global_probs=None, count_based=None):
+        """Build a model from dense tiers, e.g. from a ProfileSnapshot.
+
+        Args:
+            id: MLB ID of the batter
+            in_play, basic, global_probs, count_based: Tiers shaped as in
+                profile_codec.TIER_SHAPES, or None when missing
+
+        Returns:
+            BatterModel
+        """
+        global_events = _to_events(global_probs, ('batter', 'global'))
+        global_events = _fill(global_events, LEAGUE_AVG_EVENTS)
+        basic_events = _fill(_to_events(basic, ('batter', 'basic')), global_events)
+        count_events = _fill(_to_events(count_based, ('batter', 'count_based')), basic_events[:, None, None, :])
+        hits = _fill(_as_array(in_play, ('batter', 'in_play')), LEAGUE_AVG_HITS)
+        return cls(int(id), count_events, basic_events, hits)
+
+    @classmethod
+    def from_profile(cls, id, profile):
+        """Build a model from tiers in the dict form used by Batter.
+
+        Entries outside the fixed vocabularies of profile_codec are dropped.
+        """
+        return cls.from_arrays(id, **_profile_arrays('batter', profile, {'global': 'global_probs'}))
+
+    def event_probs(self, pitch_type, balls=None, strikes=None):
+        """Get the PITCH_EVENTS probabilities of a pitch.
+
+        Args:
+            pitch_type: Index into profile_codec.PITCH_TYPES
+            balls: Optional current number of balls
+            strikes: Optional current number of strikes
+        """
+        if balls is None or strikes is None:
+            return self.basic_events[pitch_type]
+        return self.count_events[pitch_type, balls, strikes]
+
+    @property
+    def nbytes(self):
+        return self.count_events.nbytes + self.basic_events.nbytes + self.hits.nbytes
+
+
+class PitcherModel:
+    """Dense, integer-coded pitch type probabilities of one pitcher.
+
+    Pitch types are indexed as in profile_codec.PITCH_TYPES. Counts without
+    data fall back to the pitcher's basic probabilities and those to the
+    league average at build time. About 1 KB per pitcher.
+    """
+
+    __slots__ = ('id', 'count_pitches', 'basic_pitches')
+
+    def __init__(self, id, count_pitches, basic_pitches):
+        """Initialize a model from already resolved arrays.
+
+        Args:
+            id: MLB ID of the pitcher
+            count_pitches: float32 [balls, strikes, pitch_type] probabilities
+            basic_pitches: float32 [pitch_type] probabilities, used without a count
+        """
+        self.id = id
+        self.count_pitches = count_pitches
+        self.basic_pitches = basic_pitches
+
+    @classmethod
+    def from_arrays(cls, id, basic=None, count_based=None):
+        """Build a model from dense tiers shaped as in profile_codec.TIER_SHAPES."""
+        basic_pitches = _fill(_as_array(basic, ('pitcher', 'basic')), LEAGUE_AVG_PITCHES)
+        count_pitches = _fill(_as_array(count_based, ('pitcher', 'count_based')), basic_pitches)
+        return cls(int(id), count_pitches, basic_pitches)
+
+    @classmethod
+    def from_profile(cls, id, profile):
+        """Build a model from tiers in the dict form used by Pitcher."""
+        return cls.from_arrays(id, **_profile_arrays('pitcher', profile, {}))
+
+    def pitch_probs(self, balls=None, strikes=None):
+        """Get the probabilities of each pitch type, by count when it's given and valid."""
+        if balls is None or strikes is None or not (0 <= balls < BALLS and 0 <= strikes < STRIKES):
+            return self.basic_pitches
+        return self.count_pitches[balls, strikes]
+
+    @property
+    def nbytes(self):
+        return self.count_pitches.nbytes + self.basic_pitches.nbytes
+
+
+def matchup_events(batter, pitcher, by_count=True):
+    """Get the PITCH_EVENTS probabilities of a batter facing a pitcher at every count.
+
+    Pitch types are marginalized over the pitcher's mix, which leaves the
+    distribution of results unchanged when only the results matter.
+
+    Args:
+        batter: BatterModel
+        pitcher: PitcherModel
+        by_count: Whether the pitch mix and results depend on the count, as
+            with the count pitch simulator. Otherwise the basic probabilities
+            are used at every count.
+
+    Returns:
+        np.ndarray: float64 [balls, strikes, event] probabilities
+    """
+    if by_count:
+        # [balls, strikes, pitch] x [pitch, balls, strikes, event]
+        events = np.einsum('bsp,pbse->bse', pitcher.count_pitches, batter.count_events)
+    else:
+        events = np.broadcast_to(pitcher.basic_pitches @ batter.basic_events, (BALLS, STRIKES, len(PITCH_EVENTS)))
+    return events.astype(np.float64)
+
+
+def _profile_arrays(role, profile, renames):
+    """Convert the present tiers of a dict-form profile to dense arrays, keyed for from_arrays()."""
+    arrays = {}
+    for tier, probs in (profile or {}).items():
+        if probs and (role, tier) in profile_codec.TIER_SHAPES:
+            arrays[renames.get(tier, tier)] = profile_codec.to_array(role, tier, probs)
+    if role == 'pitcher':
+        arrays.pop('in_play', None)
+    return arrays
+
+
+def _as_array(dense, key):
+    if dense is None:
+        return np.zeros(profile_codec.TIER_SHAPES[key], dtype=np.float32)
+    return np.asarray(dense, dtype=np.float32)
+
+
+def _to_events(dense, key):
+    """Collapse the outcome axis of a batter tier onto PITCH_EVENTS."""
+    return _as_array(dense, key) @ _EVENT_MATRIX
+
+
+def _fill(probs, fallback):
+    """Normalize rows along the last axis, replacing empty rows with the fallback's."""
+    totals = probs.sum(axis=-1, keepdims=True)
+    fallback = np.broadcast_to(fallback, probs.shape)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        normalized = probs / totals
+    return np.where(totals > 0, normalized, fallback).astype(np.float32)
@@ -0,0 +1,112 @@
+import threading
+from collections import OrderedDict
+
+# Default bound on models kept alive, comfortably above a full league's rosters
+DEFAULT_MAXSIZE = 4096
+
+
+class PlayerRegistry:
+    """In-memory flyweight cache of Batter and Pitcher models.
+
+    Models are keyed by (player ID, role, training fingerprint) and shared by
+    every Team built from the same training window, so they must be treated as
+    read-only. The least recently used model is evicted once the registry is
+    full.
+    """
+
+    def __init__(self, maxsize=DEFAULT_MAXSIZE):
+        """Initialize an empty registry.
+
+        Args:
+            maxsize: Maximum number of models kept before evicting
+        """
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self._models = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, player_id, role, fingerprint):
+        """Get a shared model, counting the lookup as a hit or a miss.
+
+        Args:
+            player_id: MLB ID of the player
+            role: 'batter' or 'pitcher'
+            fingerprint: Training window, see db_manager.training_fingerprint()
+
+        Returns:
+            The registered model, or None if it isn't registered
+        """
+        key = (int(player_id), role, fingerprint)
+        with self._lock:
+            model = self._models.get(key)
+            if model is None:
+                self.misses += 1
+                return None
+            self._models.move_to_end(key)
+            self.hits += 1
+            return model
+
+    def put(self, model, role, fingerprint):
+        """Register a model, evicting the least recently used ones if full.
+
+        Args:
+            model: Batter or Pitcher to share
+            role: 'batter' or 'pitcher'
+            fingerprint: Training window the model was built from
+        """
+        key = (model.id, role, fingerprint)
+        with self._lock:
+            self._models[key] = model
+            self._models.move_to_end(key)
+            self._evict()
+
+    def resize(self, maxsize):
+        """Change the size bound, evicting models if it shrinks."""
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        with self._lock:
+            self.maxsize = maxsize
+            self._evict()
+
+    def clear(self):
+        """Drop every model and reset the counters."""
+        with self._lock:
+            self._models.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def stats(self):
+        """Get the registry's counters.
+
+        Returns:
+            dict: hits, misses, evictions, size and maxsize
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'size': len(self._models),
+                'maxsize': self.maxsize
+            }
+
+    def __len__(self):
+        return len(self._models)
+
+    def __contains__(self, key):
+        player_id, role, fingerprint = key
+        return (int(player_id), role, fingerprint) in self._models
+
+    def _evict(self):
+        while len(self._models) > self.maxsize:
+            self._models.popitem(last=False)
+            self.evictions += 1
+
+
+# Registry shared by every Team in the process unless one is passed explicitly
+default_registry = PlayerRegistry()
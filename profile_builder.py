@@ -0,0 +1,183 @@
+import pandas as pd
+from batter import LEAGUE_AVG_HIT_PROBS
+from pitcher import LEAGUE_AVG_PITCH_TYPES, LEAGUE_AVG_PITCH_PROBS
+from db_manager import DatabaseManager, training_fingerprint
+
+HIT_OUTCOMES = ['field_out', 'single', 'double', 'triple', 'home_run']
+COUNTS = [(balls, strikes) for balls in range(4) for strikes in range(3)]
+BATTER_TIERS = ('in_play', 'basic', 'global', 'count_based')
+PITCHER_TIERS = ('basic', 'count_based', 'in_play')
+
+
+def build_batter_profiles(statcast, player_ids=None, tiers=None):
+    """Compute probability tiers for many batters in a few grouped passes.
+
+    Produces the same probabilities as Batter computes for one player at a
+    time, without rescanning the frame per player.
+
+    Args:
+        statcast: DataFrame containing statcast data
+        player_ids: Optional batter IDs to build. Defaults to every batter in
+            statcast. Batters without data get the same defaults as Batter.
+        tiers: Optional tiers to build, skipping the passes of the others.
+            Defaults to every tier.
+
+    Returns:
+        dict: Maps batter ID to {'in_play', 'basic', 'global', 'count_based'}
+    """
+    stats, player_ids = _select(statcast, 'batter', player_ids)
+    tiers = BATTER_TIERS if tiers is None else tiers
+
+    built = {}
+    if 'global' in tiers:
+        built['global'] = _nest(_normalized(stats, ['batter', 'description']))
+    if 'basic' in tiers:
+        built['basic'] = _nest(_normalized(stats, ['batter', 'pitch_type', 'description']))
+    if 'count_based' in tiers:
+        count_based_probs = built['count_based'] = {}
+        for (batter, pitch_type, balls, strikes, description), p in _normalized(
+                stats, ['batter', 'pitch_type', 'balls', 'strikes', 'description']).items():
+            counts = count_based_probs.setdefault(batter, {}).setdefault(pitch_type, {})
+            counts.setdefault(f"{balls}-{strikes}", {})[description] = float(p)
+    if 'in_play' in tiers:
+        in_play_counts = _hit_counts(stats, 'batter')
+        built['in_play'] = {id: _in_play_probs(in_play_counts.get(id, {})) for id in player_ids}
+
+    return {
+        id: {tier: built[tier].get(id, {}) for tier in BATTER_TIERS if tier in built}
+        for id in player_ids
+    }
+
+
+def build_pitcher_profiles(statcast, player_ids=None, tiers=None):
+    """Compute probability tiers for many pitchers in a few grouped passes.
+
+    Produces the same probabilities as Pitcher computes for one player at a
+    time, replacing its scan per count with one grouping over all counts.
+
+    Args:
+        statcast: DataFrame containing statcast data
+        player_ids: Optional pitcher IDs to build. Defaults to every pitcher in
+            statcast. Pitchers without data get the same defaults as Pitcher.
+        tiers: Optional tiers to build, skipping the passes of the others.
+            Defaults to every tier.
+
+    Returns:
+        dict: Maps pitcher ID to {'basic', 'count_based', 'in_play'}
+    """
+    stats, player_ids = _select(statcast, 'pitcher', player_ids)
+    tiers = PITCHER_TIERS if tiers is None else tiers
+    has_data = set(stats['pitcher'].unique())
+
+    # Basic probabilities are also the fallback of counts without data
+    basic_probs = _nest(_normalized(stats, ['pitcher', 'pitch_type']))
+    if 'count_based' in tiers:
+        by_count = _nest(_normalized(stats, ['pitcher', 'balls', 'strikes', 'pitch_type']))
+        # Counts the pitcher has pitched in, even if none of those pitches are typed
+        pitched = set(stats.groupby(['pitcher', 'balls', 'strikes']).size().index)
+    if 'in_play' in tiers:
+        in_play_counts = _hit_counts(stats, 'pitcher', fielders_choice=True)
+
+    profiles = {}
+    for id in player_ids:
+        basic = basic_probs.get(id, {})
+        profile = profiles[id] = {}
+        if 'basic' in tiers:
+            profile['basic'] = basic
+        if 'count_based' in tiers:
+            if id in has_data:
+                pitcher_counts = by_count.get(id, {})
+                profile['count_based'] = {
+                    (balls, strikes): pitcher_counts.get(balls, {}).get(strikes, {})
+                    if (id, balls, strikes) in pitched else basic.copy()
+                    for balls, strikes in COUNTS
+                }
+            else:
+                profile['count_based'] = {
+                    count: dict(zip(LEAGUE_AVG_PITCH_TYPES, LEAGUE_AVG_PITCH_PROBS)) for count in COUNTS
+                }
+        if 'in_play' in tiers:
+            profile['in_play'] = _in_play_probs(in_play_counts.get(id, {}))
+    return profiles
+
+
+def build_profiles(statcast, role, player_ids=None, tiers=None):
+    """Build profiles for one role, see build_batter_profiles and build_pitcher_profiles."""
+    if role == 'batter':
+        return build_batter_profiles(statcast, player_ids, tiers)
+    if role == 'pitcher':
+        return build_pitcher_profiles(statcast, player_ids, tiers)
+    raise ValueError(f"Unknown role: {role}")
+
+
+def warm_profiles(statcast, db=None, fingerprint=None, batter_ids=None, pitcher_ids=None):
+    """Build profiles for every player in statcast and bulk-load them into the cache.
+
+    Args:
+        statcast: DataFrame containing statcast data
+        db: DatabaseManager to write to. Defaults to the default database.
+        fingerprint: Training window of statcast. Computed when not given.
+        batter_ids: Optional batter IDs to build instead of every batter
+        pitcher_ids: Optional pitcher IDs to build instead of every pitcher
+
+    Returns:
+        tuple: (number of batter profiles, number of pitcher profiles) written
+    """
+    db = db if db is not None else DatabaseManager.shared()
+    fingerprint = fingerprint if fingerprint is not None else training_fingerprint(statcast)
+    batters = build_batter_profiles(statcast, batter_ids)
+    pitchers = build_pitcher_profiles(statcast, pitcher_ids)
+    db.set_batter_profiles(batters, fingerprint)
+    db.set_pitcher_profiles(pitchers, fingerprint)
+    return len(batters), len(pitchers)
+
+
+def _select(statcast, role, player_ids):
+    """Restrict statcast to the requested players and list their IDs."""
+    if player_ids is None:
+        return statcast, [int(id) for id in statcast[role].dropna().unique()]
+    player_ids = [int(id) for id in player_ids]
+    return statcast.loc[statcast[role].isin(player_ids)], player_ids
+
+
+def _normalized(stats, keys):
+    """Share of each last key within its leading keys, like value_counts(normalize=True)."""
+    counts = stats.groupby(keys).size()
+    counts = counts[counts > 0]
+    if len(counts) == 0:
+        return counts
+    return counts / counts.groupby(level=list(range(len(keys) - 1))).transform('sum')
+
+
+def _nest(series):
+    """Turn a MultiIndex Series into nested dicts keyed by player ID first."""
+    nested = {}
+    for keys, value in series.items():
+        level = nested
+        for key in keys[:-1]:
+            level = level.setdefault(key, {})
+        level[keys[-1]] = float(value)
+    return nested
+
+
+def _hit_counts(stats, role, fielders_choice=False):
+    """Count in-play events per player, folding fielder's choices into outs for pitchers."""
+    events = stats.groupby([role, 'events']).size()
+    counts = {}
+    for (id, event), count in events.items():
+        if count:
+            counts.setdefault(id, {})[event] = count
+    hit_counts = {}
+    for id, player_counts in counts.items():
+        hits = {outcome: player_counts.get(outcome, 0) for outcome in HIT_OUTCOMES}
+        if fielders_choice and 'fielders_choice' in player_counts:
+            hits['field_out'] += player_counts['fielders_choice'] + player_counts.get('sac_fly', 0)
+        hit_counts[id] = hits
+    return hit_counts
+
+
+def _in_play_probs(hit_counts):
+    total = sum(hit_counts.values())
+    if total > 0:
+        return {outcome: hit_counts.get(outcome, 0) / total for outcome in HIT_OUTCOMES}
+    return dict(zip(HIT_OUTCOMES, LEAGUE_AVG_HIT_PROBS))
@@ -0,0 +1,209 @@
+import numpy as np
+
+# Fixed vocabularies for the binary profile format. Stored blobs depend on their
+# order and length, so bump MODEL_VERSION in db_manager alongside any change.
+PITCH_TYPES = (
+    'FF', 'SI', 'FC', 'SL', 'ST', 'SV', 'CU', 'KC', 'CS', 'CH',
+    'FS', 'FO', 'SC', 'KN', 'EP', 'FA', 'PO', 'IN', 'AB', 'UN'
+)
+PITCH_OUTCOMES = (
+    'ball', 'called_strike', 'swinging_strike', 'foul', 'hit_into_play',
+    'blocked_ball', 'foul_tip', 'swinging_strike_blocked', 'hit_by_pitch', 'foul_bunt',
+    'missed_bunt', 'bunt_foul_tip', 'pitchout', 'automatic_ball', 'automatic_strike',
+    'foul_pitchout', 'intent_ball', 'hit_into_play_score', 'hit_into_play_no_out', 'swinging_pitchout'
+)
+IN_PLAY_OUTCOMES = ('field_out', 'single', 'double', 'triple', 'home_run')
+
+PITCH_TYPE_INDEX = {pitch_type: i for i, pitch_type in enumerate(PITCH_TYPES)}
+PITCH_OUTCOME_INDEX = {outcome: i for i, outcome in enumerate(PITCH_OUTCOMES)}
+IN_PLAY_OUTCOME_INDEX = {outcome: i for i, outcome in enumerate(IN_PLAY_OUTCOMES)}
+
+BALLS = 4
+STRIKES = 3
+
+# Dense float32 layout of each tier, keyed by (role, tier)
+TIER_SHAPES = {
+    ('batter', 'global'): (len(PITCH_OUTCOMES),),
+    ('batter', 'basic'): (len(PITCH_TYPES), len(PITCH_OUTCOMES)),
+    ('batter', 'count_based'): (len(PITCH_TYPES), BALLS, STRIKES, len(PITCH_OUTCOMES)),
+    ('batter', 'in_play'): (len(IN_PLAY_OUTCOMES),),
+    ('pitcher', 'basic'): (len(PITCH_TYPES),),
+    ('pitcher', 'count_based'): (BALLS, STRIKES, len(PITCH_TYPES)),
+    ('pitcher', 'in_play'): (len(IN_PLAY_OUTCOMES),),
+}
+
+# Blob layout: a little-endian uint32 bitmask of the non-empty rows along the
+# first axis, followed by those rows as little-endian float32.
+MASK_BYTES = 4
+BLOB_DTYPE = np.dtype('<f4')
+
+
+def encode(role, tier, probs):
+    """Encode one tier of probabilities as a compact float32 blob.
+
+    Args:
+        role: 'batter' or 'pitcher'
+        tier: Tier name, e.g. 'count_based'
+        probs: Probabilities in the dict form used by Batter and Pitcher
+
+    Returns:
+        bytes, or None if the dict can't be represented exactly by the fixed
+        vocabularies (unknown keys, zero entries that must round-trip, ...).
+        Callers fall back to JSON in that case.
+    """
+    try:
+        dense = to_array(role, tier, probs, strict=True)
+    except (AttributeError, KeyError, TypeError, ValueError):
+        return None
+
+    flat = dense.reshape(dense.shape[0], -1)
+    rows = np.flatnonzero(flat.any(axis=1))
+    mask = 0
+    for row in rows:
+        mask |= 1 << int(row)
+    return mask.to_bytes(MASK_BYTES, 'little') + dense[rows].astype(BLOB_DTYPE).tobytes()
+
+
+def decode_array(role, tier, blob):
+    """Decode a blob straight into its dense float32 array.
+
+    Args:
+        role: 'batter' or 'pitcher'
+        tier: Tier name
+        blob: bytes produced by encode()
+
+    Returns:
+        np.ndarray with shape TIER_SHAPES[(role, tier)]
+    """
+    shape = TIER_SHAPES[(role, tier)]
+    mask = int.from_bytes(blob[:MASK_BYTES], 'little')
+    rows = [row for row in range(shape[0]) if mask >> row & 1]
+    dense = np.zeros(shape, dtype=np.float32)
+    if rows:
+        dense[rows] = np.frombuffer(blob, dtype=BLOB_DTYPE, offset=MASK_BYTES).reshape((len(rows),) + shape[1:])
+    return dense
+
+
+def decode(role, tier, blob):
+    """Decode a blob into the dict form used by Batter and Pitcher."""
+    return to_dict(role, tier, decode_array(role, tier, blob))
+
+
+def to_array(role, tier, probs, strict=False):
+    """Convert one tier from dict form to its dense float32 array.
+
+    Args:
+        role: 'batter' or 'pitcher'
+        tier: Tier name
+        probs: Probabilities in dict form
+        strict: Raise ValueError or KeyError unless to_dict() would give back
+            exactly the same keys. Otherwise entries outside the vocabularies
+            are dropped.
+
+    Returns:
+        np.ndarray with shape TIER_SHAPES[(role, tier)]
+    """
+    dense = np.zeros(TIER_SHAPES[(role, tier)], dtype=np.float32)
+
+    if (role, tier) == ('batter', 'count_based'):
+        for pitch_type, counts in probs.items():
+            if strict and not counts:
+                raise ValueError("empty pitch type")
+            for count_key, outcome_probs in counts.items():
+                try:
+                    balls, strikes = _parse_count_key(count_key)
+                except (KeyError, ValueError):
+                    if strict:
+                        raise
+                    continue
+                if strict and not outcome_probs:
+                    raise ValueError("empty count")
+                _fill(dense, (pitch_type, balls, strikes), outcome_probs, PITCH_TYPE_INDEX, PITCH_OUTCOME_INDEX, strict)
+    elif (role, tier) == ('batter', 'basic'):
+        for pitch_type, outcome_probs in probs.items():
+            if strict and not outcome_probs:
+                raise ValueError("empty pitch type")
+            _fill(dense, (pitch_type,), outcome_probs, PITCH_TYPE_INDEX, PITCH_OUTCOME_INDEX, strict)
+    elif (role, tier) == ('pitcher', 'count_based'):
+        if strict and set(probs) != {(b, s) for b in range(BALLS) for s in range(STRIKES)}:
+            raise ValueError("pitcher count-based probabilities must cover every count")
+        for (balls, strikes), pitch_probs in probs.items():
+            if not (0 <= balls < BALLS and 0 <= strikes < STRIKES):
+                raise KeyError((balls, strikes))
+            for pitch_type, p in pitch_probs.items():
+                _set(dense, (balls, strikes), pitch_type, p, PITCH_TYPE_INDEX, strict)
+    elif tier == 'in_play':
+        if strict and set(probs) != set(IN_PLAY_OUTCOMES):
+            raise ValueError("in-play probabilities must cover every outcome")
+        for outcome, p in probs.items():
+            _set(dense, (), outcome, p, IN_PLAY_OUTCOME_INDEX, strict, keep_zero=True)
+    else:
+        index = PITCH_OUTCOME_INDEX if role == 'batter' else PITCH_TYPE_INDEX
+        for key, p in probs.items():
+            _set(dense, (), key, p, index, strict)
+    return dense
+
+
+def to_dict(role, tier, dense):
+    """Convert one tier from its dense array back to dict form.
+
+    Zero entries are dropped, matching the value_counts() output the dicts are
+    built from, except for in-play probabilities which always list every outcome.
+    """
+    if (role, tier) == ('batter', 'count_based'):
+        return {
+            PITCH_TYPES[pt]: {
+                f"{balls}-{strikes}": _vector_to_dict(dense[pt, balls, strikes], PITCH_OUTCOMES)
+                for balls in range(BALLS) for strikes in range(STRIKES)
+                if dense[pt, balls, strikes].any()
+            }
+            for pt in range(len(PITCH_TYPES)) if dense[pt].any()
+        }
+    if (role, tier) == ('batter', 'basic'):
+        return {
+            PITCH_TYPES[pt]: _vector_to_dict(dense[pt], PITCH_OUTCOMES)
+            for pt in range(len(PITCH_TYPES)) if dense[pt].any()
+        }
+    if (role, tier) == ('pitcher', 'count_based'):
+        return {
+            (balls, strikes): _vector_to_dict(dense[balls, strikes], PITCH_TYPES)
+            for balls in range(BALLS) for strikes in range(STRIKES)
+        }
+    if tier == 'in_play':
+        return dict(zip(IN_PLAY_OUTCOMES, dense.tolist()))
+    return _vector_to_dict(dense, PITCH_OUTCOMES if role == 'batter' else PITCH_TYPES)
+
+
+def _parse_count_key(count_key):
+    """Parse a batter count key such as '3-2' into (balls, strikes)."""
+    balls, strikes = count_key.split('-')
+    balls, strikes = int(balls), int(strikes)
+    if f"{balls}-{strikes}" != count_key or not (0 <= balls < BALLS and 0 <= strikes < STRIKES):
+        raise KeyError(count_key)
+    return balls, strikes
+
+
+def _fill(dense, prefix, outcome_probs, row_index, column_index, strict):
+    if prefix[0] not in row_index:
+        if strict:
+            raise KeyError(prefix[0])
+        return
+    row = (row_index[prefix[0]],) + prefix[1:]
+    for key, p in outcome_probs.items():
+        _set(dense, row, key, p, column_index, strict)
+
+
+def _set(dense, row, key, p, index, strict, keep_zero=False):
+    if key not in index:
+        if strict:
+            raise KeyError(key)
+        return
+    p = float(p)
+    if strict and (not p > 0 and not (keep_zero and p == 0)):
+        # Zero and NaN entries would not survive the round trip
+        raise ValueError(key)
+    dense[row + (index[key],)] = p
+
+
+def _vector_to_dict(vector, labels):
+    return {labels[i]: p for i, p in enumerate(vector.tolist()) if p}
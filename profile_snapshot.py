@@ -0,0 +1,177 @@
+import json
+import os
+import numpy as np
+import profile_codec
+
+# File layout: MAGIC, a little-endian uint64 header length, a JSON header
+# describing each array, then the arrays themselves at ALIGNMENT-byte offsets
+MAGIC = b'BBSNAP01'
+ALIGNMENT = 64
+
+# Tiers stored for each role, in bit order of the '<role>_tiers' presence mask
+SNAPSHOT_TIERS = {
+    'batter': ('in_play', 'basic', 'global', 'count_based'),
+    'pitcher': ('basic', 'count_based', 'in_play'),
+}
+
+
+def write_snapshot(path, fingerprint, profiles, names=None, model_version=None):
+    """Write profiles for one training window as a memory-mappable snapshot.
+
+    Each tier becomes one dense float32 array with a row per player, laid out
+    as in profile_codec.TIER_SHAPES. Entries outside the codec's fixed
+    vocabularies are dropped. The file is written next to path and renamed
+    into place, so readers never see a partial snapshot.
+
+    Args:
+        path: Snapshot file to create
+        fingerprint: Training window of the profiles
+        profiles: Dict mapping role to {player_id: {tier: probabilities or None}},
+            where probabilities are dicts or dense arrays
+        names: Optional dict mapping player ID to (first_name, last_name)
+        model_version: Model version the profiles were computed with
+    """
+    arrays = {}
+    for role, tiers in SNAPSHOT_TIERS.items():
+        role_profiles = profiles.get(role, {})
+        ids = np.array(sorted(int(id) for id in role_profiles), dtype=np.int64)
+        arrays[f'{role}_ids'] = ids
+        present = np.zeros(len(ids), dtype=np.uint8)
+        for bit, tier in enumerate(tiers):
+            dense = np.zeros((len(ids),) + profile_codec.TIER_SHAPES[(role, tier)], dtype=np.float32)
+            for row, id in enumerate(ids.tolist()):
+                probs = role_profiles[id].get(tier)
+                if probs is None:
+                    continue
+                present[row] |= 1 << bit
+                dense[row] = probs if isinstance(probs, np.ndarray) else profile_codec.to_array(role, tier, probs)
+            arrays[f'{role}_{tier}'] = dense
+        arrays[f'{role}_tiers'] = present
+
+    header = {
+        'fingerprint': fingerprint,
+        'model_version': model_version,
+        'names': {str(id): list(name) for id, name in (names or {}).items()},
+        'arrays': {},
+    }
+    # Array offsets depend on the header's length, which depends on the offsets
+    data_start = 0
+    while True:
+        offset = data_start
+        for name, array in arrays.items():
+            header['arrays'][name] = {'dtype': array.dtype.str, 'shape': list(array.shape), 'offset': offset}
+            offset += _aligned(array.nbytes)
+        encoded = json.dumps(header).encode()
+        if _aligned(len(MAGIC) + 8 + len(encoded)) <= data_start:
+            break
+        data_start = _aligned(len(MAGIC) + 8 + len(encoded))
+
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(len(encoded).to_bytes(8, 'little'))
+        f.write(encoded)
+        for name, array in arrays.items():
+            f.seek(header['arrays'][name]['offset'])
+            f.write(np.ascontiguousarray(array).tobytes())
+    os.replace(temp_path, path)
+
+
+class ProfileSnapshot:
+    """Read-only view of a snapshot written by write_snapshot().
+
+    Arrays are memory-mapped, so opening a snapshot is nearly free and
+    processes reading the same file share its pages through the OS cache.
+    """
+
+    def __init__(self, path):
+        """Open a snapshot file.
+
+        Args:
+            path: File written by write_snapshot() or DatabaseManager.export_snapshot()
+        """
+        self.path = str(path)
+        with open(self.path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"Not a profile snapshot: {self.path}")
+            header = json.loads(f.read(int.from_bytes(f.read(8), 'little')))
+
+        self.fingerprint = header['fingerprint']
+        self.model_version = header['model_version']
+        self._names = {int(id): tuple(name) for id, name in header['names'].items()}
+        self._arrays = {}
+        for name, entry in header['arrays'].items():
+            shape = tuple(entry['shape'])
+            if 0 in shape:
+                self._arrays[name] = np.zeros(shape, dtype=entry['dtype'])
+            else:
+                self._arrays[name] = np.memmap(self.path, dtype=entry['dtype'], mode='r',
+                                               offset=entry['offset'], shape=shape)
+
+    def player_ids(self, role):
+        """Get the IDs of every player of a role in the snapshot, sorted."""
+        return self._arrays[f'{role}_ids']
+
+    def row(self, player_id, role):
+        """Get the row of a player in the role's arrays.
+
+        Returns:
+            int, or None if the player isn't in the snapshot
+        """
+        ids = self._arrays[f'{role}_ids']
+        row = int(np.searchsorted(ids, int(player_id)))
+        if row < len(ids) and ids[row] == int(player_id):
+            return row
+        return None
+
+    def get_array(self, player_id, role, tier):
+        """Get one tier of a player as a read-only dense float32 array.
+
+        Returns:
+            np.ndarray shaped as profile_codec.TIER_SHAPES[(role, tier)], or
+            None if the player or tier isn't in the snapshot
+        """
+        row = self.row(player_id, role)
+        if row is None or not self._arrays[f'{role}_tiers'][row] >> SNAPSHOT_TIERS[role].index(tier) & 1:
+            return None
+        return self._arrays[f'{role}_{tier}'][row]
+
+    def get_profile(self, player_id, role):
+        """Get every tier of a player in the dict form used by Batter and Pitcher.
+
+        Returns:
+            dict of tier name -> probabilities (None for missing tiers), or
+            None if the player isn't in the snapshot
+        """
+        if self.row(player_id, role) is None:
+            return None
+        profile = {}
+        for tier in SNAPSHOT_TIERS[role]:
+            dense = self.get_array(player_id, role, tier)
+            profile[tier] = None if dense is None else profile_codec.to_dict(role, tier, dense)
+        return profile
+
+    def get_profiles(self, player_ids, role):
+        """Get profiles for several players, see get_profile().
+
+        Returns:
+            dict: Maps each player ID found in the snapshot to its profile
+        """
+        profiles = {}
+        for player_id in player_ids:
+            profile = self.get_profile(player_id, role)
+            if profile is not None:
+                profiles[int(player_id)] = profile
+        return profiles
+
+    def get_player_name(self, player_id):
+        """Get a player's (first_name, last_name), or None if not in the snapshot."""
+        return self._names.get(int(player_id))
+
+    def __contains__(self, key):
+        player_id, role = key
+        return self.row(player_id, role) is not None
+
+
+def _aligned(size):
+    return -(-size // ALIGNMENT) * ALIGNMENT
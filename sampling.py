@@ -0,0 +1,63 @@
+from bisect import bisect_right
+from itertools import accumulate
+import math
+
+
+class Distribution:
+    """Categorical distribution precompiled for fast sampling.
+
+    Holds the outcomes and their cumulative probabilities, so a draw is one
+    uniform number and a binary search instead of a multinomial trial.
+    """
+
+    __slots__ = ('outcomes', 'boundaries', 'total')
+
+    def __init__(self, outcomes, probs):
+        """Compile a distribution. Probabilities don't need to be normalized.
+
+        Args:
+            outcomes: Sequence of outcomes
+            probs: Matching sequence of non-negative weights with a positive sum
+
+        Raises:
+            ValueError: If there are no outcomes or the weights are invalid
+        """
+        outcomes = tuple(outcomes)
+        cumulative = list(accumulate(float(p) for p in probs))
+        if not outcomes or len(cumulative) != len(outcomes):
+            raise ValueError("Outcomes and probabilities must be non-empty and of equal length")
+        total = cumulative[-1]
+        if not (total > 0 and math.isfinite(total)) or any(float(p) < 0 for p in probs):
+            raise ValueError("Probabilities must be non-negative with a positive sum")
+        self.outcomes = outcomes
+        # Upper bounds of every outcome but the last, which takes the rest
+        self.boundaries = cumulative[:-1]
+        self.total = total
+
+    @classmethod
+    def from_dict(cls, probs, default=None):
+        """Compile a dict mapping outcome to probability.
+
+        Args:
+            probs: Dict of outcome -> probability
+            default: Returned instead of raising when probs is empty or invalid
+
+        Returns:
+            Distribution
+        """
+        try:
+            return cls(probs.keys(), list(probs.values()))
+        except (AttributeError, TypeError, ValueError):
+            if default is None:
+                raise
+            return default
+
+    def sample(self, u):
+        """Map a uniform number in [0, 1) to an outcome."""
+        return self.outcomes[bisect_right(self.boundaries, u * self.total)]
+
+    def probs(self):
+        """Get the normalized probabilities as a dict."""
+        upper = self.boundaries + [self.total]
+        lower = [0.0] + self.boundaries
+        return {outcome: (high - low) / self.total for outcome, low, high in zip(self.outcomes, lower, upper)}
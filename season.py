@@ -1,13 +1,15 @@
-from pybaseball import statcast
 from datetime import datetime, timedelta
 import pandas as pd
 from simulation_info import SimulationInfo
 from game_engine import GameSimulator
 from team import Team  # Import Team class
+from db_manager import DatabaseManager
+from sim_random import SimulationRandom
+from name_resolver import default_resolver
 
 class SeasonSimulator:
     def __init__(self, training_start_dt: str, training_end_dt: str, 
-                 season_start_dt: str, season_end_dt: str):
+                 season_start_dt: str, season_end_dt: str, seed=None, register=None):
         """Initialize the season simulator with separate training and season periods.
         
         Args:
@@ -15,7 +17,13 @@ class SeasonSimulator:
             training_end_dt: End date for training data (format: YYYY-MM-DD)
             season_start_dt: Start date for season data (format: YYYY-MM-DD)
             season_end_dt: End date for season data (format: YYYY-MM-DD)
+            seed: Optional seed making the whole season reproducible
+            register: Optional local player register (.csv or .parquet, see
+                name_resolver.load_register) whose names are loaded into the
+                cache, so names resolve without network access
         """
+        from pybaseball import statcast
+
         # Fetch training data
         self.training_statcast = statcast(start_dt=training_start_dt, end_dt=training_end_dt)
         
@@ -27,6 +35,13 @@ class SeasonSimulator:
         self.training_end = datetime.strptime(training_end_dt, "%Y-%m-%d")
         self.season_start = datetime.strptime(season_start_dt, "%Y-%m-%d")
         self.season_end = datetime.strptime(season_end_dt, "%Y-%m-%d")
+
+        # Buffer cache writes so a season commits profiles in batches rather
+        # than once per player
+        self.db = DatabaseManager(write_behind=True)
+        self.rng = SimulationRandom(seed)
+        if register is not None:
+            default_resolver.use_register(register, self.db)
         
     def get_daily_matchups(self, date: datetime) -> list:
         """Get unique matchups for a specific date from season data.
@@ -56,6 +71,10 @@ class SeasonSimulator:
         schedule = {}
         team_stats = {}  # Track stats for each team
         
+        # Resolve every name the season needs in one batch up front
+        player_ids = pd.concat([self.season_statcast['batter'], self.season_statcast['pitcher']]).dropna().unique()
+        default_resolver.resolve(player_ids, self.db)
+
         print(f"Processing season from {self.season_start.date()} to {self.season_end.date()}")
         print("-" * 50)
         
@@ -86,7 +105,9 @@ class SeasonSimulator:
                             away_roster=away_roster,
                             home_pitcher_id=home_pitcher_id,
                             away_pitcher_id=away_pitcher_id,
-                            stats=self.training_statcast  # Use training data for player probabilities
+                            stats=self.training_statcast,  # Use training data for player probabilities
+                            db=self.db,
+                            rng=self.rng.spawn(1)[0]
                         )
                     except ValueError as e:
                         print(f"Warning: Could not initialize simulation for {away_team} @ {home_team} on {date_str}: {str(e)}")
@@ -139,6 +160,8 @@ class SeasonSimulator:
                 schedule[date_str] = daily_results
             
             current_date += timedelta(days=1)
+
+        self.db.flush()
         
         # Calculate final standings
         standings = []
@@ -1,9 +1,16 @@
 from enum import Enum, auto
 from team import Team
-from pybaseball import *
+from sim_random import SimulationRandom
+from pitch_simulator import PitchSimulator
+from sampling import Distribution
+from event_log import EventLog
+from base_state import PA_RESULTS
 
 class Granularity(Enum):
     PITCH = auto()
+    # One draw per plate appearance from the batter/pitcher pair's solved
+    # count chain, without pitch-by-pitch logs
+    PLATE_APPEARANCE = auto()
 
 class Count:
     def __init__(self):
@@ -21,6 +28,34 @@ class Count:
         self.balls += 1
 
 
+class GameState:
+    """State of one game in progress: inning, half, count and both teams' TeamState.
+
+    The matchup in SimulationInfo stays read-only while a game is played, so
+    replaying it only needs reset().
+    """
+
+    def __init__(self, away, home):
+        """Initialize the state before the first pitch.
+
+        Args:
+            away: TeamState of the away team
+            home: TeamState of the home team
+        """
+        self.away = away
+        self.home = home
+        self.count = Count()
+        self.reset()
+
+    def reset(self):
+        """Return to the state before the first pitch."""
+        self.inning = 1
+        self.top = True
+        self.count.reset()
+        self.away.reset()
+        self.home.reset()
+
+
 # This will hold all the information for the game before starting
 class SimulationInfo:
     def __init__(
@@ -36,7 +71,10 @@ class SimulationInfo:
         backtest=False, 
         granularity: Granularity = Granularity.PITCH,
         pitchSimulator: str = 'basic',
-        logLevel: int = 0
+        logLevel: int = 0,
+        db=None,
+        seed=None,
+        rng: SimulationRandom = None
     ):
         """Initialize simulation info.
         
@@ -50,14 +88,27 @@ class SimulationInfo:
             away_pitcher_id: Optional starting pitcher ID for away team
             stats: Optional Statcast data for both teams
             backtest: Whether this is a backtest simulation
-            granularity: Simulation granularity level
+            granularity: Simulation granularity level. With PLATE_APPEARANCE,
+                every batter/pitcher pair's plate appearance results are
+                solved once here and each plate appearance is a single draw.
             pitchSimulator: Pitch simulator to use
-            logLevel: Log level
+            logLevel: Most detailed level of play-by-play events to record,
+                0 for none: 1 for innings, scoring plays and the result, 2 for
+                every plate appearance and 3 for every pitch
+            db: Optional DatabaseManager the teams read and write cached
+                profiles through
+            seed: Optional seed making the game's random draws reproducible
+            rng: Optional SimulationRandom to draw from, e.g. a stream spawned
+                for this game. Takes precedence over seed.
         """
         # Get statcast data if not provided
         if stats is None:
+            from pybaseball import statcast
             stats = statcast(start_dt="2024-03-29", end_dt=date)
 
+        # Only build the probability tiers the pitch simulator reads up front
+        tiers = PitchSimulator.required_tiers(pitchSimulator)
+
         # Initialize teams (they will extract what they need from stats)
         try:
             self.away_team = Team(
@@ -66,7 +117,9 @@ class SimulationInfo:
                 roster=away_roster,
                 pitcher_id=away_pitcher_id,
                 statcast=stats,
-                backtest=backtest
+                backtest=backtest,
+                db=db,
+                tiers=tiers
             )
         except ValueError as e:
             raise ValueError(f"Failed to initialize away team: {str(e)}")
@@ -78,7 +131,9 @@ class SimulationInfo:
                 roster=home_roster,
                 pitcher_id=home_pitcher_id,
                 statcast=stats,
-                backtest=backtest
+                backtest=backtest,
+                db=db,
+                tiers=tiers
             )
         except ValueError as e:
             raise ValueError(f"Failed to initialize home team: {str(e)}")
@@ -87,10 +142,63 @@ class SimulationInfo:
         self.granularity = granularity
         self.pitchSimulator = pitchSimulator
         self.logLevel = logLevel
-        self._log = ''
-        self.count = Count()
-        self.inning = 1
-        self.top = True
+        self.rng = rng if rng is not None else SimulationRandom(seed)
+        # Play-by-play of the current game, None when nothing is listening
+        self.events = EventLog(logLevel) if logLevel > 0 else None
+        self.state = GameState(self.away_team.state, self.home_team.state)
+
+        # Plate appearance results of each (batter ID, pitcher ID) matchup
+        self._plate_appearances = {}
+        if granularity == Granularity.PLATE_APPEARANCE:
+            self._solve_plate_appearances(self.away_team.roster, self.home_team.pitcher())
+            self._solve_plate_appearances(self.home_team.roster, self.away_team.pitcher())
+
+    def reset(self):
+        """Reset the game state and log to replay the matchup from the first pitch."""
+        self.state.reset()
+        if self.events is not None:
+            self.events.clear()
+
+    @property
+    def count(self):
+        return self.state.count
+
+    @property
+    def inning(self):
+        return self.state.inning
+
+    @inning.setter
+    def inning(self, inning):
+        self.state.inning = inning
+
+    @property
+    def top(self):
+        return self.state.top
+
+    @top.setter
+    def top(self, top):
+        self.state.top = top
+
+    def plate_appearance(self, batter, pitcher):
+        """Get the distribution of a batter's plate appearance results against a pitcher.
+
+        Solved from the pitch simulator's probabilities on first use and
+        cached for the matchup.
+
+        Returns:
+            sampling.Distribution over walk, strikeout and the in-play outcomes
+        """
+        dist = self._plate_appearances.get((batter.id, pitcher.id))
+        if dist is None:
+            self._solve_plate_appearances([batter], pitcher)
+            dist = self._plate_appearances[(batter.id, pitcher.id)]
+        return dist
+
+    def _solve_plate_appearances(self, batters, pitcher):
+        # markov_solver imports this module
+        from markov_solver import plate_appearance_probs
+        for batter, probs in zip(batters, plate_appearance_probs(batters, pitcher, self.pitchSimulator)):
+            self._plate_appearances[(batter.id, pitcher.id)] = Distribution(PA_RESULTS, probs)
 
     def is_home(self, team: Team):
         return team.name == self.home_team.name
@@ -107,6 +215,26 @@ class SimulationInfo:
     def offense(self): return self.away_team if self.top else self.home_team
     def defense(self): return self.home_team if self.top else self.away_team
 
+    def logs(self, logLevel: int):
+        """Whether events of a log level are recorded, so callers can skip building them."""
+        return self.events is not None and logLevel <= self.events.level
+
     def log(self, message: str, logLevel: int = 0):
-        if logLevel <= 0: 
-            self._log += ('\t'*(logLevel-1)) + message + '\n'
\ No newline at end of file
+        """Record a line of text in the play-by-play, if its log level is being recorded."""
+        if self.logs(logLevel):
+            self.events.message(message, logLevel)
+
+    def render_log(self):
+        """Render the play-by-play of the current game.
+
+        Returns:
+            str: Lineups followed by the recorded events, '' without a log
+        """
+        if self.events is None:
+            return ''
+        names = {}
+        for team in (self.away_team, self.home_team):
+            names.update((player.id, player.name) for player in team.roster + [team.pitcher()])
+        return ('Home team: \n' + self.home_team.get_lineup() + '\n'
+                + 'Away team: \n' + self.away_team.get_lineup() + '\n'
+                + self.events.render(names, (self.away_team.name, self.home_team.name)))
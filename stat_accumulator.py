@@ -0,0 +1,81 @@
+import numpy as np
+from base_state import PA_RESULTS
+
+
+class StatAccumulator:
+    """Counts of each player's stats, in an int32 matrix indexed [row, stat code].
+
+    Rows are lineup slots, or any other players, keyed by e.g. MLB ID; stat
+    codes index the stat names, by default base_state.PA_RESULTS. The game
+    loop adds to counts by row and code, combining the counts of games or
+    workers is a single array add, and to_dict() builds the nested dict form
+    only for reporting.
+    """
+
+    def __init__(self, players=(), stats=PA_RESULTS, counts=None):
+        """Initialize the counts.
+
+        Args:
+            players: Key of each row's player, e.g. MLB IDs in lineup order. A
+                player may fill several rows.
+            stats: Name of each stat code
+            counts: Optional initial counts, shaped (players, stats)
+        """
+        self.players = list(players)
+        self.stats = list(stats)
+        self._rows = {}
+        for row, player in enumerate(self.players):
+            self._rows.setdefault(player, row)
+        self._codes = {stat: code for code, stat in enumerate(self.stats)}
+        shape = (len(self.players), len(self.stats))
+        self.counts = np.zeros(shape, dtype=np.int32) if counts is None else np.array(counts, dtype=np.int32).reshape(shape)
+
+    def add(self, row, code):
+        """Count one stat of the player in a row."""
+        self.counts[row, code] += 1
+
+    def record(self, player, stat):
+        """Count one stat by player key and stat name, adding rows and stats never seen before."""
+        row = self._rows.get(player)
+        if row is None:
+            row = self._rows[player] = len(self.players)
+            self.players.append(player)
+            self.counts = np.vstack([self.counts, np.zeros((1, len(self.stats)), dtype=np.int32)])
+        code = self._codes.get(stat)
+        if code is None:
+            code = self._codes[stat] = len(self.stats)
+            self.stats.append(stat)
+            self.counts = np.hstack([self.counts, np.zeros((len(self.players), 1), dtype=np.int32)])
+        self.counts[row, code] += 1
+
+    def clear(self):
+        """Zero every count, keeping the rows and stats."""
+        self.counts.fill(0)
+
+    def empty(self):
+        """A zeroed accumulator with the same rows and stats."""
+        return StatAccumulator(self.players, self.stats)
+
+    def __iadd__(self, other):
+        if self.players != other.players or self.stats != other.stats:
+            raise ValueError("Can only add counts of the same players and stats")
+        self.counts += other.counts
+        return self
+
+    def __add__(self, other):
+        total = StatAccumulator(self.players, self.stats, self.counts)
+        total += other
+        return total
+
+    def __eq__(self, other):
+        return (isinstance(other, StatAccumulator) and self.players == other.players
+                and self.stats == other.stats and np.array_equal(self.counts, other.counts))
+
+    def to_dict(self):
+        """Get the nonzero counts as {player: {stat: count}}, summing the rows a player fills."""
+        stats = {}
+        for row, code in zip(*np.nonzero(self.counts)):
+            player = stats.setdefault(self.players[row], {})
+            stat = self.stats[code]
+            player[stat] = player.get(stat, 0) + int(self.counts[row, code])
+        return stats
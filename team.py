@@ -1,14 +1,43 @@
-from pybaseball import *
 import pandas as pd
 from numpy import random
 import numpy as np
-from pybaseball import *
 from pitcher import Pitcher
 from batter import Batter
+from db_manager import DatabaseManager, training_fingerprint
+from player_registry import default_registry
+from name_resolver import default_resolver
+from profile_builder import build_profiles
+from stat_accumulator import StatAccumulator
+
+
+class TeamState:
+    """In-game state of one team: score, lineup position and stats.
+
+    Kept apart from the Team, whose roster and models don't change during a
+    game, so replaying a matchup only resets this.
+    """
+
+    __slots__ = ('score', 'idx', 'stats')
+
+    def __init__(self, players=()):
+        """Initialize the state before the first pitch.
+
+        Args:
+            players: MLB ID of the batter in each lineup slot, the rows of stats
+        """
+        self.stats = StatAccumulator(players)
+        self.reset()
+
+    def reset(self):
+        """Return to the state before the first pitch."""
+        self.score = 0
+        self.idx = 0
+        self.stats.clear()
 
 
 class Team:
-    def __init__(self, name, date, roster=None, statcast=None, backtest=False, pitcher_id=None):
+    def __init__(self, name, date, roster=None, statcast=None, backtest=False, pitcher_id=None, registry=None, db=None,
+                 tiers=None):
         """Initialize a team with its roster and statistics.
         
         Args:
@@ -18,6 +47,13 @@ class Team:
             statcast: Statcast data for player statistics
             backtest: Whether this is a backtest simulation
             pitcher_id: ID of the starting pitcher. If None, will be predicted or fetched.
+            registry: PlayerRegistry to share player models through. Defaults to
+                the process-wide registry.
+            db: DatabaseManager to read and write cached profiles through.
+                Defaults to the shared manager, DatabaseManager.shared().
+            tiers: Optional dict mapping 'batter' and 'pitcher' to the tiers
+                to build up front, see PitchSimulator.required_tiers().
+                Other tiers are built on first use. Defaults to every tier.
             
         Raises:
             ValueError: If required data is missing or invalid
@@ -34,10 +70,14 @@ class Team:
         self._pitcher_id = pitcher_id  # Store the provided pitcher_id
 
         # Get roster and pitcher if not provided
+        fingerprint = None
         if roster is None:
             if backtest:
                 try:
                     roster, fetched_pitcher_id = Team.get_roster(statcast, name, date)
+                    # Derived from the full frame's memoized per-date digests,
+                    # so the filtered frame isn't hashed again for every team
+                    fingerprint = training_fingerprint(statcast, exclude_date=self.date)
                     statcast = statcast.loc[statcast.game_date != self.date]
                     # Only use fetched pitcher if none was provided
                     if self._pitcher_id is None:
@@ -56,9 +96,13 @@ class Team:
         if not roster:
             raise ValueError(f"No roster available for {name}")
 
-        # Initialize players
+        # Initialize players, sharing models already built from this training window
+        registry = registry if registry is not None else default_registry
+        db = db if db is not None else DatabaseManager.shared()
+        if fingerprint is None:
+            fingerprint = training_fingerprint(statcast)
         try:
-            self.roster = [Batter(id, statcast) for id in roster]
+            self.roster = Team._load_players(roster, Batter, statcast, fingerprint, registry, db, tiers)
         except Exception as e:
             raise ValueError(f"Failed to initialize batters for {name}: {str(e)}")
 
@@ -66,13 +110,86 @@ class Team:
         if not self._pitcher_id:
             raise ValueError(f"No pitcher ID available for {name}")
         try:
-            self._pitcher = Pitcher(self._pitcher_id, statcast)
+            self._pitcher = Team._load_players([self._pitcher_id], Pitcher, statcast, fingerprint, registry, db, tiers)[0]
         except Exception as e:
             raise ValueError(f"Failed to initialize pitcher {self._pitcher_id} for {name}: {str(e)}")
 
-        self.idx = 0
-        self.score = 0
-        self.stats = {}
+        self.state = TeamState([batter.id for batter in self.roster])
+
+    @staticmethod
+    def _load_players(player_ids, cls, statcast, fingerprint, registry, db, tiers=None):
+        """Get shared Batter or Pitcher models for several players.
+
+        Players missing from the registry are built from one batched cache
+        lookup, and names missing from the cache are resolved in one batch.
+        Required tiers missing from the cache are computed together in one
+        pass over statcast and written back in one batch; any other tier is
+        computed, and cached, only if it's used.
+
+        Args:
+            player_ids: MLB IDs of the players, in order
+            cls: Batter or Pitcher
+            statcast: Statcast data the models are trained on
+            fingerprint: Training window of statcast
+            registry: PlayerRegistry sharing models across teams
+            db: DatabaseManager holding the profile cache
+            tiers: Optional dict mapping role to the tiers to build up front
+
+        Returns:
+            list: Models in the order of player_ids
+        """
+        role = cls.__name__.lower()
+        required = tiers[role] if tiers is not None else None
+        players = {int(id): registry.get(id, role, fingerprint) for id in player_ids}
+        missing = [id for id, player in players.items() if player is None]
+
+        if missing:
+            names = default_resolver.resolve(missing, db)
+            profiles = getattr(db, f'get_{role}_profiles')(missing, fingerprint)
+            incomplete = [id for id in missing if not Team._is_cached(profiles.get(id), required)]
+            built = build_profiles(statcast, role, incomplete, required) if incomplete else {}
+            for id in missing:
+                # Keep cached tiers, filling in the rest from the fresh build
+                profile = dict(built.get(id, {}))
+                profile.update({tier: probs for tier, probs in (profiles.get(id) or {}).items() if probs})
+                players[id] = cls(id, statcast, profile=profile, name=names.get(id),
+                                  fingerprint=fingerprint, db=db, tiers=required)
+                registry.put(players[id], role, fingerprint)
+            getattr(db, f'set_{role}_profiles')({id: players[id].profile(required) for id in incomplete}, fingerprint)
+
+        return [players[int(id)] for id in player_ids]
+
+    @staticmethod
+    def _is_cached(profile, tiers=None):
+        """Whether a profile from the cache has every required tier filled in."""
+        if not profile:
+            return False
+        return all(profile.get(tier) for tier in (profile if tiers is None else tiers))
+
+    @property
+    def score(self):
+        return self.state.score
+
+    @score.setter
+    def score(self, score):
+        self.state.score = score
+
+    @property
+    def idx(self):
+        return self.state.idx
+
+    @idx.setter
+    def idx(self, idx):
+        self.state.idx = idx
+
+    @property
+    def stats(self):
+        """This game's stats as {MLB ID: {stat: count}}, see StatAccumulator.to_dict()."""
+        return self.state.stats.to_dict()
+
+    @property
+    def stat_accumulator(self):
+        return self.state.stats
 
     def next_idx(self):
         self.idx += 1
@@ -110,10 +227,7 @@ class Team:
         return [x for x in stats.groupby(['game_date', 'batter'])['at_bat_number'].min().to_frame().reset_index().sort_values('at_bat_number', ignore_index = True)['batter']], pitchers
 
     def get_lineup(self):
-        lineup = ''
-        for i in self.roster:
-            lineup = lineup + i.name + '\n'
-        return lineup
+        return ''.join(batter.name + '\n' for batter in self.roster)
 
     def batter(self):
         return self.roster[self.idx]
@@ -122,12 +236,11 @@ class Team:
         return self._pitcher
 
     def recordStat(self, player, stat):
-        if player not in self.stats:
-            self.stats[player] = {}  # Create first level key if missing
+        """Count one stat of a player by MLB ID and stat name.
 
-        if stat not in self.stats[player]:
-            self.stats[player][stat] = 1  # Initialize if missing
-        else:
-            self.stats[player][stat] += 1
+        The game loop counts by lineup slot and result code instead, see
+        StatAccumulator.add().
+        """
+        self.state.stats.record(player, stat)
 
 
@@ -0,0 +1,61 @@
+"""Fixtures shared by the tests."""
+import numpy as np
+import pandas as pd
+import sys
+from pathlib import Path
+
+# Add parent directory to path to import modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from simulation_info import SimulationInfo
+
+HOME_ROSTER = [111111, 222222]
+AWAY_ROSTER = [333333, 444444]
+HOME_PITCHER, AWAY_PITCHER = 555555, 666666
+
+
+def random_statcast(n=600, batters=(111111, 222222, 333333, 444444), pitchers=(HOME_PITCHER, AWAY_PITCHER),
+                    pitch_types=('FF', 'SL', 'CH'), events=('field_out', 'single', 'double', 'home_run'),
+                    event_probs=None, descriptions=('ball', 'called_strike', 'foul', 'hit_into_play'),
+                    dates=('2024-04-01',), seed=0):
+    """Build statcast-like pitches drawn uniformly at random.
+
+    Args:
+        n: Number of pitches
+        batters, pitchers: MLB IDs to draw from
+        pitch_types, events, descriptions: Values to draw from, which may include None
+        event_probs: Optional probabilities of the events
+        dates: Game dates, splitting the pitches evenly in order
+        seed: Seed of the draws
+
+    Returns:
+        pd.DataFrame: Columns game_date, batter, pitcher, pitch_type, balls,
+            strikes, events and description
+    """
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'game_date': np.repeat(list(dates), n // len(dates)),
+        'batter': rng.choice(list(batters), n),
+        'pitcher': rng.choice(list(pitchers), n),
+        'pitch_type': rng.choice(list(pitch_types), n),
+        'balls': rng.integers(0, 4, n),
+        'strikes': rng.integers(0, 3, n),
+        'events': rng.choice(list(events), n, p=event_probs),
+        'description': rng.choice(list(descriptions), n)
+    })
+
+
+def make_sim_info(statcast, home_roster=HOME_ROSTER, away_roster=AWAY_ROSTER, **kwargs):
+    """Build the HOM vs AWY matchup of random_statcast()'s players.
+
+    Args:
+        statcast: Training data, e.g. from random_statcast()
+        home_roster, away_roster: Batting orders of MLB IDs
+        **kwargs: Other SimulationInfo arguments, e.g. pitchSimulator or seed
+    """
+    return SimulationInfo(
+        home_team='HOM', away_team='AWY', date='2024-04-02',
+        home_roster=list(home_roster), away_roster=list(away_roster),
+        home_pitcher_id=HOME_PITCHER, away_pitcher_id=AWAY_PITCHER,
+        stats=statcast, **kwargs
+    )
@@ -0,0 +1,52 @@
+import unittest
+import sys
+from pathlib import Path
+
+# Add parent directory to path to import modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from base_state import (PA_RESULTS, PA_RESULT_INDEX, NEXT_STATE, RUNS, OUTS, TRANSITIONS,
+                        advance_runners, base_state, narrate)
+
+class TestBaseState(unittest.TestCase):
+    def test_transitions(self):
+        """Test the transition tables against known plays."""
+        walk, single, double, home_run = (PA_RESULT_INDEX[result] for result in ('walk', 'single', 'double', 'home_run'))
+        self.assertEqual((NEXT_STATE[0b011, walk], RUNS[0b011, walk]), (0b111, 0))
+        self.assertEqual((NEXT_STATE[0b101, walk], RUNS[0b101, walk]), (0b111, 0))
+        self.assertEqual((NEXT_STATE[0b110, single], RUNS[0b110, single]), (0b101, 1))
+        self.assertEqual((NEXT_STATE[0b110, double], RUNS[0b110, double]), (0b110, 2))
+        self.assertEqual((NEXT_STATE[0b111, home_run], RUNS[0b111, home_run]), (0, 4))
+        for state in range(8):
+            for code in range(len(PA_RESULTS)):
+                self.assertEqual(TRANSITIONS[state][code], (NEXT_STATE[state, code], RUNS[state, code], OUTS[code]))
+
+    def test_outs_leave_runners(self):
+        """Test that outs neither move runners nor score."""
+        for result in ('strikeout', 'field_out'):
+            code = PA_RESULT_INDEX[result]
+            self.assertEqual(NEXT_STATE[:, code].tolist(), list(range(8)))
+            self.assertFalse(RUNS[:, code].any())
+            self.assertEqual(advance_runners([1, 0, 3], 0b101, code, 9), [1, 0, 3])
+
+    def test_runner_identities(self):
+        """Test that the side array follows the base state through every play."""
+        for state in range(8):
+            runners = [base + 1 if state >> base & 1 else 0 for base in range(3)]
+            for code in range(len(PA_RESULTS)):
+                after = advance_runners(runners, state, code, 9)
+                self.assertEqual(base_state(after), NEXT_STATE[state, code])
+        self.assertEqual(advance_runners([1, 2, 0], 0b011, PA_RESULT_INDEX['walk'], 9), [9, 1, 2])
+        self.assertEqual(advance_runners([1, 0, 3], 0b101, PA_RESULT_INDEX['single'], 9), [9, 1, 0])
+
+    def test_narrate(self):
+        """Test the text of runners advancing and scoring."""
+        names = ('First', 'Second', 'Third')
+        self.assertEqual(narrate(0b111, PA_RESULT_INDEX['walk'], names), 'First and Second advance. Third scores.')
+        self.assertEqual(narrate(0b101, PA_RESULT_INDEX['walk'], names), 'First advances.')
+        self.assertEqual(narrate(0b110, PA_RESULT_INDEX['double'], names), 'Third scores. Second scores.')
+        self.assertEqual(narrate(0b111, PA_RESULT_INDEX['field_out'], names), '')
+        self.assertEqual(narrate(0, PA_RESULT_INDEX['home_run'], names), '')
+
+if __name__ == '__main__':
+    unittest.main()
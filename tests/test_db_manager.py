@@ -1,8 +1,13 @@
 import unittest
 import os
+import json
+import sqlite3
 import tempfile
-from db_manager import DatabaseManager
+import threading
+import pickle
+from db_manager import DatabaseManager, CacheWriter, SCHEMA_VERSION, training_fingerprint
 import numpy as np
+import pandas as pd
 
 class TestDatabaseManager(unittest.TestCase):
     def setUp(self):
@@ -12,8 +17,11 @@ class TestDatabaseManager(unittest.TestCase):
         self.db = DatabaseManager(self.db_path)
         
     def tearDown(self):
-        # Clean up the temporary database
-        os.remove(self.db_path)
+        # Close pooled connections so the WAL files are checkpointed away
+        self.db.close()
+        # Clean up the temporary database, which is only created on first use
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
         os.rmdir(self.temp_dir)
     
     def test_batter_probs_basic_crud(self):
@@ -73,5 +81,289 @@ class TestDatabaseManager(unittest.TestCase):
         stored_probs = self.db.get_batter_probs_basic(999999)
         self.assertIsNone(stored_probs)
 
+    def test_bulk_profiles(self):
+        """Test storing and fetching several players' profiles at once."""
+        batter_profiles = {
+            111111: {
+                'in_play': {'field_out': 0.7, 'single': 0.3},
+                'basic': {'FF': {'ball': 0.5, 'foul': 0.5}},
+                'global': {'ball': 0.5, 'foul': 0.5},
+                'count_based': {'FF': {'0-0': {'ball': 1.0}}},
+            },
+            np.int64(222222): {'in_play': {'field_out': 1.0}, 'global': None},
+        }
+        self.db.set_batter_profiles(batter_profiles)
+
+        stored = self.db.get_batter_profiles([111111, 222222, 333333])
+        self.assertEqual(set(stored), {111111, 222222})
+        self.assertEqual(stored[111111], batter_profiles[111111])
+        self.assertEqual(stored[222222]['in_play'], {'field_out': 1.0})
+        self.assertIsNone(stored[222222]['global'])
+
+        # Bulk and single-player accessors read the same cache
+        self.assertEqual(self.db.get_batter_probs_global(111111), {'ball': 0.5, 'foul': 0.5})
+
+        pitcher_profiles = {
+            444444: {
+                'basic': {'FF': 0.75, 'SL': 0.25},
+                'count_based': {(0, 0): {'FF': 1.0}, (3, 2): {'SL': 1.0}},
+                'in_play': {'field_out': 1.0},
+            }
+        }
+        self.db.set_pitcher_profiles(pitcher_profiles)
+        self.assertEqual(self.db.get_pitcher_profiles([444444]), pitcher_profiles)
+        self.assertEqual(self.db.get_pitcher_count_based_probs(444444), pitcher_profiles[444444]['count_based'])
+
+    def test_bulk_player_names(self):
+        """Test storing and fetching several players' names at once."""
+        self.db.set_player_names({111111: ('Mike', 'Trout'), 222222: ('Shohei', 'Ohtani')})
+
+        names = self.db.get_player_names([111111, 222222, 333333])
+        self.assertEqual(names, {111111: ('Mike', 'Trout'), 222222: ('Shohei', 'Ohtani')})
+        self.assertEqual(self.db.get_player_names([]), {})
+
+    def test_player_profile_point_read(self):
+        """Test loading a player's tiers and name in one read."""
+        self.db.set_batter_profiles({111111: {'global': {'ball': 1.0}}})
+        self.db.set_player_name(111111, 'Mike', 'Trout')
+
+        profile, name = self.db.get_player_profile(111111, 'batter')
+        self.assertEqual(profile['global'], {'ball': 1.0})
+        self.assertIsNone(profile['basic'])
+        self.assertEqual(name, ('Mike', 'Trout'))
+
+        # A profile is per role, a name is per player
+        profile, name = self.db.get_player_profile(111111, 'pitcher')
+        self.assertIsNone(profile)
+        self.assertEqual(name, ('Mike', 'Trout'))
+
+    def test_lazy_schema(self):
+        """Test that the file and schema are created on first use, once per path."""
+        path = os.path.join(self.temp_dir, "lazy.db")
+        db = DatabaseManager(path)
+        try:
+            self.assertFalse(os.path.exists(path))
+            self.assertIsNone(db.get_player_name(111111))
+            self.assertTrue(os.path.exists(path))
+            self.assertTrue(db._pool.schema_ready)
+
+            self.assertIs(DatabaseManager.shared(path), DatabaseManager.shared(path))
+            self.assertEqual(DatabaseManager(path).get_player_name(111111), None)
+        finally:
+            db.close()
+            DatabaseManager._shared.pop(os.path.abspath(path), None)
+            os.remove(path)
+
+    def test_migrate_legacy_tables(self):
+        """Test that a cache file with the old per-tier tables is migrated."""
+        legacy_path = os.path.join(self.temp_dir, "legacy.db")
+        conn = sqlite3.connect(legacy_path)
+        for table, id_column in [('batter_probs_basic', 'batter_id'), ('batter_probs_global', 'batter_id'),
+                                 ('pitcher_count_based_probs', 'pitcher_id')]:
+            conn.execute("CREATE TABLE {} ({} INTEGER PRIMARY KEY, probs_json TEXT NOT NULL)".format(table, id_column))
+        conn.execute("CREATE TABLE player_names (player_id INTEGER PRIMARY KEY, first_name TEXT, last_name TEXT)")
+        conn.execute("INSERT INTO batter_probs_basic VALUES (111111, ?)", (json.dumps({'FF': {'ball': 1.0}}),))
+        conn.execute("INSERT INTO batter_probs_global VALUES (111111, ?)", (json.dumps({'ball': 1.0}),))
+        conn.execute("INSERT INTO pitcher_count_based_probs VALUES (222222, ?)", (json.dumps({'(0, 0)': {'FF': 1.0}}),))
+        conn.execute("INSERT INTO player_names VALUES (111111, 'Mike', 'Trout')")
+        conn.commit()
+        conn.close()
+
+        db = DatabaseManager(legacy_path)
+        try:
+            self.assertEqual(db.get_batter_probs_basic(111111), {'FF': {'ball': 1.0}})
+            self.assertEqual(db.get_batter_probs_global(111111), {'ball': 1.0})
+            self.assertEqual(db.get_pitcher_count_based_probs(222222), {(0, 0): {'FF': 1.0}})
+            self.assertEqual(db.get_player_name(111111), ('Mike', 'Trout'))
+
+            conn = db._connection()
+            self.assertEqual(conn.execute("SELECT version FROM schema_version").fetchone()[0], SCHEMA_VERSION)
+            legacy = conn.execute("SELECT name FROM sqlite_master WHERE name = 'batter_probs_basic'").fetchone()
+            self.assertIsNone(legacy)
+        finally:
+            db.close()
+            os.remove(legacy_path)
+
+    def test_binary_encoding(self):
+        """Test that representable profiles are stored as float32 blobs."""
+        count_based = {(b, s): {'FF': 0.75, 'SL': 0.25} for b in range(4) for s in range(3)}
+        self.db.set_pitcher_count_based_probs(555555, count_based)
+        self.assertEqual(self.db.get_pitcher_count_based_probs(555555), count_based)
+
+        stored = self.db._connection().execute(
+            "SELECT count_based_probs FROM player_profiles WHERE player_id = 555555"
+        ).fetchone()[0]
+        self.assertIsInstance(stored, bytes)
+
+    def test_convert_encoding(self):
+        """Test converting an existing cache between JSON and binary."""
+        json_db = DatabaseManager(self.db_path, encoding='json')
+        global_probs = {'ball': 0.5, 'foul': 0.25, 'hit_into_play': 0.25}
+        json_db.set_batter_probs_global(111111, global_probs)
+
+        conn = self.db._connection()
+        query = "SELECT typeof(global_probs) FROM player_profiles WHERE player_id = 111111"
+        self.assertEqual(conn.execute(query).fetchone()[0], 'text')
+
+        self.assertEqual(self.db.convert_encoding('binary'), 1)
+        self.assertEqual(conn.execute(query).fetchone()[0], 'blob')
+        self.assertEqual(self.db.get_batter_probs_global(111111), global_probs)
+
+        json_db.convert_encoding()
+        self.assertEqual(conn.execute(query).fetchone()[0], 'text')
+        self.assertEqual(json_db.get_batter_probs_global(111111), global_probs)
+
+    def test_training_windows_side_by_side(self):
+        """Test that profiles from different training windows don't collide."""
+        march = pd.DataFrame({'game_date': ['2024-03-01', '2024-03-31'], 'batter': [111111] * 2,
+                              'description': ['ball', 'foul']})
+        april = pd.DataFrame({'game_date': ['2024-04-01', '2024-04-30'], 'batter': [111111] * 2,
+                              'description': ['ball', 'ball']})
+        march_fp = training_fingerprint(march)
+        april_fp = training_fingerprint(april)
+        self.assertNotEqual(march_fp, april_fp)
+        self.assertTrue(march_fp.startswith('2024-03-01:2024-03-31:2:'))
+        self.assertEqual(training_fingerprint(march.copy()), march_fp)
+
+        self.db.set_batter_probs_global(111111, {'ball': 0.5, 'foul': 0.5}, march_fp)
+        self.db.set_batter_probs_global(111111, {'ball': 1.0}, april_fp)
+
+        self.assertEqual(self.db.get_batter_probs_global(111111, march_fp), {'ball': 0.5, 'foul': 0.5})
+        self.assertEqual(self.db.get_batter_probs_global(111111, april_fp), {'ball': 1.0})
+        self.assertIsNone(self.db.get_batter_probs_global(111111))
+        self.assertEqual(self.db.get_fingerprints(), {march_fp: 1, april_fp: 1})
+
+        self.db.clear_fingerprint(march_fp)
+        self.assertIsNone(self.db.get_batter_probs_global(111111, march_fp))
+        self.assertEqual(self.db.get_batter_probs_global(111111, april_fp), {'ball': 1.0})
+
+    def test_fingerprint_row_order(self):
+        """Test that the fingerprint doesn't depend on the order of the rows."""
+        statcast = pd.DataFrame({'game_date': ['2024-04-01', '2024-04-02', '2024-04-03', '2024-04-03'],
+                                 'batter': [111111, 222222, 111111, 333333],
+                                 'description': ['ball', 'foul', 'called_strike', 'ball']})
+        shuffled = statcast.sample(frac=1, random_state=1).reset_index(drop=True)
+        self.assertFalse(shuffled.equals(statcast))
+        self.assertEqual(training_fingerprint(shuffled), training_fingerprint(statcast))
+
+        changed = statcast.copy()
+        changed.loc[0, 'description'] = 'foul'
+        self.assertNotEqual(training_fingerprint(changed), training_fingerprint(statcast))
+
+    def test_fingerprint_exclude_date(self):
+        """Test that leaving out a date matches fingerprinting the filtered frame."""
+        statcast = pd.DataFrame({'game_date': ['2024-04-01', '2024-04-02', '2024-04-03', '2024-04-03'],
+                                 'batter': [111111, 222222, 111111, 333333],
+                                 'description': ['ball', 'foul', 'called_strike', 'ball']})
+        for date in ('2024-04-01', '2024-04-03', '2024-05-01'):
+            self.assertEqual(training_fingerprint(statcast, exclude_date=date),
+                             training_fingerprint(statcast.loc[statcast.game_date != date]))
+        self.assertTrue(training_fingerprint(statcast, exclude_date='2024-04-03').startswith('2024-04-01:2024-04-02:2:'))
+
+    def test_connection_reuse(self):
+        """Test that managers share one long-lived WAL connection per thread."""
+        other = DatabaseManager(self.db_path)
+        self.assertIs(self.db._connection(), other._connection())
+
+        journal_mode = self.db._connection().execute("PRAGMA journal_mode").fetchone()[0]
+        self.assertEqual(journal_mode, 'wal')
+
+    def test_connection_per_thread(self):
+        """Test that each thread gets its own connection."""
+        connections = []
+        thread = threading.Thread(target=lambda: connections.append(self.db._connection()))
+        thread.start()
+        thread.join()
+
+        self.assertIsNot(connections[0], self.db._connection())
+
+    def test_dead_thread_connections_closed(self):
+        """Test that connections of exited threads are reclaimed when another thread connects."""
+        connections = []
+        for _ in range(2):
+            thread = threading.Thread(target=lambda: connections.append(self.db._connection()))
+            thread.start()
+            thread.join()
+        main = self.db._connection()
+
+        for conn in connections:
+            with self.assertRaises(sqlite3.ProgrammingError):
+                conn.execute("SELECT 1")
+        self.assertEqual(main.execute("SELECT 1").fetchone(), (1,))
+        self.assertEqual(len(self.db._pool._connections), 1)
+
+    def test_reset_after_fork(self):
+        """Test that a child process doesn't inherit pool locks held by the parent's threads."""
+        pool = self.db._pool
+        pool.schema_lock.acquire()
+        try:
+            pool._pid = -1  # As seen from a forked child
+            self.assertEqual(self.db._connection().execute("SELECT 1").fetchone(), (1,))
+            self.assertTrue(pool.schema_lock.acquire(blocking=False))
+            pool.schema_lock.release()
+            self.assertTrue(pool._lock.acquire(blocking=False))
+            pool._lock.release()
+        finally:
+            if pool.schema_lock.locked():
+                pool.schema_lock.release()
+
+    def test_write_behind(self):
+        """Test that buffered writes are readable before they reach the database."""
+        buffered = DatabaseManager(self.db_path, write_behind=True, flush_size=100, flush_interval=60)
+        buffered.set_batter_probs_global(111111, {'ball': 0.5, 'foul': 0.5})
+        buffered.set_batter_probs_in_play(111111, {'field_out': 1.0})
+        buffered.set_player_names({111111: ('John', 'Doe')})
+
+        # Visible through the buffering manager only
+        self.assertEqual(buffered.get_batter_probs_global(111111), {'ball': 0.5, 'foul': 0.5})
+        profile, name = buffered.get_player_profile(111111, 'batter')
+        self.assertEqual(profile['in_play'], {'field_out': 1.0})
+        self.assertEqual(name, ('John', 'Doe'))
+        self.assertEqual(buffered.get_batter_profiles([111111])[111111]['global'], {'ball': 0.5, 'foul': 0.5})
+        self.assertEqual(buffered.get_player_names([111111]), {111111: ('John', 'Doe')})
+        self.assertIsNone(self.db.get_batter_probs_global(111111))
+
+        buffered.flush()
+        self.assertEqual(self.db.get_batter_probs_global(111111), {'ball': 0.5, 'foul': 0.5})
+        self.assertEqual(self.db.get_batter_probs_in_play(111111), {'field_out': 1.0})
+        self.assertEqual(self.db.get_player_name(111111), ('John', 'Doe'))
+
+    def test_pickle(self):
+        """Test that a pickled manager reopens the same cache without this process's buffered writes."""
+        self.db.set_batter_probs_global(111111, {'ball': 1.0})
+        buffered = DatabaseManager(self.db_path, write_behind=True, flush_size=100, flush_interval=60)
+        buffered.set_batter_probs_global(222222, {'foul': 1.0})
+
+        copy = pickle.loads(pickle.dumps(buffered))
+        self.assertEqual(copy.db_path, self.db_path)
+        self.assertTrue(copy.write_behind)
+        self.assertEqual(copy.get_batter_probs_global(111111), {'ball': 1.0})
+        self.assertIsNone(copy.get_batter_probs_global(222222))
+        copy.set_batter_probs_global(333333, {'ball': 0.5, 'foul': 0.5})
+        copy.flush()
+        self.assertEqual(self.db.get_batter_probs_global(333333), {'ball': 0.5, 'foul': 0.5})
+        buffered.flush()
+
+    def test_write_behind_flush_size(self):
+        """Test that reaching the flush size writes the buffer in one batch."""
+        buffered = DatabaseManager(self.db_path, write_behind=True, flush_size=3, flush_interval=60)
+        buffered.set_batter_profiles({111111: {'global': {'ball': 1.0}}, 222222: {'global': {'foul': 1.0}}})
+        self.assertEqual(self.db.get_batter_profiles([111111, 222222]), {})
+
+        buffered.set_pitcher_basic_probs(333333, {'FF': 1.0})
+        self.assertEqual(len(self.db.get_batter_profiles([111111, 222222])), 2)
+        self.assertEqual(self.db.get_pitcher_basic_probs(333333), {'FF': 1.0})
+
+    def test_cache_writer(self):
+        """Test that a single writer process applies batches sent by other managers."""
+        with CacheWriter(self.db_path) as writer:
+            worker = DatabaseManager(self.db_path, write_queue=writer.queue)
+            worker.set_batter_probs_global(111111, {'ball': 0.5, 'foul': 0.5})
+            worker.set_player_name(111111, 'John', 'Doe')
+            worker.flush()
+
+        self.assertEqual(self.db.get_batter_probs_global(111111), {'ball': 0.5, 'foul': 0.5})
+        self.assertEqual(self.db.get_player_name(111111), ('John', 'Doe'))
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,94 @@
+import unittest
+import sys
+from pathlib import Path
+
+# Add parent directory to path to import modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from event_log import EventLog
+from game_engine import GameSimulator
+from sim_random import SimulationRandom
+from tests.helpers import random_statcast, make_sim_info
+
+class TestEventLog(unittest.TestCase):
+    def setUp(self):
+        self.statcast = random_statcast()
+
+    def sim_info(self, logLevel):
+        return make_sim_info(self.statcast, pitchSimulator='count', logLevel=logLevel, seed=11)
+
+    def test_columns_grow(self):
+        """Test that events past the preallocated rows keep every earlier event."""
+        events = EventLog(capacity=2)
+        for pitch_num in range(1, 6):
+            events.pitch(1, True, 111111, 555555, pitch_num, 'FF', 'ball', min(pitch_num, 4), 0)
+        events.plate_appearance(1, True, 111111, 555555, 'walk', 0, 0, (0, 0, 0), 0, 0)
+        self.assertEqual(len(events), 6)
+        self.assertEqual(events.columns['pitch_num'][:5].tolist(), [1, 2, 3, 4, 5])
+
+        frame = events.to_frame()
+        self.assertEqual(frame['type'].tolist(), ['pitch'] * 5 + ['plate_appearance'])
+        self.assertEqual(frame['result'].tolist(), ['ball'] * 5 + ['walk'])
+
+        events.clear()
+        self.assertEqual((len(events), events.render()), (0, ''))
+        self.assertFalse(events.columns['pitch_num'].any())
+
+    def test_render(self):
+        """Test the text of a scoring plate appearance."""
+        events = EventLog()
+        events.inning(1, True, 0, 0)
+        events.plate_appearance(1, True, 111111, 555555, 'single', 1, 0b100, (0, 0, 222222), 1, 0)
+        events.game_end(9, 1, 0)
+        text = events.render({111111: 'Batter One', 222222: 'Batter Two'}, ('AWY', 'HOM'))
+        self.assertEqual(text, 'Top 1\n\nBatter One single.\nBatter Two scores.\n0 - 1\n0 - 1\n\nAWY wins 1 to 0\n')
+
+    def test_disabled(self):
+        """Test that a game without a log records nothing."""
+        sim_info = self.sim_info(0)
+        GameSimulator(sim_info).run()
+        self.assertIsNone(sim_info.events)
+        self.assertFalse(sim_info.logs(1))
+        sim_info.log('Rain delay', 1)
+        self.assertEqual(sim_info.render_log(), '')
+
+    def test_messages(self):
+        """Test that log() records free-form lines at the levels being recorded."""
+        sim_info = self.sim_info(1)
+        sim_info.log('Rain delay', 1)
+        sim_info.log('Mound visit', 2)
+        sim_info.log('Anthem')
+        self.assertEqual(list(sim_info.events.to_frame()['type']), ['message', 'message'])
+        self.assertTrue(sim_info.render_log().endswith('\nRain delay\nAnthem\n'))
+
+    def test_game_levels(self):
+        """Test that games record exactly the events of their log level without changing the game."""
+        results = {}
+        for logLevel in (0, 1, 2, 3):
+            sim_info = self.sim_info(logLevel)
+            sim_info.rng = SimulationRandom(4)
+            GameSimulator(sim_info).run()
+            home, away = sim_info.home_team, sim_info.away_team
+            results[logLevel] = (home.score, away.score, home.stats, away.stats)
+            if logLevel == 0:
+                continue
+
+            events = sim_info.events.to_frame()
+            self.assertTrue((events['level'] <= logLevel).all())
+            self.assertEqual((events['type'] == 'pitch').any(), logLevel >= 3)
+            plate_appearances = events[events['type'] == 'plate_appearance']
+            self.assertEqual(plate_appearances['runs'].sum(), home.score + away.score)
+            if logLevel >= 2:
+                self.assertEqual(len(plate_appearances), sum(sum(stats.values()) for team in (home, away)
+                                                             for stats in team.stats.values()))
+            final = events.iloc[-1]
+            self.assertEqual((final['type'], final['home_score'], final['away_score']), ('game_end', home.score, away.score))
+            self.assertIn('{} wins'.format('HOM' if home.score > away.score else 'AWY'), sim_info.render_log())
+
+            sim_info.reset()
+            self.assertEqual(len(sim_info.events), 0)
+        for logLevel in (1, 2, 3):
+            self.assertEqual(results[logLevel], results[0])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import unittest
+import io
+from contextlib import redirect_stdout
+import numpy as np
+import sys
+from pathlib import Path
+
+# Add parent directory to path to import modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from markov_solver import MarkovSolver, pa_distribution, half_inning
+from vector_engine import VectorBootstrapGame, PA_RESULTS
+from player_model import PITCH_EVENTS
+from profile_codec import BALLS, STRIKES
+from tests.helpers import random_statcast, make_sim_info
+
+class TestMarkovSolver(unittest.TestCase):
+    def setUp(self):
+        self.statcast = random_statcast(event_probs=[0.6, 0.25, 0.1, 0.05])
+
+    def sim_info(self, pitchSimulator='basic'):
+        return make_sim_info(self.statcast, away_roster=[333333, 444444, 111111],
+                             pitchSimulator=pitchSimulator, seed=7)
+
+    def events(self, **probs):
+        events = np.zeros((BALLS, STRIKES, len(PITCH_EVENTS)))
+        for event, p in probs.items():
+            events[:, :, PITCH_EVENTS.index(event)] = p
+        return events
+
+    def test_pa_distribution(self):
+        """Test plate appearance results against counts worked out by hand."""
+        hits = np.array([0.5, 0.5, 0, 0, 0])
+        results = dict(zip(PA_RESULTS, pa_distribution(self.events(ball=0.5, in_play=0.5), hits)))
+        self.assertAlmostEqual(results['walk'], 0.5 ** 4)
+        self.assertAlmostEqual(results['field_out'], (1 - 0.5 ** 4) / 2)
+        self.assertAlmostEqual(results['strikeout'], 0)
+
+        # Fouls with two strikes and other pitches leave the count alone
+        results = dict(zip(PA_RESULTS, pa_distribution(self.events(strike=0.25, foul=0.5, other=0.25), hits)))
+        self.assertAlmostEqual(results['strikeout'], 1)
+
+        batch = pa_distribution(np.stack([self.events(ball=1)] * 3), np.stack([hits] * 3))
+        self.assertEqual(batch.shape, (3, len(PA_RESULTS)))
+        np.testing.assert_allclose(batch[:, PA_RESULTS.index('walk')], 1)
+
+    def test_half_inning(self):
+        """Test half inning tables for lineups of strikeouts and home runs."""
+        pa = np.zeros((4, len(PA_RESULTS)))
+        pa[:, PA_RESULTS.index('strikeout')] = 0.5
+        pa[:, PA_RESULTS.index('home_run')] = 0.5
+        ended, walk_off = half_inning(pa)
+
+        # Three strikeouts end the inning with the fourth batter up next
+        self.assertAlmostEqual(ended[0, 0, 3], 0.5 ** 3)
+        self.assertAlmostEqual(ended.sum(), 4, places=9)
+        expected_runs = (ended.sum(axis=(0, 2)) / 4) @ np.arange(ended.shape[1])
+        self.assertAlmostEqual(expected_runs, 3, places=6)
+
+        # Tied in the bottom of the ninth, the first home run ends the game
+        self.assertAlmostEqual(walk_off[0, 0, 0].sum(), 0.5 ** 3)
+        self.assertAlmostEqual(walk_off[0, 0, 1].sum(), 1 - 0.5 ** 3)
+        self.assertAlmostEqual(walk_off[0, 0, 2:].sum(), 0)
+
+    def test_matches_vector_engine(self):
+        """Test that the exact distributions agree with sampled games."""
+        for pitchSimulator in ('basic', 'count'):
+            sim_info = self.sim_info(pitchSimulator)
+            with redirect_stdout(io.StringIO()) as output:
+                solved = MarkovSolver(sim_info).run()
+            self.assertIn('HOM wins with probability', output.getvalue())
+            self.assertAlmostEqual(solved['scores'].sum(), 1, places=8)
+            self.assertAlmostEqual(np.trace(solved['scores']), 0)
+            self.assertAlmostEqual(solved['home_win_prob'] + solved['away_win_prob'], 1, places=8)
+
+            games = 100000
+            sampled = VectorBootstrapGame(sim_info).simulate(games)
+            self.assertAlmostEqual(sampled['home_wins'] / games, solved['home_win_prob'], delta=4 * 0.5 / np.sqrt(games))
+            for team in ('home', 'away'):
+                scores = sampled[f'{team}_scores']
+                self.assertAlmostEqual(scores.mean(), solved[f'expected_{team}_runs'],
+                                       delta=4 * scores.std() / np.sqrt(games))
+                shutouts = solved[f'{team}_runs'][0]
+                self.assertAlmostEqual(np.mean(scores == 0), shutouts,
+                                       delta=4 * np.sqrt(shutouts * (1 - shutouts) / games))
+
+if __name__ == '__main__':
+    unittest.main()
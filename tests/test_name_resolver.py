@@ -0,0 +1,121 @@
+import unittest
+import io
+import os
+import shutil
+import tempfile
+from contextlib import redirect_stdout
+import pandas as pd
+import sys
+from pathlib import Path
+
+# Add parent directory to path to import modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+import name_resolver
+from db_manager import DatabaseManager
+from name_resolver import NameResolver, UNKNOWN_PLAYER, display_name, load_register
+
+
+class CountingResolver(NameResolver):
+    """Resolver answering online lookups from a dict and recording each batch."""
+
+    def __init__(self, online_names, fail=False, **kwargs):
+        super().__init__(**kwargs)
+        self.online_names = online_names
+        self.fail = fail
+        self.batches = []
+
+    def _lookup(self, player_ids):
+        self.batches.append(sorted(player_ids))
+        if self.fail:
+            self.online = False
+            return {}
+        return {id: self.online_names[id] for id in player_ids if id in self.online_names}
+
+
+class TestNameResolver(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db = DatabaseManager(os.path.join(self.temp_dir, "test_baseball_stats.db"))
+        self.register = pd.DataFrame({
+            'key_mlbam': [545361, 660271, None, -1],
+            'name_first': ['Mike', 'Shohei', 'Nobody', 'Minor'],
+            'name_last': ['Trout', 'Ohtani', 'Atall', 'Leaguer'],
+            'key_fangraphs': [10155, 19755, 1, 2]
+        })
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.temp_dir)
+
+    def test_load_register(self):
+        """Test reading names from CSV and Parquet registers, skipping rows without an MLB ID."""
+        expected = {545361: ('Mike', 'Trout'), 660271: ('Shohei', 'Ohtani')}
+        csv_path = os.path.join(self.temp_dir, "register.csv")
+        self.register.to_csv(csv_path, index=False)
+        self.assertEqual(load_register(csv_path), expected)
+
+        try:
+            parquet_path = os.path.join(self.temp_dir, "register.parquet")
+            self.register.to_parquet(parquet_path)
+        except ImportError:
+            return
+        self.assertEqual(load_register(parquet_path), expected)
+
+    def test_resolve_batches_lookups(self):
+        """Test that missing names are looked up once, in one batch, and cached."""
+        self.db.set_player_name(1, 'Cached', 'Player')
+        resolver = CountingResolver({2: ('Online', 'One'), 3: ('Online', 'Two')})
+
+        names = resolver.resolve([1, 2, 3, 4], self.db)
+        self.assertEqual(names, {1: ('Cached', 'Player'), 2: ('Online', 'One'), 3: ('Online', 'Two')})
+        self.assertEqual(resolver.batches, [[2, 3, 4]])
+        self.assertEqual(self.db.get_player_name(3), ('Online', 'Two'))
+
+        # Found names come from the cache and unknown players aren't retried
+        resolver.resolve([1, 2, 3, 4], self.db)
+        self.assertEqual(resolver.batches, [[2, 3, 4]])
+
+    def test_register_is_offline_source(self):
+        """Test that register names are bulk-loaded and used without going online."""
+        path = os.path.join(self.temp_dir, "register.csv")
+        self.register.to_csv(path, index=False)
+        resolver = CountingResolver({}, online=False)
+
+        self.assertEqual(resolver.use_register(path, self.db), 2)
+        self.assertEqual(self.db.get_player_name(660271), ('Shohei', 'Ohtani'))
+        self.assertEqual(resolver.resolve([545361, 999999], self.db), {545361: ('Mike', 'Trout')})
+        self.assertEqual(resolver.batches, [])
+
+    def test_failed_lookup_goes_offline(self):
+        """Test that a failed online lookup leaves players unnamed instead of retrying."""
+        resolver = CountingResolver({}, fail=True)
+        self.assertEqual(resolver.resolve([1, 2], self.db), {})
+        self.assertFalse(resolver.online)
+        resolver.clear()
+        resolver.resolve([1, 2, 3], self.db)
+        self.assertEqual(len(resolver.batches), 1)
+
+    def test_lookup_error_is_caught(self):
+        """Test that the default lookup turns errors into an offline resolver."""
+        resolver = NameResolver()
+        original = name_resolver.lookup_names
+
+        def unavailable(player_ids):
+            raise ConnectionError("no network")
+
+        name_resolver.lookup_names = unavailable
+        try:
+            with redirect_stdout(io.StringIO()):
+                self.assertEqual(resolver.resolve([1], self.db), {})
+        finally:
+            name_resolver.lookup_names = original
+        self.assertFalse(resolver.online)
+
+    def test_display_name(self):
+        """Test formatting resolved and unresolved names."""
+        self.assertEqual(display_name(('Mike', 'Trout')), "Mike Trout")
+        self.assertEqual(display_name(None), UNKNOWN_PLAYER)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+import numpy as np
+import sys
+from pathlib import Path
+
+# Add parent directory to path to import modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from player_model import BatterModel, PitcherModel, PITCH_EVENTS, BALL, STRIKE, FOUL, IN_PLAY, OTHER
+from profile_codec import PITCH_TYPE_INDEX
+
+FF = PITCH_TYPE_INDEX['FF']
+SL = PITCH_TYPE_INDEX['SL']
+CH = PITCH_TYPE_INDEX['CH']
+
+class TestBatterModel(unittest.TestCase):
+    def setUp(self):
+        self.model = BatterModel.from_profile(123456, {
+            'in_play': {'field_out': 0.5, 'single': 0.5, 'double': 0.0, 'triple': 0.0, 'home_run': 0.0},
+            'global': {'ball': 0.5, 'hit_into_play': 0.5},
+            'basic': {'FF': {'ball': 0.25, 'called_strike': 0.25, 'swinging_strike': 0.25, 'blocked_ball': 0.25}},
+            'count_based': {'FF': {'3-2': {'foul': 1.0}}},
+        })
+
+    def test_events(self):
+        """Test that outcomes are grouped the way the game engine treats them."""
+        np.testing.assert_allclose(self.model.event_probs(FF), [0.25, 0.5, 0, 0, 0.25])
+        np.testing.assert_allclose(self.model.event_probs(FF, 3, 2), [0, 0, 1, 0, 0])
+        self.assertEqual(PITCH_EVENTS[OTHER], 'other')
+
+    def test_fallbacks(self):
+        """Test that missing counts and pitch types are resolved at build time."""
+        # Count without data falls back to the pitch type, then to the global probabilities
+        np.testing.assert_allclose(self.model.event_probs(FF, 0, 0), self.model.event_probs(FF))
+        np.testing.assert_allclose(self.model.event_probs(SL, 1, 1), [0.5, 0, 0, 0.5, 0])
+        np.testing.assert_allclose(self.model.hits, [0.5, 0.5, 0, 0, 0])
+
+    def test_league_average(self):
+        """Test that a batter without data gets the league averages."""
+        model = BatterModel.from_profile(999999, {})
+        self.assertAlmostEqual(float(model.event_probs(CH, 2, 1).sum()), 1.0, places=6)
+        self.assertAlmostEqual(float(model.event_probs(CH, 2, 1)[BALL]), 0.35, places=6)
+        self.assertAlmostEqual(float(model.hits[0]), 0.69, places=6)
+
+    def test_compact(self):
+        """Test that models are slotted and small."""
+        self.assertFalse(hasattr(self.model, '__dict__'))
+        self.assertEqual(self.model.count_events.dtype, np.float32)
+        self.assertLess(self.model.nbytes, 8 * 1024)
+
+class TestPitcherModel(unittest.TestCase):
+    def test_pitch_probs(self):
+        """Test count lookups and their fallback to basic probabilities."""
+        count_based = {(b, s): {} for b in range(4) for s in range(3)}
+        count_based[(0, 0)] = {'FF': 1.0}
+        model = PitcherModel.from_profile(654321, {'basic': {'FF': 0.5, 'SL': 0.5}, 'count_based': count_based})
+
+        self.assertEqual(model.pitch_probs(0, 0)[FF], 1.0)
+        np.testing.assert_allclose(model.pitch_probs(3, 2), model.pitch_probs())
+        np.testing.assert_allclose(model.pitch_probs(4, 3), model.basic_pitches)
+        self.assertEqual(model.basic_pitches[SL], 0.5)
+        self.assertFalse(hasattr(model, '__dict__'))
+
+    def test_league_average(self):
+        """Test that a pitcher without data gets the league average."""
+        model = PitcherModel.from_profile(999999, {})
+        self.assertAlmostEqual(float(model.pitch_probs(1, 1)[FF]), 0.35, places=6)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+import sys
+from pathlib import Path
+
+# Add parent directory to path to import modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from player_registry import PlayerRegistry
+
+class _Model:
+    def __init__(self, id):
+        self.id = id
+
+class TestPlayerRegistry(unittest.TestCase):
+    def setUp(self):
+        self.registry = PlayerRegistry(maxsize=2)
+
+    def test_hit_and_miss(self):
+        """Test that registered models are shared and lookups are counted"""
+        self.assertIsNone(self.registry.get(1, 'batter', 'fp'))
+
+        model = _Model(1)
+        self.registry.put(model, 'batter', 'fp')
+        self.assertIs(self.registry.get(1, 'batter', 'fp'), model)
+
+        # Role and training window are part of the key
+        self.assertIsNone(self.registry.get(1, 'pitcher', 'fp'))
+        self.assertIsNone(self.registry.get(1, 'batter', 'other'))
+
+        stats = self.registry.stats()
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 3)
+        self.assertEqual(stats['size'], 1)
+
+    def test_lru_eviction(self):
+        """Test that the least recently used model is evicted first"""
+        for id in (1, 2):
+            self.registry.put(_Model(id), 'batter', 'fp')
+        self.registry.get(1, 'batter', 'fp')  # 2 is now least recently used
+        self.registry.put(_Model(3), 'batter', 'fp')
+
+        self.assertIn((1, 'batter', 'fp'), self.registry)
+        self.assertNotIn((2, 'batter', 'fp'), self.registry)
+        self.assertIn((3, 'batter', 'fp'), self.registry)
+        self.assertEqual(self.registry.stats()['evictions'], 1)
+
+        self.registry.resize(1)
+        self.assertEqual(len(self.registry), 1)
+        self.assertIn((3, 'batter', 'fp'), self.registry)
+
+    def test_clear(self):
+        """Test clearing models and counters"""
+        self.registry.put(_Model(1), 'batter', 'fp')
+        self.registry.get(1, 'batter', 'fp')
+        self.registry.clear()
+
+        self.assertEqual(self.registry.stats(), {'hits': 0, 'misses': 0, 'evictions': 0, 'size': 0, 'maxsize': 2})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+import os
+import tempfile
+import sys
+from pathlib import Path
+
+# Add parent directory to path to import modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from batter import Batter
+from pitcher import Pitcher
+from db_manager import DatabaseManager
+from profile_builder import build_batter_profiles, build_pitcher_profiles, warm_profiles
+from tests.helpers import random_statcast
+
+class TestProfileBuilder(unittest.TestCase):
+    def setUp(self):
+        # Random pitches for a handful of batters and pitchers, with gaps
+        self.statcast = random_statcast(
+            2000, batters=range(1, 6), pitchers=range(10, 14), pitch_types=['FF', 'SL', 'CH', None],
+            events=['field_out', 'single', 'double', 'fielders_choice', 'sac_fly', 'strikeout', None]
+        )
+        # Pitcher 13 never throws in a full count
+        self.statcast = self.statcast.loc[~((self.statcast.pitcher == 13) & (self.statcast.balls == 3) &
+                                            (self.statcast.strikes == 2))]
+
+    def assertProfilesAlmostEqual(self, first, second, places=9):
+        if isinstance(first, dict):
+            self.assertEqual(set(first), set(second))
+            for key in first:
+                self.assertProfilesAlmostEqual(first[key], second[key], places)
+        else:
+            self.assertAlmostEqual(first, second, places=places)
+
+    def test_batter_profiles_match_batter(self):
+        """Test that bulk batter profiles match those computed one batter at a time."""
+        profiles = build_batter_profiles(self.statcast, [1, 2, 3, 4, 5, 99])
+        for id, profile in profiles.items():
+            batter = Batter(id, self.statcast, profile={}, name=('John', 'Doe'), store=False, fingerprint='')
+            self.assertProfilesAlmostEqual(profile, batter.profile())
+
+    def test_pitcher_profiles_match_pitcher(self):
+        """Test that bulk pitcher profiles match those computed one pitcher at a time."""
+        profiles = build_pitcher_profiles(self.statcast, [10, 11, 12, 13, 99])
+        for id, profile in profiles.items():
+            pitcher = Pitcher(id, self.statcast, profile={}, name=('John', 'Doe'), store=False, fingerprint='')
+            self.assertProfilesAlmostEqual(profile, pitcher.profile())
+
+    def test_all_players_by_default(self):
+        """Test that every player in the frame is built when no IDs are given."""
+        self.assertEqual(set(build_batter_profiles(self.statcast)), {1, 2, 3, 4, 5})
+        self.assertEqual(set(build_pitcher_profiles(self.statcast)), {10, 11, 12, 13})
+
+    def test_warm_profiles(self):
+        """Test that built profiles are bulk-loaded into the cache."""
+        temp_dir = tempfile.mkdtemp()
+        db = DatabaseManager(os.path.join(temp_dir, "test_baseball_stats.db"))
+        try:
+            self.assertEqual(warm_profiles(self.statcast, db, fingerprint='test'), (5, 4))
+            self.assertEqual(len(db.get_batter_profiles([1, 2, 3, 4, 5], 'test')), 5)
+            # Stored as float32 blobs
+            cached = db.get_pitcher_profiles([10], 'test')[10]
+            self.assertProfilesAlmostEqual(cached['in_play'], build_pitcher_profiles(self.statcast, [10])[10]['in_play'],
+                                           places=6)
+        finally:
+            db.close()
+            for name in os.listdir(temp_dir):
+                os.remove(os.path.join(temp_dir, name))
+            os.rmdir(temp_dir)
+
+if __name__ == '__main__':
+    unittest.main()
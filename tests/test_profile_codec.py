@@ -0,0 +1,82 @@
+import unittest
+import numpy as np
+import sys
+from pathlib import Path
+
+# Add parent directory to path to import modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+import profile_codec
+from profile_codec import PITCH_TYPES, PITCH_OUTCOMES, TIER_SHAPES
+
+class TestProfileCodec(unittest.TestCase):
+    def setUp(self):
+        self.count_based = {
+            'FF': {'0-0': {'ball': 0.5, 'called_strike': 0.5}, '3-2': {'foul': 1.0}},
+            'SL': {'1-2': {'swinging_strike': 0.25, 'hit_into_play': 0.75}},
+        }
+
+    def test_round_trip(self):
+        """Test that every tier survives an encode/decode round trip."""
+        profiles = {
+            ('batter', 'global'): {'ball': 0.35, 'called_strike': 0.4, 'hit_into_play': 0.25},
+            ('batter', 'basic'): {'FF': {'ball': 0.6, 'foul': 0.4}, 'CH': {'hit_into_play': 1.0}},
+            ('batter', 'count_based'): self.count_based,
+            ('batter', 'in_play'): {'field_out': 0.7, 'single': 0.2, 'double': 0.1, 'triple': 0.0, 'home_run': 0.0},
+            ('pitcher', 'basic'): {'FF': 0.5, 'SL': 0.3, 'CH': 0.2},
+            ('pitcher', 'count_based'): {(b, s): {'FF': 0.5, 'SL': 0.5} for b in range(4) for s in range(3)},
+        }
+        for (role, tier), probs in profiles.items():
+            blob = profile_codec.encode(role, tier, probs)
+            self.assertIsInstance(blob, bytes, msg=tier)
+            decoded = profile_codec.decode(role, tier, blob)
+            self.assertEqual(_keys(decoded), _keys(probs), msg=tier)
+            np.testing.assert_allclose(_values(decoded), _values(probs), rtol=1e-6)
+
+    def test_decode_array(self):
+        """Test decoding straight into the dense float32 layout."""
+        blob = profile_codec.encode('batter', 'count_based', self.count_based)
+        dense = profile_codec.decode_array('batter', 'count_based', blob)
+
+        self.assertEqual(dense.shape, TIER_SHAPES[('batter', 'count_based')])
+        self.assertEqual(dense.dtype, np.float32)
+        ff, sl = PITCH_TYPES.index('FF'), PITCH_TYPES.index('SL')
+        self.assertEqual(dense[ff, 3, 2, PITCH_OUTCOMES.index('foul')], 1.0)
+        self.assertEqual(dense[sl, 1, 2, PITCH_OUTCOMES.index('hit_into_play')], 0.75)
+        self.assertEqual(dense.sum(), 3.0)
+
+        # Only the two pitch types present are stored
+        self.assertEqual(len(blob), profile_codec.MASK_BYTES + 2 * 4 * 3 * len(PITCH_OUTCOMES) * 4)
+
+    def test_unrepresentable_falls_back(self):
+        """Test that dicts outside the vocabularies are not encoded."""
+        self.assertIsNone(profile_codec.encode('batter', 'global', {'mystery_outcome': 1.0}))
+        self.assertIsNone(profile_codec.encode('batter', 'global', {'ball': 1.0, 'foul': 0.0}))
+        self.assertIsNone(profile_codec.encode('batter', 'basic', {'ball': 0.5, 'foul': 0.5}))
+        self.assertIsNone(profile_codec.encode('batter', 'count_based', {'FF': {'1.0-2.0': {'ball': 1.0}}}))
+        self.assertIsNone(profile_codec.encode('pitcher', 'count_based', {(0, 0): {'FF': 1.0}}))
+        self.assertIsNone(profile_codec.encode('batter', 'in_play', {'field_out': 1.0}))
+
+    def test_to_array_drops_unknown_keys(self):
+        """Test the lenient dict to array conversion used for dense models."""
+        dense = profile_codec.to_array('pitcher', 'basic', {'FF': 0.5, 'XX': 0.5})
+        self.assertEqual(dense[PITCH_TYPES.index('FF')], 0.5)
+        self.assertEqual(dense.sum(), 0.5)
+
+
+def _keys(probs):
+    """Flatten nested dict keys for comparison."""
+    return sorted(
+        (str(k),) + sub for k, v in probs.items()
+        for sub in (_keys(v) if isinstance(v, dict) else [()])
+    )
+
+
+def _values(probs):
+    return [v for _, v in sorted(
+        (str(k), x) for k, v in probs.items()
+        for x in (_values(v) if isinstance(v, dict) else [v])
+    )]
+
+if __name__ == '__main__':
+    unittest.main()
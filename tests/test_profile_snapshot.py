@@ -0,0 +1,83 @@
+import unittest
+import os
+import shutil
+import tempfile
+import numpy as np
+import sys
+from pathlib import Path
+
+# Add parent directory to path to import modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from db_manager import DatabaseManager
+from profile_snapshot import ProfileSnapshot, write_snapshot
+
+class TestProfileSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, "test_baseball_stats.db")
+        self.snapshot_path = os.path.join(self.temp_dir, "profiles.snap")
+        self.db = DatabaseManager(self.db_path)
+
+        self.batter = {
+            'in_play': {'field_out': 0.5, 'single': 0.25, 'double': 0.125, 'triple': 0.0, 'home_run': 0.125},
+            'basic': {'FF': {'ball': 0.5, 'foul': 0.5}},
+            'global': {'ball': 0.75, 'hit_into_play': 0.25},
+            'count_based': {'SL': {'3-2': {'foul': 1.0}}},
+        }
+        self.pitcher = {
+            'basic': {'FF': 0.75, 'SL': 0.25},
+            'count_based': {(b, s): {'FF': 1.0} for b in range(4) for s in range(3)},
+            'in_play': None,
+        }
+        self.db.set_batter_profiles({111111: self.batter}, 'window')
+        self.db.set_pitcher_profiles({222222: self.pitcher}, 'window')
+        self.db.set_player_names({111111: ('John', 'Doe'), 222222: ('Jane', 'Roe')})
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.temp_dir)
+
+    def test_export_and_open(self):
+        """Test that an exported snapshot holds every profile and name of its window."""
+        self.assertEqual(self.db.export_snapshot(self.snapshot_path, 'window'), 2)
+
+        snapshot = ProfileSnapshot(self.snapshot_path)
+        self.assertEqual(snapshot.fingerprint, 'window')
+        self.assertEqual(snapshot.get_profile(111111, 'batter'), self.batter)
+        self.assertEqual(snapshot.get_profile(222222, 'pitcher'), self.pitcher)
+        self.assertIsNone(snapshot.get_profile(111111, 'pitcher'))
+        self.assertEqual(snapshot.get_player_name(222222), ('Jane', 'Roe'))
+
+        # Tiers are read-only views into the mapped file
+        dense = snapshot.get_array(111111, 'batter', 'global')
+        self.assertIsInstance(dense.base, np.memmap)
+        self.assertFalse(dense.flags.writeable)
+
+    def test_empty_snapshot(self):
+        """Test that a snapshot without players can be opened."""
+        write_snapshot(self.snapshot_path, 'empty', {})
+        snapshot = ProfileSnapshot(self.snapshot_path)
+        self.assertEqual(len(snapshot.player_ids('batter')), 0)
+        self.assertNotIn((111111, 'batter'), snapshot)
+
+    def test_database_reads_from_snapshot(self):
+        """Test that a manager with a snapshot serves reads from it, falling back to SQLite."""
+        self.db.export_snapshot(self.snapshot_path, 'window')
+        self.db.set_batter_profiles({333333: self.batter}, 'window')
+
+        db = DatabaseManager(self.db_path, snapshot=self.snapshot_path)
+        self.db.clear_fingerprint('window')
+        self.db.set_batter_profiles({333333: self.batter}, 'window')
+
+        self.assertEqual(db.get_batter_profiles([111111, 333333], 'window'),
+                         {111111: self.batter, 333333: self.batter})
+        self.assertEqual(db.get_player_profile(222222, 'pitcher', 'window'), (self.pitcher, ('Jane', 'Roe')))
+        self.assertEqual(db.get_batter_probs_global(111111, 'window'), self.batter['global'])
+        self.assertEqual(db.get_player_names([111111]), {111111: ('John', 'Doe')})
+
+        # Other training windows still come from SQLite
+        self.assertEqual(db.get_batter_profiles([111111], 'other'), {})
+
+if __name__ == '__main__':
+    unittest.main()
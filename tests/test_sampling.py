@@ -0,0 +1,44 @@
+import unittest
+import sys
+from pathlib import Path
+
+# Add parent directory to path to import modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from sampling import Distribution
+
+class TestDistribution(unittest.TestCase):
+    def test_sample(self):
+        """Test that uniforms map to outcomes by cumulative probability."""
+        dist = Distribution(['a', 'b', 'c'], [0.25, 0.5, 0.25])
+        self.assertEqual(dist.sample(0.0), 'a')
+        self.assertEqual(dist.sample(0.24), 'a')
+        self.assertEqual(dist.sample(0.25), 'b')
+        self.assertEqual(dist.sample(0.74), 'b')
+        self.assertEqual(dist.sample(0.75), 'c')
+        self.assertEqual(dist.sample(0.9999999999999999), 'c')
+
+    def test_zero_probabilities_never_drawn(self):
+        """Test that outcomes with zero probability are skipped, even at the ends."""
+        dist = Distribution(['a', 'b', 'c', 'd'], [0.0, 0.5, 0.0, 0.0])
+        for u in (0.0, 0.3, 0.5, 0.9999999999999999):
+            self.assertEqual(dist.sample(u), 'b')
+
+    def test_unnormalized(self):
+        """Test that weights are normalized."""
+        dist = Distribution.from_dict({'a': 1, 'b': 3})
+        self.assertEqual(dist.probs(), {'a': 0.25, 'b': 0.75})
+        self.assertEqual(dist.sample(0.2), 'a')
+
+    def test_invalid(self):
+        """Test that empty or invalid probabilities fall back to the default."""
+        default = Distribution(['x'], [1.0])
+        self.assertIs(Distribution.from_dict({}, default), default)
+        self.assertIs(Distribution.from_dict({'a': 0.0}, default), default)
+        self.assertIs(Distribution.from_dict({'a': float('nan')}, default), default)
+        self.assertIs(Distribution.from_dict({'a': -1.0, 'b': 2.0}, default), default)
+        with self.assertRaises(ValueError):
+            Distribution.from_dict({})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import unittest
+import numpy as np
+import sys
+from pathlib import Path
+
+# Add parent directory to path to import modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from sim_random import SimulationRandom
+from game_engine import GameSimulator
+from tests.helpers import random_statcast, make_sim_info
+
+class TestSimulationRandom(unittest.TestCase):
+    def test_reproducible(self):
+        """Test that equal seeds give identical streams regardless of block size."""
+        first = SimulationRandom(42, block_size=7)
+        second = SimulationRandom(42)
+        self.assertEqual([first.random() for _ in range(50)], [second.random() for _ in range(50)])
+        self.assertNotEqual(SimulationRandom(43).random(), SimulationRandom(42).random())
+
+    def test_matches_generator(self):
+        """Test that buffered draws are exactly the generator's uniforms."""
+        expected = np.random.Generator(np.random.PCG64(np.random.SeedSequence(42))).random(10)
+        rng = SimulationRandom(42, block_size=4)
+        self.assertEqual([rng.random() for _ in range(3)], expected[:3].tolist())
+        np.testing.assert_array_equal(rng.uniforms(5), expected[3:8])
+        self.assertEqual(rng.random(), expected[8])
+
+    def test_spawn(self):
+        """Test that spawned streams are reproducible and independent."""
+        children = SimulationRandom(42).spawn(2)
+        again = SimulationRandom(42).spawn(2)
+        self.assertEqual(children[0].random(), again[0].random())
+        self.assertNotEqual(children[0].random(), children[1].random())
+
+class TestSeededGame(unittest.TestCase):
+    def setUp(self):
+        self.statcast = random_statcast()
+
+    def play(self, seed):
+        sim_info = make_sim_info(self.statcast, pitchSimulator='count', seed=seed)
+        GameSimulator(sim_info).run()
+        return (sim_info.home_team.score, sim_info.away_team.score,
+                sim_info.home_team.stats, sim_info.away_team.stats)
+
+    def test_seeded_game_reproducible(self):
+        """Test that a seeded game replays exactly."""
+        self.assertEqual(self.play(2024), self.play(2024))
+
+if __name__ == '__main__':
+    unittest.main()
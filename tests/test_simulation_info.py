@@ -0,0 +1,125 @@
+import unittest
+import io
+from contextlib import redirect_stdout
+import numpy as np
+import sys
+from pathlib import Path
+
+# Add parent directory to path to import modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from simulation_info import Granularity
+from game_engine import BootstrapGame, GameSimulator
+from markov_solver import MarkovSolver, plate_appearance_probs
+from sim_random import SimulationRandom
+from pitch_simulator import PitchSimulator
+from tests.helpers import random_statcast, make_sim_info
+
+class TestSimulationInfo(unittest.TestCase):
+    def setUp(self):
+        self.statcast = random_statcast()
+        self.sim_info = make_sim_info(self.statcast, seed=11)
+
+    def result(self):
+        return (self.sim_info.home_team.score, self.sim_info.away_team.score,
+                self.sim_info.home_team.stats, self.sim_info.away_team.stats)
+
+    def test_reset(self):
+        """Test that reset returns every piece of game state to the first pitch."""
+        GameSimulator(self.sim_info).run()
+        self.assertGreater(self.sim_info.inning, 9)
+        self.sim_info.reset()
+
+        self.assertEqual((self.sim_info.inning, self.sim_info.top), (1, True))
+        self.assertEqual((self.sim_info.count.balls, self.sim_info.count.strikes), (0, 0))
+        for team in (self.sim_info.home_team, self.sim_info.away_team):
+            self.assertEqual((team.score, team.idx, team.stats), (0, 0, {}))
+
+    def test_replay_matches_fresh_game(self):
+        """Test that a reset game replays exactly like one on a fresh matchup."""
+        self.sim_info.rng = SimulationRandom(5)
+        GameSimulator(self.sim_info).run()
+        first = self.result()
+
+        self.sim_info.reset()
+        self.sim_info.rng = SimulationRandom(5)
+        GameSimulator(self.sim_info).run()
+        self.assertEqual(self.result(), first)
+
+    def test_bootstrap_reuses_matchup(self):
+        """Test that BootstrapGame replays one matchup and leaves it ready to play."""
+        home_team = self.sim_info.home_team
+        rng = self.sim_info.rng
+        with redirect_stdout(io.StringIO()) as output:
+            BootstrapGame(self.sim_info).run(5)
+        self.assertIn("In 5 simulations", output.getvalue())
+        self.assertIs(self.sim_info.home_team, home_team)
+        self.assertIs(self.sim_info.rng, rng)
+        self.assertEqual((self.sim_info.inning, home_team.score, home_team.stats), (1, 0, {}))
+
+    def test_parallel_bootstrap_matches_serial(self):
+        """Test that spreading games over workers plays exactly the serial games."""
+        with redirect_stdout(io.StringIO()):
+            self.sim_info.rng = SimulationRandom(3)
+            serial = BootstrapGame(self.sim_info).run(12)
+            self.sim_info.rng = SimulationRandom(3)
+            parallel = BootstrapGame(self.sim_info).run(12, workers=2)
+        self.assertEqual(parallel, serial)
+        self.assertEqual(serial['home_wins'] + serial['away_wins'], 12)
+        self.assertEqual(self.sim_info.inning, 1)
+
+    def test_spawned_bootstrap_matches_serial(self):
+        """Test that workers started without fork unpickle the matchup and play the serial games."""
+        with redirect_stdout(io.StringIO()):
+            self.sim_info.rng = SimulationRandom(3)
+            serial = BootstrapGame(self.sim_info).run(6)
+            self.sim_info.rng = SimulationRandom(3)
+            spawned = BootstrapGame(self.sim_info, start_method='spawn').run(6, workers=2)
+        self.assertEqual(spawned, serial)
+
+    def test_at_bat_matches_pitch_simulator(self):
+        """Test that the table-driven pitch loop draws exactly what the pitch simulators do pitch by pitch."""
+        def pitch_by_pitch(sim_info):
+            count = sim_info.count
+            count.reset()
+            while count.strikes < 3 and count.balls < 4:
+                pitch, result = PitchSimulator.init(sim_info).run()
+                if result == 'ball':
+                    count.ball()
+                elif result in ('called_strike', 'swinging_strike') or (result == 'foul' and count.strikes < 2):
+                    count.strike()
+                elif result == 'hit_into_play':
+                    return sim_info.offense().batter().simulate_hit(rng=sim_info.rng)
+            return 'strikeout' if count.strikes == 3 else 'walk'
+
+        for pitchSimulator in ('basic', 'count'):
+            self.sim_info.pitchSimulator = pitchSimulator
+            batter, pitcher = self.sim_info.offense().batter(), self.sim_info.defense().pitcher()
+            self.sim_info.rng = SimulationRandom(9)
+            expected = [pitch_by_pitch(self.sim_info) for _ in range(300)]
+            self.sim_info.rng = SimulationRandom(9)
+            game = GameSimulator(self.sim_info)
+            self.assertEqual([game.simulate_at_bat(batter, pitcher) for _ in range(300)], expected)
+
+    def test_plate_appearance_granularity(self):
+        """Test that plate appearance games draw from the solved matchups and score as pitch-level games."""
+        sim_info = make_sim_info(self.statcast, seed=11, granularity=Granularity.PLATE_APPEARANCE)
+        self.assertEqual(len(sim_info._plate_appearances), 4)
+        batter, pitcher = sim_info.home_team.roster[0], sim_info.away_team.pitcher()
+        expected = plate_appearance_probs([batter], pitcher)[0]
+        np.testing.assert_allclose(list(sim_info.plate_appearance(batter, pitcher).probs().values()), expected)
+
+        games = 1000
+        runs = []
+        for stream in sim_info.rng.spawn(games):
+            sim_info.reset()
+            sim_info.rng = stream
+            GameSimulator(sim_info).run()
+            runs.append(sim_info.home_team.score + sim_info.away_team.score)
+            self.assertNotEqual(sim_info.home_team.score, sim_info.away_team.score)
+        solved = MarkovSolver(self.sim_info).solve()
+        self.assertAlmostEqual(np.mean(runs), solved['expected_home_runs'] + solved['expected_away_runs'],
+                               delta=4 * np.std(runs) / np.sqrt(games))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,6 +2,10 @@ import pytest
 import pandas as pd
 import time
 import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
 from pybaseball import statcast
 from datetime import datetime, timedelta
 from team import Team
@@ -9,6 +13,41 @@ from db_manager import DatabaseManager
 from simulation_info import SimulationInfo
 from game_engine import GameSimulator
 
+# Source checkout, put on the path of the interpreters started by TestStartup
+REPO_ROOT = Path(__file__).parent.parent
+
+# Generous bound on a cold `import game_engine`, so only regressions such as
+# heavy imports or database work at import time trip it
+MAX_STARTUP_SECONDS = 3.0
+
+class TestStartup:
+    def _import_in_fresh_interpreter(self, cwd):
+        """Import game_engine in a new interpreter and report what it did."""
+        script = (
+            "import sys, time\n"
+            f"sys.path.insert(0, {str(REPO_ROOT)!r})\n"
+            "start = time.perf_counter()\n"
+            "import game_engine\n"
+            "print(time.perf_counter() - start)\n"
+            "print('pybaseball' in sys.modules)\n"
+        )
+        result = subprocess.run([sys.executable, "-c", script], cwd=cwd, capture_output=True, text=True, check=True)
+        seconds, pybaseball_loaded = result.stdout.split()
+        return float(seconds), pybaseball_loaded == 'True'
+
+    def test_import_startup_time(self):
+        """Test that importing the engine is fast and free of side effects"""
+        with tempfile.TemporaryDirectory() as cwd:
+            times = []
+            for _ in range(3):
+                seconds, pybaseball_loaded = self._import_in_fresh_interpreter(cwd)
+                times.append(seconds)
+                assert not pybaseball_loaded, "pybaseball should only be imported when data is fetched"
+            assert os.listdir(cwd) == [], "Importing should not create a database file"
+
+        print(f"\nimport game_engine: best {min(times):.3f}s of {len(times)}")
+        assert min(times) < MAX_STARTUP_SECONDS, f"import game_engine took {min(times):.2f}s"
+
 @pytest.mark.skipif(
     not os.environ.get('RUN_SPEED_TEST'),
     reason="Speed test is slow and requires fetching MLB data. Set RUN_SPEED_TEST=1 to run it."
@@ -0,0 +1,56 @@
+import unittest
+import pickle
+import numpy as np
+import sys
+from pathlib import Path
+
+# Add parent directory to path to import modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from stat_accumulator import StatAccumulator
+from base_state import PA_RESULT_INDEX
+
+class TestStatAccumulator(unittest.TestCase):
+    def setUp(self):
+        # The same player batting in two slots
+        self.stats = StatAccumulator([111111, 222222, 111111])
+
+    def test_add(self):
+        """Test counting by slot and result code."""
+        walk, single = PA_RESULT_INDEX['walk'], PA_RESULT_INDEX['single']
+        self.stats.add(0, walk)
+        self.stats.add(2, walk)
+        self.stats.add(1, single)
+        self.assertEqual(self.stats.counts.dtype, np.int32)
+        self.assertEqual(self.stats.to_dict(), {111111: {'walk': 2}, 222222: {'single': 1}})
+
+        self.stats.clear()
+        self.assertEqual(self.stats.to_dict(), {})
+
+    def test_record(self):
+        """Test counting by key, growing for players and stats not seen before."""
+        self.stats.record(111111, 'single')
+        self.stats.record(333333, 'hits')
+        self.stats.record(333333, 'hits')
+        self.assertEqual(self.stats.counts.shape, (4, len(self.stats.stats)))
+        self.assertEqual(self.stats.to_dict(), {111111: {'single': 1}, 333333: {'hits': 2}})
+
+    def test_merge(self):
+        """Test that games and workers combine by adding their counts."""
+        other = self.stats.empty()
+        self.stats.add(0, PA_RESULT_INDEX['double'])
+        other.add(1, PA_RESULT_INDEX['strikeout'])
+        other.add(0, PA_RESULT_INDEX['double'])
+
+        total = self.stats + other
+        self.assertEqual(total.to_dict(), {111111: {'double': 2}, 222222: {'strikeout': 1}})
+        self.assertEqual(self.stats.to_dict(), {111111: {'double': 1}})
+        self.stats += other
+        self.assertEqual(self.stats, total)
+        self.assertEqual(pickle.loads(pickle.dumps(total)), total)
+
+        with self.assertRaises(ValueError):
+            self.stats += StatAccumulator([111111])
+
+if __name__ == '__main__':
+    unittest.main()
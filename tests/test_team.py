@@ -10,6 +10,14 @@ sys.path.append(str(Path(__file__).parent.parent))
 from team import Team
 from pitcher import Pitcher
 from batter import Batter
+from player_registry import PlayerRegistry
+from pitch_simulator import PitchSimulator
+from db_manager import DatabaseManager, training_fingerprint
+import os
+import shutil
+import gc
+import weakref
+import tempfile
 
 class TestTeam(unittest.TestCase):
     def setUp(self):
@@ -134,6 +142,78 @@ class TestTeam(unittest.TestCase):
         # Check that it contains multiple lines
         self.assertTrue(len(lineup.split('\n')) > 1)
 
+    def test_shared_player_models(self):
+        """Test that teams built from the same training data share player models"""
+        registry = PlayerRegistry()
+        first = Team(name='Test Team', date='2024-04-02', statcast=self.sample_data,
+                     pitcher_id=123456, roster=self.test_roster, registry=registry)
+        second = Team(name='Test Team', date='2024-04-02', statcast=self.sample_data,
+                      pitcher_id=123456, roster=self.test_roster, registry=registry)
+
+        for a, b in zip(first.roster, second.roster):
+            self.assertIs(a, b)
+        self.assertIs(first.pitcher(), second.pitcher())
+        self.assertEqual(registry.stats()['hits'], len(self.test_roster) + 1)
+
+    def test_required_tiers(self):
+        """Test that only the tiers the pitch simulator needs are built up front"""
+        temp_dir = tempfile.mkdtemp()
+        db = DatabaseManager(os.path.join(temp_dir, "test_baseball_stats.db"))
+        try:
+            team = Team(name='Test Team', date='2024-04-02', statcast=self.sample_data,
+                        pitcher_id=123456, roster=self.test_roster, registry=PlayerRegistry(), db=db,
+                        tiers=PitchSimulator.required_tiers('basic'))
+            fingerprint = training_fingerprint(self.sample_data)
+            pitcher = team.pitcher()
+            self.assertIsNone(db.get_pitcher_profiles([123456], fingerprint)[123456]['count_based'])
+
+            # Other tiers are built, and cached, on first use
+            self.assertIn((0, 0), pitcher.count_based_probs)
+            cached = db.get_pitcher_profiles([123456], fingerprint)[123456]
+            self.assertEqual(set(cached['count_based']), set(pitcher.count_based_probs))
+        finally:
+            db.close()
+            shutil.rmtree(temp_dir)
+
+    def test_training_frame_released(self):
+        """Test that players built in basic mode don't keep the training frame alive"""
+        temp_dir = tempfile.mkdtemp()
+        db = DatabaseManager(os.path.join(temp_dir, "test_baseball_stats.db"))
+        try:
+            statcast = self.sample_data.copy()
+            frame = weakref.ref(statcast)
+            registry = PlayerRegistry()
+            team = Team(name='Test Team', date='2024-04-02', statcast=statcast,
+                        pitcher_id=123456, roster=self.test_roster, registry=registry, db=db,
+                        tiers=PitchSimulator.required_tiers('basic'))
+            del statcast
+            gc.collect()
+            self.assertIsNone(frame())
+
+            # Tiers left unbuilt come from the player's own rows
+            self.assertIn((0, 0), team.pitcher().count_based_probs)
+            self.assertIn('0-0', team.roster[0].count_based_outcome_probs['FF'])
+        finally:
+            db.close()
+            shutil.rmtree(temp_dir)
+
+    def test_backtest_fingerprint(self):
+        """Test that backtest teams cache profiles under the fingerprint of the frame without the game's date"""
+        temp_dir = tempfile.mkdtemp()
+        db = DatabaseManager(os.path.join(temp_dir, "test_baseball_stats.db"))
+        try:
+            statcast = self.sample_data.copy()
+            statcast.loc[1::2, 'game_date'] = '2024-03-31'
+            statcast.loc[::3, 'inning_topbot'] = 'Top'  # Test Team pitching at home
+            Team(name='Test Team', date='2024-04-01', statcast=statcast, backtest=True,
+                 registry=PlayerRegistry(), db=db)
+            db.flush()
+            training = statcast.loc[statcast.game_date != '2024-04-01']
+            self.assertEqual(set(db.get_fingerprints()), {training_fingerprint(training)})
+        finally:
+            db.close()
+            shutil.rmtree(temp_dir)
+
     def test_empty_team_handling(self):
         """Test handling of empty team"""
         empty_data = pd.DataFrame(columns=self.sample_data.columns)
@@ -0,0 +1,83 @@
+import unittest
+import io
+from contextlib import redirect_stdout
+import numpy as np
+import sys
+from pathlib import Path
+
+# Add parent directory to path to import modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from game_engine import GameSimulator, BootstrapGame
+from vector_engine import VectorBootstrapGame, NEXT_STATE, RUNS, PA_RESULTS
+from tests.helpers import random_statcast, make_sim_info
+
+class TestVectorEngine(unittest.TestCase):
+    def setUp(self):
+        self.statcast = random_statcast(event_probs=[0.6, 0.25, 0.1, 0.05])
+
+    def sim_info(self, pitchSimulator='basic', seed=7):
+        return make_sim_info(self.statcast, away_roster=[333333, 444444, 111111],
+                             pitchSimulator=pitchSimulator, seed=seed)
+
+    def test_advancement_tables(self):
+        """Test the base-state tables against known plays."""
+        home_run, walk, single = (PA_RESULTS.index(result) for result in ('home_run', 'walk', 'single'))
+        self.assertEqual((NEXT_STATE[0b111, home_run], RUNS[0b111, home_run]), (0, 4))
+        self.assertEqual((NEXT_STATE[0b001, walk], RUNS[0b001, walk]), (0b011, 0))
+        self.assertEqual((NEXT_STATE[0b100, single], RUNS[0b100, single]), (0b001, 1))
+
+    def test_games(self):
+        """Test that every game ends with a winner and stats cover every plate appearance."""
+        games = 2000
+        sim_info = self.sim_info()
+        results = VectorBootstrapGame(sim_info, batch_size=512).simulate(games)
+        self.assertEqual(results['home_wins'] + results['away_wins'], games)
+        self.assertFalse(np.any(results['home_scores'] == results['away_scores']))
+
+        # The away team makes at least 27 outs a game
+        away_outs = sum(player.get('field_out', 0) + player.get('strikeout', 0)
+                        for player in results['away_stats'].values())
+        self.assertGreaterEqual(away_outs, 27 * games)
+        self.assertEqual(set(results['home_stats']), {batter.id for batter in sim_info.home_team.roster})
+
+    def test_results_match_bootstrap(self):
+        """Test that results have BootstrapGame.run's keys and meanings, plus per-game scores."""
+        sim_info = self.sim_info()
+        with redirect_stdout(io.StringIO()):
+            scalar = BootstrapGame(sim_info).run(5)
+            vector = VectorBootstrapGame(sim_info, batch_size=64).run(300)
+        self.assertLessEqual(set(scalar), set(vector))
+        self.assertEqual(vector['home_score'], vector['home_scores'].sum())
+        self.assertEqual(vector['away_score'], vector['away_scores'].sum())
+        self.assertIsInstance(vector['home_score'], int)
+        self.assertEqual(len(vector['home_scores']), 300)
+
+    def test_reproducible(self):
+        """Test that the same seed replays the same games."""
+        first = VectorBootstrapGame(self.sim_info(seed=3)).simulate(500)
+        second = VectorBootstrapGame(self.sim_info(seed=3)).simulate(500)
+        np.testing.assert_array_equal(first['home_scores'], second['home_scores'])
+        self.assertEqual(first['away_stats'], second['away_stats'])
+
+    def test_matches_scalar_engine(self):
+        """Test that runs per game agree with BootstrapGame's within sampling error."""
+        for pitchSimulator in ('basic', 'count'):
+            sim_info = self.sim_info(pitchSimulator)
+            with redirect_stdout(io.StringIO()):
+                vector = VectorBootstrapGame(sim_info).run(20000)
+
+            games = 150
+            scalar_runs = []
+            for stream in sim_info.rng.spawn(games):
+                sim_info.reset()
+                sim_info.rng = stream
+                GameSimulator(sim_info).run()
+                scalar_runs.append(sim_info.home_team.score + sim_info.away_team.score)
+            scalar_runs = np.array(scalar_runs)
+            vector_runs = vector['home_scores'] + vector['away_scores']
+            error = 4 * scalar_runs.std() / np.sqrt(games)
+            self.assertAlmostEqual(scalar_runs.mean(), vector_runs.mean(), delta=error)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import unittest
+import io
+import os
+import shutil
+import tempfile
+from contextlib import redirect_stdout
+import sys
+from pathlib import Path
+
+# Add parent directory to path to import modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from db_manager import DatabaseManager, training_fingerprint
+from warm_cache import main, training_window, warm_cache
+from tests.helpers import random_statcast
+
+class TestWarmCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, "test_baseball_stats.db")
+        self.db = DatabaseManager(self.db_path)
+
+        self.statcast = random_statcast(400, batters=range(1, 9), pitchers=range(10, 18),
+                                        events=['field_out', 'single', 'double', None],
+                                        dates=['2024-04-01', '2024-04-02'])
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.temp_dir)
+
+    def test_warm_cache(self):
+        """Test that every player's profile is cached under the window's fingerprint."""
+        report = warm_cache(self.statcast, self.db, workers=2, names=False)
+        self.assertEqual(report['rows'], 400)
+        self.assertEqual(report['batters'], 8)
+        self.assertEqual(report['pitchers'], 8)
+
+        fingerprint = training_fingerprint(self.statcast)
+        self.assertEqual(self.db.get_fingerprints(), {fingerprint: 16})
+        profiles = self.db.get_batter_profiles(range(1, 9), fingerprint)
+        self.assertTrue(all(all(profile.values()) for profile in profiles.values()))
+
+    def test_training_window(self):
+        """Test that the window keeps only the requested game dates."""
+        window = training_window(self.statcast, '2024-04-02', '2024-04-02')
+        self.assertEqual(len(window), 200)
+        self.assertIs(training_window(self.statcast), self.statcast)
+
+    def test_command_line(self):
+        """Test the command-line entry point and its report."""
+        path = os.path.join(self.temp_dir, "statcast.csv")
+        self.statcast.to_csv(path, index=False)
+
+        output = io.StringIO()
+        with redirect_stdout(output):
+            report = main([path, '--start', '2024-04-01', '--end', '2024-04-01', '--db', self.db_path,
+                           '--no-names'])
+        self.assertEqual(report['rows'], 200)
+        self.assertIn("Rows processed:  200", output.getvalue())
+        self.assertEqual(sum(self.db.get_fingerprints().values()), report['batters'] + report['pitchers'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,153 @@
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+from db_manager import DatabaseManager, training_fingerprint
+from profile_builder import build_profiles
+from name_resolver import NameResolver
+
+
+def load_statcast(path):
+    """Load statcast data saved by pandas.
+
+    Args:
+        path: .parquet, .pkl/.pickle or .csv file, e.g. the output of
+            pybaseball.statcast() saved with to_parquet()
+
+    Returns:
+        pd.DataFrame
+    """
+    path = str(path)
+    if path.endswith('.parquet'):
+        return pd.read_parquet(path)
+    if path.endswith(('.pkl', '.pickle')):
+        return pd.read_pickle(path)
+    return pd.read_csv(path)
+
+
+def training_window(statcast, start_dt=None, end_dt=None):
+    """Select the rows of a training window, keeping their order.
+
+    Args:
+        statcast: DataFrame containing statcast data
+        start_dt: Optional first game date (YYYY-MM-DD), inclusive
+        end_dt: Optional last game date (YYYY-MM-DD), inclusive
+
+    Returns:
+        pd.DataFrame: The window, or statcast itself when no bounds are given
+    """
+    if start_dt is None and end_dt is None:
+        return statcast
+    dates = pd.to_datetime(statcast['game_date'])
+    mask = pd.Series(True, index=statcast.index)
+    if start_dt is not None:
+        mask &= dates >= pd.Timestamp(start_dt)
+    if end_dt is not None:
+        mask &= dates <= pd.Timestamp(end_dt)
+    return statcast.loc[mask]
+
+
+def warm_cache(statcast, db=None, workers=1, names=True, register=None):
+    """Precompute and store profiles and names for every player in statcast.
+
+    Profiles are built in worker processes, each on the rows of its own share
+    of the players, and written by this process in one batch per role.
+
+    Args:
+        statcast: Training window to build profiles from. Use the same frame
+            the simulations train on, so the cached profiles share its
+            training fingerprint.
+        db: DatabaseManager to fill. Defaults to the default database.
+        workers: Number of processes building profiles
+        names: Whether to resolve names missing from the cache
+        register: Optional local player register, see name_resolver.load_register().
+            Its names are all loaded into the cache, and players it lacks are
+            looked up online only if names is true.
+
+    Returns:
+        dict: Report with rows, batters, pitchers, names, fingerprint and seconds
+    """
+    start = time.perf_counter()
+    db = db if db is not None else DatabaseManager.shared()
+    fingerprint = training_fingerprint(statcast)
+
+    report = {'rows': len(statcast), 'fingerprint': fingerprint, 'names': 0}
+    for role in ('batter', 'pitcher'):
+        profiles = _build(statcast, role, workers)
+        getattr(db, f'set_{role}_profiles')(profiles, fingerprint)
+        report[f'{role}s'] = len(profiles)
+
+    resolver = NameResolver(online=names)
+    if register is not None:
+        report['names'] += resolver.use_register(register, db)
+    if names:
+        player_ids = set(statcast['batter'].dropna().astype(int)) | set(statcast['pitcher'].dropna().astype(int))
+        report['names'] += _warm_names(db, player_ids, resolver)
+
+    report['seconds'] = time.perf_counter() - start
+    return report
+
+
+def _build(statcast, role, workers):
+    """Build profiles for every player of a role, split across worker processes."""
+    player_ids = [int(id) for id in statcast[role].dropna().unique()]
+    if workers <= 1 or len(player_ids) < 2 * workers:
+        return build_profiles(statcast, role, player_ids)
+
+    shares = [player_ids[i::workers] for i in range(workers)]
+    profiles = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(build_profiles, statcast.loc[statcast[role].isin(share)], role, share)
+            for share in shares
+        ]
+        for future in futures:
+            profiles.update(future.result())
+    return profiles
+
+
+def _warm_names(db, player_ids, resolver):
+    """Resolve names missing from the cache in one batch.
+
+    Returns:
+        int: Number of names stored
+    """
+    cached = len(db.get_player_names(player_ids))
+    return len(resolver.resolve(player_ids, db)) - cached
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Precompute cached player profiles from a local statcast file.")
+    parser.add_argument('statcast', help="Statcast data saved as .parquet, .pkl or .csv")
+    parser.add_argument('--start', help="First game date of the training window (YYYY-MM-DD)")
+    parser.add_argument('--end', help="Last game date of the training window (YYYY-MM-DD)")
+    parser.add_argument('--db', default="baseball_stats.db", help="Path to the SQLite cache file")
+    parser.add_argument('--workers', type=int, default=1, help="Processes used to build profiles")
+    parser.add_argument('--no-names', action='store_true', help="Skip looking up player names online")
+    parser.add_argument('--register', help="Local player register (.csv or .parquet) to load names from")
+    parser.add_argument('--snapshot', help="Also export the window's profiles to this memory-mappable snapshot file")
+    args = parser.parse_args(argv)
+
+    statcast = training_window(load_statcast(args.statcast), args.start, args.end)
+    db = DatabaseManager(args.db)
+    try:
+        report = warm_cache(statcast, db, workers=args.workers, names=not args.no_names,
+                            register=args.register)
+        if args.snapshot:
+            db.export_snapshot(args.snapshot, report['fingerprint'])
+    finally:
+        db.close()
+
+    print(f"Training window: {report['fingerprint']}")
+    print(f"Rows processed:  {report['rows']}")
+    print(f"Batters built:   {report['batters']}")
+    print(f"Pitchers built:  {report['pitchers']}")
+    print(f"Names stored:    {report['names']}")
+    print(f"Time:            {report['seconds']:.2f}s")
+    if args.snapshot:
+        print(f"Snapshot:        {args.snapshot}")
+    return report
+
+
+if __name__ == '__main__':
+    main()